@@ -0,0 +1,306 @@
+# backend/backtest.py
+#
+# Backtests für Muster und Indikator-Signale, komplett vektorisiert: Einstiege
+# sind Masken über alle Kerzen, die Kursverläufe aller Trades werden als
+# (Trades, Haltedauer)-View geschnitten, Ausstiege (Haltedauer, Stop, Ziel),
+# Rendite, Trefferquote und Drawdown ergeben sich ohne Schleife über Kerzen.
+#
+# Jedes Signal ist ein eigener Trade (Einstieg zum Schlusskurs der Signalkerze,
+# Ausstieg nach `hold` Kerzen oder früher bei Stop/Ziel); überlappende Trades
+# sind erlaubt. Die Equity-Kurve verkettet die Trades in der Reihenfolge ihres
+# Ausstiegs.
+#
+# Parameter-Sweeps über viele Ticker laufen parallel auf allen Kernen:
+#   python -m backtest rsi --universe dax --grid low=20,25,30 hold=5,10,20 rsi_period=7,14
+#   python -m backtest macd --tickers AAPL,MSFT --grid hold=5,10 stop=0.05,0.1
+
+import sys
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from indicators import compute_indicators, BOLLINGER_WINDOW
+
+# Strategie -> Standardparameter
+STRATEGIES = {
+    "rsi": {"rsi_period": 14, "low": 30.0},      # RSI fällt unter `low`
+    "macd": {},                                  # MACD kreuzt die Signallinie nach oben
+    "bollinger": {"window": BOLLINGER_WINDOW},   # Schlusskurs fällt unter das untere Band
+    "pattern": {"pattern": 1, "min_confidence": 0.5},  # Muster beginnt (Klasse aus Zeitleiste)
+}
+EXIT_DEFAULTS = {"hold": 10, "stop": None, "target": None, "cost": 0.0}
+INT_PARAMS = ("hold", "rsi_period", "window", "pattern")
+# erlaubter Bereich je Parameter (einschließlich, None = offen); nur stop/target dürfen fehlen
+PARAM_RANGES = {
+    "hold": (1, None),
+    "rsi_period": (1, None),
+    "window": (2, None),
+    "pattern": (0, None),
+    "low": (0.0, 100.0),
+    "min_confidence": (0.0, 1.0),
+    "cost": (0.0, None),
+    "stop": (0.0, None),
+    "target": (0.0, None),
+}
+OPTIONAL_PARAMS = ("stop", "target")
+
+WINDOW_SIZE = 50
+
+
+def _cross_below(a, level):
+    """Indizes, an denen `a` von >= level auf < level wechselt."""
+    hit = np.zeros(len(a), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        hit[1:] = (a[1:] < level[1:]) & (a[:-1] >= level[:-1])
+    return np.flatnonzero(hit)
+
+
+def entries_for(strategy, close, params, classes=None, confidence=None):
+    """Einstiegs-Indizes (Kerzen) einer Strategie."""
+    if strategy == "rsi":
+        period = int(params["rsi_period"])
+        rsi = compute_indicators(close, [("rsi", period)])[f"RSI_{period}"]
+        return _cross_below(rsi, np.full(len(rsi), float(params["low"])))
+    if strategy == "macd":
+        ind = compute_indicators(close, [("macd", None)])
+        # MACD über Signal = Signal unter MACD
+        return _cross_below(ind["MACD_Signal"], ind["MACD"])
+    if strategy == "bollinger":
+        window = int(params["window"])
+        ind = compute_indicators(close, [("bollinger", window)])
+        suffix = "" if window == BOLLINGER_WINDOW else f"_{window}"
+        return _cross_below(close, ind[f"Bollinger_Lower{suffix}"])
+    if strategy == "pattern":
+        if classes is None:
+            raise ValueError("Strategie pattern braucht eine Muster-Zeitleiste")
+        hit = (classes == int(params["pattern"])) & (confidence >= float(params["min_confidence"]))
+        start = hit.copy()
+        start[1:] &= ~hit[:-1]
+        # Fenster i endet mit Kerze i + WINDOW_SIZE - 1
+        return np.flatnonzero(start) + WINDOW_SIZE - 1
+    raise ValueError(f"Unbekannte Strategie: {strategy}")
+
+
+def simulate(close, entries, hold=10, stop=None, target=None, cost=0.0):
+    """Trades aller Einstiege: (Einstieg, Ausstieg, Rendite) als Arrays."""
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    hold = int(hold)
+    entries = np.asarray(entries, dtype=np.int64)
+    entries = entries[entries < n - 1]
+    if len(entries) == 0 or hold < 1:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0)
+
+    # Kurse der `hold` Kerzen nach jedem Einstieg; hinter dem Ende mit NaN aufgefüllt
+    padded = np.concatenate([close[1:], np.full(hold, np.nan)])
+    paths = np.lib.stride_tricks.sliding_window_view(padded, hold)[entries]
+    entry_price = close[entries]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rel = paths / entry_price[:, None] - 1.0
+
+    horizon = np.minimum(hold, n - 1 - entries)
+    exit_at = horizon - 1
+    if stop is not None or target is not None:
+        hit = np.zeros(rel.shape, dtype=bool)
+        with np.errstate(invalid="ignore"):
+            if stop is not None:
+                hit |= rel <= -float(stop)
+            if target is not None:
+                hit |= rel >= float(target)
+        hit &= np.arange(hold) < horizon[:, None]
+        first = hit.argmax(axis=1)
+        exit_at = np.where(hit.any(axis=1), first, exit_at)
+
+    returns = rel[np.arange(len(entries)), exit_at] - cost
+    return entries, entries + 1 + exit_at, returns
+
+
+def summarize(close, entries, exits, returns):
+    """Kennzahlen: Trefferquote, Rendite, Drawdown der verketteten Trades, Buy & Hold."""
+    close = np.asarray(close, dtype=np.float64)
+    result = {
+        "trades": int(len(returns)),
+        "buy_and_hold": float(close[-1] / close[0] - 1) if len(close) > 1 else 0.0,
+    }
+    if len(returns) == 0:
+        result.update({"hit_rate": None, "avg_return": None, "median_return": None, "total_return": 0.0,
+                       "max_drawdown": 0.0, "profit_factor": None, "avg_bars": None})
+        return result
+
+    order = np.argsort(exits, kind="stable")
+    equity = np.cumprod(1.0 + returns[order])
+    peak = np.maximum.accumulate(np.concatenate([[1.0], equity]))[1:]
+    gains = returns[returns > 0].sum()
+    losses = -returns[returns < 0].sum()
+    result.update({
+        "hit_rate": float((returns > 0).mean()),
+        "avg_return": float(returns.mean()),
+        "median_return": float(np.median(returns)),
+        "total_return": float(equity[-1] - 1.0),
+        "max_drawdown": float((1.0 - equity / peak).max()),
+        "profit_factor": float(gains / losses) if losses > 0 else None,
+        "avg_bars": float((exits - entries).mean()),
+    })
+    return result
+
+
+def parse_grid(items):
+    """["hold=5,10", "low=20,30"] -> {"hold": [5, 10], "low": [20.0, 30.0]}."""
+    grid = {}
+    for item in items or []:
+        if "=" not in item:
+            raise ValueError(f"Ungültiger Parameter: {item} (erwartet name=wert1,wert2)")
+        name, values = item.split("=", 1)
+        parsed = []
+        for value in values.split(","):
+            value = value.strip()
+            if value.lower() in ("", "none"):
+                parsed.append(None)
+            else:
+                try:
+                    number = float(value)
+                except ValueError:
+                    raise ValueError(f"Ungültiger Wert: {name}={value}")
+                parsed.append(int(number) if number.is_integer() and name in INT_PARAMS else number)
+        grid[name.strip()] = parsed
+    return grid
+
+
+def check_param(name, value):
+    """ValueError, wenn `value` für den Parameter `name` nicht erlaubt ist."""
+    if value is None:
+        if name in OPTIONAL_PARAMS:
+            return
+        raise ValueError(f"{name} braucht einen Wert")
+    if name in INT_PARAMS and not isinstance(value, int):
+        raise ValueError(f"{name} muss eine ganze Zahl sein: {value}")
+    low, high = PARAM_RANGES[name]
+    if not np.isfinite(value) or value < low or (high is not None and value > high):
+        allowed = f"{low} bis {high}" if high is not None else f"mindestens {low}"
+        raise ValueError(f"Ungültiger Wert: {name}={value} (erlaubt: {allowed})")
+
+
+def combinations(strategy, grid):
+    """Alle Parameterkombinationen (Strategie- und Ausstiegsparameter) mit Standardwerten aufgefüllt."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unbekannte Strategie: {strategy}")
+    defaults = {**STRATEGIES[strategy], **EXIT_DEFAULTS}
+    unknown = [name for name in grid if name not in defaults]
+    if unknown:
+        raise ValueError(f"Unbekannte Parameter für {strategy}: {', '.join(unknown)}")
+    for name, values in grid.items():
+        for value in values:
+            check_param(name, value)
+    names = list(grid)
+    return [{**defaults, **dict(zip(names, values))} for values in itertools.product(*(grid[n] for n in names))]
+
+
+def run(strategy, close, params, classes=None, confidence=None):
+    """Ein Backtest mit vollständigen Parametern; gibt Kennzahlen und Trades zurück."""
+    entries = entries_for(strategy, close, params, classes, confidence)
+    entries, exits, returns = simulate(close, entries, params["hold"], params["stop"], params["target"], params["cost"])
+    return summarize(close, entries, exits, returns), (entries, exits, returns)
+
+
+def sweep_series(strategy, close, grid, classes=None, confidence=None):
+    """Alle Kombinationen eines Grids auf einer Kursreihe."""
+    results = []
+    for params in combinations(strategy, grid):
+        stats, _ = run(strategy, close, params, classes, confidence)
+        results.append({"params": params, **stats})
+    return results
+
+
+def _sweep_ticker(ticker, strategy, grid, period, interval):
+    # läuft im Worker-Prozess: Kerzen aus dem (per mmap geteilten) Bar-Store
+    import bar_store
+
+    series = bar_store.load_series(ticker, period, interval)
+    classes = confidence = None
+    if strategy == "pattern":
+        # ohne Modell im Worker: Klassen der Regel-Engine
+        from history_scan import sliding_windows
+        from ml_model.pattern_detection import evaluate_rules, rule_classes
+
+        classes = rule_classes(evaluate_rules(sliding_windows(series)))
+        confidence = np.ones(len(classes), dtype=np.float32)
+    return sweep_series(strategy, series.close, grid, classes, confidence)
+
+
+def sweep(tickers, strategy, grid, period="max", interval="1d", workers=None):
+    """Grid über viele Ticker, parallel je Ticker; gibt ({ticker: Ergebnisse}, {ticker: Fehler}) zurück."""
+    combinations(strategy, grid)  # Parameter früh prüfen
+    results, errors = {}, {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_sweep_ticker, t, strategy, grid, period, interval): t for t in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                results[ticker] = future.result()
+            except Exception as e:
+                errors[ticker] = str(e)
+    return results, errors
+
+
+def aggregate(results):
+    """Je Parameterkombination: Mittel über alle Ticker (nur Ticker mit Trades zählen bei den Quoten)."""
+    table = {}
+    for rows in results.values():
+        for row in rows:
+            key = tuple(sorted((k, v) for k, v in row["params"].items()))
+            table.setdefault(key, []).append(row)
+    summary = []
+    for key, rows in table.items():
+        traded = [r for r in rows if r["trades"]]
+        summary.append({
+            "params": dict(key),
+            "tickers": len(rows),
+            "trades": int(sum(r["trades"] for r in rows)),
+            "hit_rate": float(np.mean([r["hit_rate"] for r in traded])) if traded else None,
+            "avg_return": float(np.mean([r["avg_return"] for r in traded])) if traded else None,
+            "total_return": float(np.mean([r["total_return"] for r in rows])),
+            "max_drawdown": float(np.mean([r["max_drawdown"] for r in rows])),
+        })
+    summary.sort(key=lambda r: -(r["avg_return"] if r["avg_return"] is not None else -np.inf))
+    return summary
+
+
+def main(argv=None):
+    from universes import get_universe
+
+    parser = argparse.ArgumentParser(description="Parameter-Sweep eines Backtests über viele Ticker")
+    parser.add_argument("strategy", choices=sorted(STRATEGIES))
+    parser.add_argument("--tickers", help="kommagetrennt, z.B. AAPL,TSLA,WMT")
+    parser.add_argument("--universe", help="Name aus universes.py oder UNIVERSE_DIR/<name>.txt")
+    parser.add_argument("--grid", nargs="*", default=[], help="z.B. hold=5,10,20 low=20,30 stop=none,0.05")
+    parser.add_argument("--period", default="max")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--workers", type=int, default=None, help="Prozesse (Standard: Anzahl CPUs)")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    tickers = [t.strip().upper() for t in (args.tickers or "").split(",") if t.strip()]
+    if args.universe:
+        tickers += get_universe(args.universe)
+    if not tickers:
+        parser.error("--tickers oder --universe angeben")
+
+    grid = parse_grid(args.grid)
+    results, errors = sweep(list(dict.fromkeys(tickers)), args.strategy, grid, args.period, args.interval, args.workers)
+    for ticker, error in errors.items():
+        print(f"Warnung: {ticker}: {error}")
+
+    print(f"{'Parameter':<50} {'Trades':>7} {'Treffer':>8} {'Ø Rendite':>10} {'Ø Gesamt':>9} {'Ø MaxDD':>8}")
+    for row in aggregate(results)[:args.top]:
+        params = ", ".join(f"{k}={v}" for k, v in row["params"].items() if v is not None)
+        hit = "-" if row["hit_rate"] is None else f"{row['hit_rate']:.1%}"
+        avg = "-" if row["avg_return"] is None else f"{row['avg_return']:+.2%}"
+        print(f"{params:<50} {row['trades']:>7} {hit:>8} {avg:>10} {row['total_return']:>+9.1%} {row['max_drawdown']:>8.1%}")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,605 @@
+# backend/bar_store.py
+
+import os
+import re
+import json
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+REQUIRED_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+INTRADAY_INTERVALS = {"5m", "15m", "30m", "60m"}
+
+# Maximale Historie, die Yahoo pro Intervall ausliefert (wird beim ersten Abruf komplett geladen)
+MAX_PERIOD = {
+    "5m": "60d",
+    "15m": "60d",
+    "30m": "60d",
+    "60m": "730d",
+    "1d": "max",
+    "1wk": "max",
+    "1mo": "max",
+}
+
+# Intervalle, die nicht eigens geladen, sondern aus einer feineren gespeicherten
+# Basis zusammengefasst werden (gleiche Historie bei Yahoo). 60m bleibt eigene
+# Basis: 5m reicht nur 60 Tage zurück, der 3-Monats-Chart braucht mehr.
+RESAMPLE_BASE = {
+    "15m": "5m",
+    "30m": "5m",
+    "1wk": "1d",
+    "1mo": "1d",
+}
+
+# relative Abweichung des Schlusskurses einer abgeschlossenen Kerze, ab der die
+# gespeicherte Historie als rückwirkend angepasst gilt (Split/Dividende bei auto_adjust)
+ADJUST_TOLERANCE = 1e-4
+
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_DAY = 24 * 60 * NS_PER_MINUTE
+
+# Nach wie vielen Sekunden das fehlende Ende der Reihe nachgeladen wird
+REFRESH_SECONDS = {
+    "5m": 60,
+    "15m": 120,
+    "30m": 300,
+    "60m": 600,
+    "1d": 900,
+    "1wk": 3600,
+    "1mo": 3600,
+}
+
+
+def normalize_frame(data):
+    """Bringt einen yfinance-DataFrame in die Form des Bar-Stores (flache Spalten, sortierter Index, ohne NaN)."""
+    if data is None or data.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([]), dtype=float)
+
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.droplevel(1)
+
+    missing = set(REQUIRED_COLUMNS) - set(data.columns)
+    if missing:
+        raise ValueError(f"Fehlende Spalten: {missing}")
+
+    data = data.copy()
+    if 'Volume' not in data.columns:
+        data['Volume'] = np.nan
+
+    data = data[BAR_COLUMNS].astype(float)
+    data = data.dropna(subset=REQUIRED_COLUMNS)
+    data.index = pd.DatetimeIndex(data.index)
+    data = data[~data.index.duplicated(keep='last')].sort_index()
+    return data
+
+
+# Datenquellen -------------------------------------------------------------
+
+class YahooSource:
+    """Standard-Datenquelle: lädt Kerzen über yfinance."""
+
+    def fetch(self, ticker, interval, period=None, start=None):
+        import yfinance as yf
+
+        if start is not None:
+            data = yf.download(ticker, start=start, interval=interval, auto_adjust=True, progress=False)
+        else:
+            data = yf.download(ticker, period=period, interval=interval, auto_adjust=True, progress=False)
+        return normalize_frame(data)
+
+    def fetch_many(self, tickers, interval, period=None, start=None):
+        """Ein einziger yf.download für viele Ticker; Ergebnis: {ticker: DataFrame}."""
+        import yfinance as yf
+
+        kwargs = {"start": start} if start is not None else {"period": period}
+        data = yf.download(tickers, interval=interval, group_by="ticker", auto_adjust=True,
+                           progress=False, threads=True, **kwargs)
+
+        result = {}
+        for ticker in tickers:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                frame = data[ticker]
+            elif len(tickers) == 1:
+                frame = data
+            else:
+                continue
+            result[ticker] = normalize_frame(frame.dropna(how="all"))
+        return result
+
+
+class FrameSource:
+    """Lokale Datenquelle (z.B. für Tests): DataFrames im Speicher oder CSV-Dateien `<TICKER>_<interval>.csv`."""
+
+    def __init__(self, frames=None, csv_dir=None):
+        self.frames = frames or {}
+        self.csv_dir = csv_dir
+
+    def fetch(self, ticker, interval, period=None, start=None):
+        data = self.frames.get((ticker, interval))
+        if data is None and self.csv_dir:
+            path = os.path.join(self.csv_dir, f"{ticker}_{interval}.csv")
+            if os.path.exists(path):
+                data = pd.read_csv(path, index_col=0, parse_dates=True)
+        data = normalize_frame(data)
+
+        if start is not None and not data.empty:
+            data = data[data.index >= pd.Timestamp(start)]
+        elif period not in (None, "max") and not data.empty:
+            data = slice_period(data, period)
+        return data
+
+    def fetch_many(self, tickers, interval, period=None, start=None):
+        return {ticker: self.fetch(ticker, interval, period=period, start=start) for ticker in tickers}
+
+
+def source_from_env():
+    """BAR_SOURCE=csv:<ordner> nutzt lokale CSV-Dateien statt Yahoo."""
+    spec = os.environ.get("BAR_SOURCE", "yahoo")
+    if spec.startswith("csv:"):
+        return FrameSource(csv_dir=spec[len("csv:"):])
+    return YahooSource()
+
+
+# Zeitraum-Auswahl ---------------------------------------------------------
+
+def period_start(index, period):
+    """Erster Zeitpunkt, der zu einem yfinance-Zeitraum ("5d", "6mo", "10y", "ytd", "max") gehört."""
+    if len(index) == 0 or period in (None, "max"):
+        return None
+
+    last = index[-1]
+    if period == "ytd":
+        return pd.Timestamp(year=last.year, month=1, day=1, tz=last.tz)
+
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        raise ValueError(f"Ungültiger Zeitraum: {period}")
+    count, unit = int(match.group(1)), match.group(2)
+
+    if unit == "d":
+        # wie bei Yahoo: die letzten N Handelstage, nicht Kalendertage
+        days = index.normalize().unique()
+        return days[-count] if count <= len(days) else days[0]
+    if unit == "wk":
+        return last.normalize() - pd.DateOffset(weeks=count)
+    if unit == "mo":
+        return last.normalize() - pd.DateOffset(months=count)
+    return last.normalize() - pd.DateOffset(years=count)
+
+
+def slice_period(data, period):
+    start = period_start(data.index, period)
+    if start is None:
+        return data
+    return data[data.index >= start]
+
+
+# Speicherformat -----------------------------------------------------------
+#
+# Eine Datei pro (Ticker, Intervall): 16 Byte Kopf, danach Datensätze fester
+# Breite (int64 Zeitstempel in ns UTC + float64 OHLCV). Die Datei wird per
+# np.memmap eingeblendet, Ausschnitte sind Views ohne Kopie.
+
+BAR_MAGIC = b"BARS0001"
+HEADER_SIZE = 16
+BAR_DTYPE = np.dtype([
+    ('ts', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+
+
+def frame_to_records(data):
+    """DataFrame -> Datensätze im Speicherformat (Zeitstempel in UTC) und Zeitzone des Index."""
+    index = data.index
+    tz = str(index.tz) if index.tz is not None else None
+    if tz:
+        index = index.tz_convert("UTC").tz_localize(None)
+
+    records = np.empty(len(data), dtype=BAR_DTYPE)
+    records['ts'] = index.as_unit("ns").asi8
+    for col in BAR_COLUMNS:
+        records[col.lower()] = data[col].to_numpy(dtype=np.float64)
+    return records, tz
+
+
+class BarSeries:
+    """Lesesicht auf eine Kerzenreihe. Alle Spalten und Ausschnitte sind NumPy-Views."""
+
+    def __init__(self, records, tz=None, interval=None):
+        self.records = records
+        self.tz = tz
+        self.interval = interval
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def ts(self):
+        return self.records['ts']
+
+    @property
+    def open(self):
+        return self.records['open']
+
+    @property
+    def high(self):
+        return self.records['high']
+
+    @property
+    def low(self):
+        return self.records['low']
+
+    @property
+    def close(self):
+        return self.records['close']
+
+    @property
+    def volume(self):
+        return self.records['volume']
+
+    @property
+    def ohlc(self):
+        """(n, 4)-View auf Open/High/Low/Close – direkt als Modell-Eingabe nutzbar."""
+        if len(self.records) == 0:
+            return np.empty((0, 4))
+        return self.records.view('<f8').reshape(-1, 6)[:, 1:5]
+
+    def window(self, size=50):
+        """Die letzten `size` Kerzen als (1, size, 4)-View."""
+        return self.ohlc[-size:].reshape(1, size, 4)
+
+    def tail(self, n):
+        return BarSeries(self.records[-n:] if n else self.records[:0], self.tz, self.interval)
+
+    def index(self):
+        """Zeitstempel als DatetimeIndex (in der Zeitzone der Börse, falls bekannt)."""
+        index = pd.to_datetime(np.asarray(self.ts), unit="ns")
+        if self.tz:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        index.name = "Datetime" if self.interval in INTRADAY_INTERVALS else "Date"
+        return index
+
+    def timestamp(self, i):
+        ts = pd.Timestamp(int(self.ts[i]), unit="ns")
+        return ts.tz_localize("UTC").tz_convert(self.tz) if self.tz else ts
+
+    def since(self, period):
+        """Ausschnitt für einen yfinance-Zeitraum ("5d", "6mo", "max", ...) als View."""
+        if len(self.records) == 0 or period in (None, "max"):
+            return self
+
+        if re.fullmatch(r"\d+d", period):
+            # Handelstage lassen sich nur über die lokalen Kalendertage bestimmen
+            start = period_start(self.index(), period)
+        else:
+            start = period_start(pd.DatetimeIndex([self.timestamp(-1)]), period)
+
+        if start.tzinfo is not None:
+            start = start.tz_convert("UTC").tz_localize(None)
+        first = int(np.searchsorted(self.ts, start.as_unit("ns").value, side="left"))
+        return BarSeries(self.records[first:], self.tz, self.interval)
+
+    def resample(self, interval):
+        """Gröbere Kerzen (z.B. "15m" aus 5m, "1wk" aus 1d) als neue BarSeries."""
+        return BarSeries(resample_records(self.records, self.tz, interval), self.tz, interval)
+
+    def to_frame(self):
+        """Kopie als DataFrame im Format von yf.download (für Stellen, die Pandas brauchen)."""
+        columns = {col: np.array(self.records[col.lower()]) for col in BAR_COLUMNS}
+        return pd.DataFrame(columns, index=self.index())
+
+
+# Zusammenfassen ------------------------------------------------------------
+
+def _bucket_starts(local, interval):
+    """Beginn des Zeitraums (lokale ns), in den jede Kerze fällt – wie Yahoo in der Zeitzone der Börse."""
+    if interval == "1mo":
+        return local.astype("datetime64[ns]").astype("datetime64[M]").astype("datetime64[ns]").astype(np.int64)
+    if interval == "1wk":
+        days = local // NS_PER_DAY
+        # 1970-01-01 war ein Donnerstag; Wochen beginnen am Montag
+        return (days - (days + 3) % 7) * NS_PER_DAY
+    match = re.fullmatch(r"(\d+)m", interval)
+    if not match:
+        raise ValueError(f"Ungültiges Intervall: {interval}")
+    step = int(match.group(1)) * NS_PER_MINUTE
+    return local // step * step
+
+
+def resample_records(records, tz, interval):
+    """OHLCV-Zusammenfassung je Zeitraum: Open erste, High max, Low min, Close letzte, Volume Summe.
+
+    Der Zeitstempel ist der Beginn des Zeitraums (Montag, Monatserster, volle 15 Minuten).
+    """
+    if len(records) == 0:
+        return np.empty(0, dtype=BAR_DTYPE)
+
+    ts = np.asarray(records['ts'])
+    if tz:
+        local = pd.to_datetime(ts, unit="ns").tz_localize("UTC").tz_convert(tz).tz_localize(None).as_unit("ns").asi8
+    else:
+        local = ts
+    buckets = _bucket_starts(local, interval)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    result = np.empty(len(starts), dtype=BAR_DTYPE)
+    # gleiche UTC-Verschiebung wie die erste Kerze des Zeitraums
+    result['ts'] = ts[starts] - (local[starts] - buckets[starts])
+    result['open'] = records['open'][starts]
+    result['high'] = np.fmax.reduceat(records['high'], starts)
+    result['low'] = np.fmin.reduceat(records['low'], starts)
+    result['close'] = records['close'][ends]
+    volume = np.asarray(records['volume'])
+    result['volume'] = np.add.reduceat(np.nan_to_num(volume), starts)
+    # ohne jede Volumenangabe bleibt es NaN
+    result['volume'][np.logical_and.reduceat(np.isnan(volume), starts)] = np.nan
+    return result
+
+
+# Bar-Store ----------------------------------------------------------------
+
+def _safe_name(ticker):
+    return re.sub(r"[^A-Z0-9._^=-]", "_", ticker.upper())
+
+
+class BarStore:
+    """Persistenter Kerzen-Speicher je (Ticker, Intervall).
+
+    Beim ersten Zugriff wird die komplette verfügbare Historie geladen, danach
+    nur noch das fehlende Ende seit der letzten gespeicherten Kerze.
+    """
+
+    def __init__(self, root=None, source=None):
+        self.root = root or os.environ.get("BAR_STORE_DIR", "data/bars")
+        self.source = source or source_from_env()
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._maps = {}
+        self._resampled = {}
+
+    def _lock(self, key):
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def _path(self, ticker, interval, suffix=".bars"):
+        return os.path.join(self.root, _safe_name(ticker), interval + suffix)
+
+    # Lesen / Schreiben
+
+    def _read_meta(self, ticker, interval):
+        path = self._path(ticker, interval, ".json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_meta(self, ticker, interval, meta):
+        path = self._path(ticker, interval, ".json")
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def _records(self, ticker, interval):
+        """Eingeblendete Datensätze; die Abbildung wird wiederverwendet, solange sich die Datei nicht ändert."""
+        path = self._path(ticker, interval)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        key = (_safe_name(ticker), interval)
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        rows = (stat.st_size - HEADER_SIZE) // BAR_DTYPE.itemsize
+        if rows <= 0:
+            records = np.empty(0, dtype=BAR_DTYPE)
+        else:
+            records = np.memmap(path, dtype=BAR_DTYPE, mode='r', offset=HEADER_SIZE, shape=(rows,))
+        self._maps[key] = (signature, records)
+        return records
+
+    def _write(self, ticker, interval, stored, records, tz, fetched_at):
+        """Schreibt ab der ersten geänderten Kerze. Wird die Reihe kürzer, wird die Datei atomar ersetzt,
+        damit bereits eingeblendete Views gültig bleiben."""
+        path = self._path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if len(records) == 0:
+            # nichts Neues – nur den Abrufzeitpunkt merken
+            if len(stored):
+                self._write_meta(ticker, interval, {"tz": tz, "fetched_at": fetched_at})
+            return
+
+        if len(stored):
+            first = int(np.searchsorted(stored['ts'], records['ts'][0], side="left"))
+        else:
+            first = 0
+
+        if len(stored) and first + len(records) >= len(stored):
+            with open(path, "r+b") as f:
+                f.seek(HEADER_SIZE + first * BAR_DTYPE.itemsize)
+                f.write(records.tobytes())
+        else:
+            merged = np.concatenate([np.asarray(stored[:first]), records]) if len(stored) else records
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(BAR_MAGIC.ljust(HEADER_SIZE, b"\0"))
+                f.write(merged.tobytes())
+            os.replace(tmp, path)
+
+        self._write_meta(ticker, interval, {"tz": tz, "fetched_at": fetched_at})
+
+    # Aktualisieren
+
+    def _is_fresh(self, meta, interval):
+        return meta is not None and time.time() - meta["fetched_at"] < REFRESH_SECONDS[interval]
+
+    @staticmethod
+    def _adjusted(stored, records):
+        """Weichen abgeschlossene Kerzen (alle außer der letzten gespeicherten) im neuen Abruf ab?"""
+        if len(stored) < 2 or len(records) == 0:
+            return False
+        complete = stored[:-1]
+        overlap = records[(records['ts'] >= complete['ts'][0]) & (records['ts'] <= complete['ts'][-1])]
+        if len(overlap) == 0:
+            return False
+        positions = np.searchsorted(complete['ts'], overlap['ts'])
+        found = complete['ts'][np.minimum(positions, len(complete) - 1)] == overlap['ts']
+        old, new = complete['close'][positions[found]], overlap['close'][found]
+        return bool(np.any(np.abs(new - old) > ADJUST_TOLERANCE * np.abs(old)))
+
+    def _merge(self, ticker, interval, new):
+        """Neue Kerzen eines Tickers übernehmen (Aufrufer hält den Lock)."""
+        meta = self._read_meta(ticker, interval)
+        stored = self._records(ticker, interval)
+        records, new_tz = frame_to_records(new)
+        tz = (meta or {}).get("tz") or new_tz
+        if self._adjusted(stored, records):
+            # Yahoo hat die ganze Historie angepasst: komplett neu laden statt eine Stufe anzuhängen
+            print(f"Warnung: Kurse von {ticker} ({interval}) rückwirkend angepasst, lade komplette Historie neu")
+            try:
+                full = self.source.fetch(ticker, interval, period=MAX_PERIOD[interval])
+            except Exception as e:
+                # gespeicherte Daten behalten, beim nächsten Abruf erneut versuchen
+                print(f"Warnung: Neuladen von {ticker} ({interval}) fehlgeschlagen: {e}")
+                return
+            records, new_tz = frame_to_records(full)
+            self._write(ticker, interval, stored[:0], records, new_tz or tz, time.time())
+            return
+        self._write(ticker, interval, stored, records, tz, time.time())
+
+    def refresh(self, ticker, interval, force=False):
+        """Lädt nur das fehlende Ende seit der letzten gespeicherten Kerze nach."""
+        if interval not in MAX_PERIOD:
+            raise ValueError(f"Ungültiges Intervall: {interval}")
+        if interval in RESAMPLE_BASE:
+            return self.refresh(ticker, RESAMPLE_BASE[interval], force=force)
+
+        with self._lock((ticker.upper(), interval)):
+            meta = self._read_meta(ticker, interval)
+            if not force and self._is_fresh(meta, interval):
+                return
+
+            stored = self._records(ticker, interval)
+            tz = meta["tz"] if meta else None
+            try:
+                if len(stored) == 0:
+                    new = self.source.fetch(ticker, interval, period=MAX_PERIOD[interval])
+                else:
+                    # letzte Kerze erneut holen, da sie beim letzten Abruf evtl. noch nicht abgeschlossen war,
+                    # dazu die vorletzte (abgeschlossene) als Vergleich für rückwirkende Anpassungen
+                    new = self.source.fetch(ticker, interval, start=BarSeries(stored, tz).timestamp(-min(2, len(stored))))
+            except Exception as e:
+                if len(stored) == 0:
+                    raise
+                print(f"Warnung: Nachladen von {ticker} ({interval}) fehlgeschlagen, nutze gespeicherte Daten: {e}")
+                return
+
+            self._merge(ticker, interval, new)
+
+    def refresh_many(self, tickers, interval, force=False):
+        """Wie refresh, aber mit einem gebündelten Download je Gruppe (neu / nur Ende fehlt)."""
+        if interval not in MAX_PERIOD:
+            raise ValueError(f"Ungültiges Intervall: {interval}")
+        if interval in RESAMPLE_BASE:
+            return self.refresh_many(tickers, RESAMPLE_BASE[interval], force=force)
+        if not hasattr(self.source, "fetch_many"):
+            for ticker in tickers:
+                self.refresh(ticker, interval, force=force)
+            return
+
+        missing, stale, last_ts = [], [], []
+        for ticker in tickers:
+            meta = self._read_meta(ticker, interval)
+            if not force and self._is_fresh(meta, interval):
+                continue
+            stored = self._records(ticker, interval)
+            if len(stored) == 0:
+                missing.append(ticker)
+            else:
+                stale.append(ticker)
+                last_ts.append(int(stored['ts'][-min(2, len(stored))]))
+
+        groups = []
+        if missing:
+            groups.append((missing, {"period": MAX_PERIOD[interval]}))
+        if stale:
+            # gemeinsamer Start = älteste letzte Kerze; Überschneidungen ersetzt _write
+            start = pd.Timestamp(min(last_ts), unit="ns")
+            if interval in INTRADAY_INTERVALS:
+                start = start.tz_localize("UTC")
+            groups.append((stale, {"start": start}))
+
+        for group, kwargs in groups:
+            try:
+                frames = self.source.fetch_many(group, interval, **kwargs)
+            except Exception as e:
+                print(f"Warnung: Sammel-Download ({interval}, {len(group)} Ticker) fehlgeschlagen: {e}")
+                continue
+            for ticker, new in frames.items():
+                with self._lock((ticker.upper(), interval)):
+                    self._merge(ticker, interval, new)
+
+    def _derived(self, ticker, interval):
+        """Aus der Basis zusammengefasste Reihe; neu berechnet nur, wenn sich die Basis geändert hat."""
+        base = self.series(ticker, "max", RESAMPLE_BASE[interval])
+        key = (_safe_name(ticker), interval)
+        signature = (len(base), base.records[:1].tobytes(), base.records[-1:].tobytes())
+        cached = self._resampled.get(key)
+        if cached is None or cached[0] != signature:
+            cached = (signature, base.resample(interval))
+            self._resampled[key] = cached
+        return cached[1]
+
+    def series(self, ticker, period, interval):
+        """Kerzen eines Zeitraums als BarSeries (Views auf die eingeblendete Datei)."""
+        if interval in RESAMPLE_BASE:
+            if interval not in MAX_PERIOD:
+                raise ValueError(f"Ungültiges Intervall: {interval}")
+            return self._derived(ticker, interval).since(period)
+        self.refresh(ticker, interval)
+        with self._lock((ticker.upper(), interval)):
+            records = self._records(ticker, interval)
+            meta = self._read_meta(ticker, interval) or {}
+        return BarSeries(records, meta.get("tz"), interval).since(period)
+
+    def load(self, ticker, period, interval):
+        """Kerzen eines Zeitraums als DataFrame (Kopie)."""
+        return self.series(ticker, period, interval).to_frame()
+
+
+# Gemeinsamer Store für API und Modelle
+default_store = BarStore()
+
+
+def configure(root=None, source=None):
+    """Ersetzt den gemeinsamen Store, z.B. durch einen mit lokaler FrameSource in Tests."""
+    global default_store
+    default_store = BarStore(root=root, source=source)
+    return default_store
+
+
+def load_bars(ticker, period, interval):
+    return default_store.load(ticker, period, interval)
+
+
+def load_series(ticker, period, interval):
+    return default_store.series(ticker, period, interval)
+
@@ -0,0 +1,80 @@
+# backend/benchmarks/bench_indicators.py
+#
+# Vergleicht die Indikator-Engine mit der bisherigen Pandas-Berechnung aus get_stock.
+# Start aus dem backend-Ordner:  python -m benchmarks.bench_indicators
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicators import compute_indicators, output_columns, parse_indicators
+
+SIZES = [100, 10_000, 1_000_000]
+
+
+def pandas_reference(close):
+    """Die Indikatoren genau so, wie get_stock sie vorher mit Pandas berechnet hat."""
+    close = pd.Series(close)
+    result = {}
+    result['SMA_14'] = close.rolling(window=14).mean()
+    result['EMA_14'] = close.ewm(span=14, adjust=False).mean()
+    result['EMA_50'] = close.ewm(span=50, adjust=False).mean()
+
+    delta = close.diff()
+    gain = delta.clip(lower=0).rolling(window=14).mean()
+    loss = -delta.clip(upper=0).rolling(window=14).mean()
+    rs = gain / loss
+    result['RSI_14'] = 100 - (100 / (1 + rs))
+
+    result['Bollinger_Mid'] = close.rolling(window=20).mean()
+    boll_std = close.rolling(window=20).std()
+    result['Bollinger_Upper'] = result['Bollinger_Mid'] + (boll_std * 2)
+    result['Bollinger_Lower'] = result['Bollinger_Mid'] - (boll_std * 2)
+
+    exp1 = close.ewm(span=12, adjust=False).mean()
+    exp2 = close.ewm(span=26, adjust=False).mean()
+    result['MACD'] = exp1 - exp2
+    result['MACD_Signal'] = result['MACD'].ewm(span=9, adjust=False).mean()
+    return result
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    rng = np.random.default_rng(42)
+    specs = parse_indicators()
+    names = output_columns(specs)
+
+    print(f"{'Kerzen':>10} {'Pandas':>12} {'Engine':>12} {'Faktor':>8} {'max. Abw.':>12}")
+    for size in SIZES:
+        close = 100 + np.cumsum(rng.normal(0, 1, size))
+        close = np.abs(close) + 1
+        repeat = 3 if size >= 1_000_000 else 20
+        buffer = np.empty((len(names), size))
+
+        t_pandas = best_of(lambda: pandas_reference(close), repeat)
+        t_engine = best_of(lambda: compute_indicators(close, specs, out=buffer), repeat)
+
+        reference = pandas_reference(close)
+        engine = compute_indicators(close, specs)
+        deviation = 0.0
+        for name in names:
+            ref = reference[name].to_numpy()
+            assert np.array_equal(np.isnan(ref), np.isnan(engine[name])), name
+            valid = ~np.isnan(ref)
+            if valid.any():
+                deviation = max(deviation, float(np.max(np.abs(ref[valid] - engine[name][valid]))))
+
+        print(f"{size:>10} {t_pandas * 1000:>10.2f}ms {t_engine * 1000:>10.2f}ms {t_pandas / t_engine:>7.1f}x {deviation:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
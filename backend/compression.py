@@ -0,0 +1,50 @@
+# backend/compression.py
+#
+# Content-Encoding für Antworten: brotli, falls das Paket installiert ist und der
+# Client es annimmt, sonst gzip. Antworten aus dem Antwort-Cache werden je
+# Kodierung nur einmal komprimiert (siehe response_cache.py); alles andere
+# (z.B. /scan, /backtest) komprimiert die GZipMiddleware in main.py.
+
+import os
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional, nur gzip
+    brotli = None
+
+# kleinere Antworten lohnen den Aufwand nicht
+MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+# Qualität 11 ist für Antworten, die nur Minuten leben, zu langsam
+BROTLI_QUALITY = 5
+
+
+def _accepted(accept_encoding):
+    """Kodierungen aus Accept-Encoding, ohne die mit q=0."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding, size):
+    """"br", "gzip" oder None für eine Antwort mit `size` Bytes."""
+    if size < MIN_SIZE:
+        return None
+    accepted = _accepted(accept_encoding)
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unbekannte Kodierung: {encoding}")
@@ -0,0 +1,191 @@
+# backend/detection.py
+#
+# Eine Erkennungs-Pipeline für alle Modelle: Das 50-Kerzen-Fenster wird je
+# (Ticker, Intervall, letzte Kerze) einmal vorbereitet und gemerkt, beliebig
+# viele Modelle laufen in einer Anfrage darauf. Vorhersagen werden je
+# (Modell, Hash des Fensters) gemerkt – solange sich die letzte Kerze nicht
+# ändert, kommt das Ergebnis ohne Modellaufruf aus dem Memo.
+
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from fastapi import HTTPException
+
+from executors import predict_bounded
+from ml_model.registry import LABEL_FILES, class_names, get_predictor, variant_for
+from singleflight import fetch_series
+
+WINDOW_SIZE = 50
+
+# Klassen der Mehrklassen-Modelle ohne LabelEncoder (multi, multi_realistic, advanced)
+PATTERN_CLASSES = {0: "Kein Muster", 1: "Double Bottom", 2: "Wedge", 3: "Head and Shoulders"}
+# Binärmodell basic: Ausgabe > 0.5 heißt Klasse 1
+BASIC_CLASSES = {0: "No pattern", 1: "Head and Shoulders"}
+# so heißt "kein Muster" im LabelEncoder von real
+NO_PATTERN_LABEL = "No Pattern"
+
+# Datenbasis je Modell (Zeitraum, Intervall) – wie in den bisherigen detect-Endpunkten
+MODEL_DATA = {
+    "basic": ("10y", "1wk"),
+    "multi": ("3mo", "1d"),
+    "multi_realistic": ("6mo", "1d"),
+    "real": ("6mo", "1d"),
+}
+
+
+def model_classes(model_name):
+    """(Klasse -> Name, Klasse für "kein Muster") eines Modells; -1, wenn es keine solche Klasse gibt."""
+    if model_name == "basic":
+        return BASIC_CLASSES, 0
+    names = class_names(model_name)
+    if names is None:
+        # Encoder nicht ladbar: lieber "Unbekannt" als die Namen eines anderen Modells
+        return ({}, -1) if model_name in LABEL_FILES else (PATTERN_CLASSES, 0)
+    no_pattern = names.index(NO_PATTERN_LABEL) if NO_PATTERN_LABEL in names else -1
+    return dict(enumerate(names)), no_pattern
+
+
+def describe_prediction(model_name, row):
+    if model_name == "basic":
+        confidence = float(row[0])
+        return {"pattern": BASIC_CLASSES[int(confidence > 0.5)], "confidence": confidence}
+    names, _ = model_classes(model_name)
+    return {"pattern": names.get(int(np.argmax(row)), "Unbekannt"), "confidence": float(np.max(row))}
+
+
+def classify_batch(model_name, prediction):
+    """(Klassen, Konfidenzen) für eine ganze Batch-Ausgabe; Namen und "kein Muster" siehe model_classes."""
+    if model_name == "basic":
+        confidence = prediction[:, 0]
+        return (confidence > 0.5).astype(np.int16), confidence
+    return np.argmax(prediction, axis=1), np.max(prediction, axis=1)
+
+
+def pattern_label(model_name, pattern_class):
+    return model_classes(model_name)[0].get(pattern_class, "Unbekannt")
+
+
+class PreparedWindow:
+    """Letztes Fenster einer Kursreihe samt Hash und Kenndaten für die Antwort."""
+
+    __slots__ = ("window", "digest", "bars", "entry_point", "start_date", "end_date")
+
+    def __init__(self, series):
+        self.window = np.ascontiguousarray(series.window(WINDOW_SIZE), dtype=np.float32)
+        self.digest = hashlib.blake2b(self.window.tobytes(), digest_size=16).hexdigest()
+        self.bars = len(series)
+        self.entry_point = float(series.close[-1])
+        self.start_date = series.timestamp(-WINDOW_SIZE).strftime('%Y-%m-%d')
+        self.end_date = series.timestamp(-1).strftime('%Y-%m-%d')
+
+
+class _LRU:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class DetectionPipeline:
+    def __init__(self, max_windows=4096, max_predictions=16384):
+        self.windows = _LRU(max_windows)
+        self.predictions = _LRU(max_predictions)
+
+    async def prepare(self, ticker, interval):
+        """Kursreihe (ganze Historie) und vorbereitetes Fenster; gemerkt je letzter Kerze."""
+        history = await fetch_series(ticker, "max", interval)
+        if len(history) < WINDOW_SIZE:
+            return history, None
+        # letzte Kerze samt Werten: eine laufende Kerze, die sich ändert, gibt ein neues Fenster
+        key = (ticker.upper(), interval, len(history), history.records[-1].tobytes())
+        prepared = self.windows.get(key)
+        if prepared is None:
+            prepared = PreparedWindow(history)
+            self.windows.put(key, prepared)
+        return history, prepared
+
+    async def _predict(self, model, prepared):
+        # gleiche Eingabe, gleiches Modell (samt Variante) -> gleiches Ergebnis
+        key = (model, variant_for(model), prepared.digest)
+        result = self.predictions.get(key)
+        if result is None:
+            predictor = get_predictor(model)
+            if predictor is None:
+                raise HTTPException(status_code=501, detail=f"KI-Modell nicht verfügbar ({model})")
+            prediction = await predict_bounded(predictor, prepared.window)
+            result = describe_prediction(model, prediction[0])
+            self.predictions.put(key, result)
+        return result
+
+    async def detect(self, model, history, prepared):
+        period = MODEL_DATA[model][0]
+        # Zeitraum des Modells muss genug Kerzen enthalten (wie bisher je Endpunkt)
+        available = len(history.since(period))
+        if prepared is None or available < WINDOW_SIZE:
+            raise HTTPException(status_code=400,
+                                detail=f"Nicht genügend Kursdaten ({available}, mind. {WINDOW_SIZE} nötig)")
+        result = await self._predict(model, prepared)
+        return {**result, "entry_point": prepared.entry_point,
+                "start_date": prepared.start_date, "end_date": prepared.end_date}
+
+    async def run(self, ticker, models):
+        """{Modell: Ergebnis oder {"error": ...}} – Kurse je Intervall einmal laden, Modelle parallel."""
+        intervals = list(dict.fromkeys(MODEL_DATA[m][1] for m in models))
+        loaded = await asyncio.gather(*(self.prepare(ticker, i) for i in intervals), return_exceptions=True)
+        prepared_by_interval = dict(zip(intervals, loaded))
+
+        async def one(model):
+            loaded = prepared_by_interval[MODEL_DATA[model][1]]
+            if isinstance(loaded, BaseException):
+                raise loaded
+            return await self.detect(model, *loaded)
+
+        outcomes = await asyncio.gather(*(one(m) for m in models), return_exceptions=True)
+        results = {}
+        for model, outcome in zip(models, outcomes):
+            if isinstance(outcome, HTTPException):
+                results[model] = {"error": outcome.detail, "status": outcome.status_code}
+            elif isinstance(outcome, Exception):
+                results[model] = {"error": str(outcome), "status": 500}
+            else:
+                results[model] = outcome
+        return results
+
+    async def run_one(self, ticker, model):
+        """Ergebnis eines Modells; Fehler als HTTPException (für die Einzel-Endpunkte)."""
+        result = (await self.run(ticker, [model]))[model]
+        if "error" in result:
+            raise HTTPException(status_code=result["status"], detail=result["error"])
+        return result
+
+    def stats(self):
+        return {"windows": self.windows.stats(), "predictions": self.predictions.stats()}
+
+
+detection = DetectionPipeline()
@@ -0,0 +1,96 @@
+# backend/downsample.py
+#
+# Ausdünnen langer Kursreihen für den Chart (/stock?max_points=...). Der Chart
+# ist nur wenige tausend Pixel breit; mehr Kerzen kosten Übertragung und
+# Renderzeit, ohne dass man sie sieht. Zwei Verfahren:
+#   ohlc  benachbarte Kerzen zu einer zusammenfassen (Open erste, High max,
+#         Low min, Close letzte, Volume Summe) – Hochs und Tiefs bleiben erhalten
+#   lttb  Largest-Triangle-Three-Buckets: je Bucket die Zeile, die mit ihren
+#         Nachbarn das größte Dreieck im Schlusskurs bildet – Form der Linie bleibt
+# Indikatoren werden vorher auf voller Auflösung berechnet und hier nur
+# mitgenommen (ohlc: letzter Wert des Buckets, lttb: Wert der gewählten Zeile).
+
+import numpy as np
+
+METHODS = ("ohlc", "lttb")
+# kleinere Werte ergeben keinen sinnvollen Chart
+MIN_POINTS = 3
+
+
+def bucket_starts(n, max_points):
+    """Startzeilen von höchstens max_points etwa gleich großen, zusammenhängenden Buckets."""
+    return np.unique(np.linspace(0, n, max_points + 1)[:-1].astype(np.int64))
+
+
+def ohlc_aggregate(columns, max_points):
+    """Spalten von /stock zu höchstens max_points Kerzen zusammenfassen."""
+    n = len(columns["Close"])
+    if n <= max_points:
+        return columns
+    starts = bucket_starts(n, max_points)
+    ends = np.append(starts[1:], n) - 1
+
+    result = {}
+    for name, values in columns.items():
+        values = np.asarray(values)
+        if name in ("Date", "Time", "Open"):
+            # Kerze beginnt mit der ersten Zeile des Buckets
+            result[name] = values[starts]
+        elif name == "High":
+            result[name] = np.fmax.reduceat(values, starts)
+        elif name == "Low":
+            result[name] = np.fmin.reduceat(values, starts)
+        elif name == "Volume":
+            result[name] = np.add.reduceat(np.nan_to_num(values), starts)
+        else:
+            # Close und Indikatoren: Stand am Ende des Buckets
+            result[name] = values[ends]
+    return result
+
+
+def lttb_indices(x, y, max_points):
+    """Zeilen, die LTTB behält (erste und letzte immer)."""
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # innere Zeilen auf max_points - 2 Buckets verteilen
+    edges = 1 + np.linspace(0, n - 2, max_points - 1).astype(np.int64)
+    # Mittelpunkt je Bucket für den jeweils nächsten Bucket (letzter: der Endpunkt)
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts, y[-1])
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # doppelte Dreiecksfläche zu (vorheriger Punkt, Kandidat, Mittel des nächsten Buckets)
+        area = np.abs((x[a] - mean_x[b + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[b + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
+
+
+def lttb(columns, max_points, x):
+    """Spalten von /stock auf die von LTTB gewählten Zeilen (nach Schlusskurs) reduzieren."""
+    keep = lttb_indices(x, columns["Close"], max_points)
+    if len(keep) == len(columns["Close"]):
+        return columns
+    return {name: np.asarray(values)[keep] for name, values in columns.items()}
+
+
+def downsample(columns, max_points, method="ohlc", x=None):
+    """Höchstens max_points Zeilen; x sind die Zeitstempel (nur für lttb, sonst Zeilennummern)."""
+    if method not in METHODS:
+        raise ValueError(f"Unbekanntes Verfahren: {method} (erlaubt: {', '.join(METHODS)})")
+    if max_points < MIN_POINTS:
+        raise ValueError(f"max_points muss mindestens {MIN_POINTS} sein")
+    if method == "ohlc":
+        return ohlc_aggregate(columns, max_points)
+    if x is None:
+        x = np.arange(len(columns["Close"]))
+    return lttb(columns, max_points, x)
@@ -0,0 +1,132 @@
+# backend/executors.py
+#
+# Begrenzte Thread-Pools für alles, was den Event-Loop blockieren würde:
+#   io_pool        – Kursdaten laden (Netzwerk, Bar-Store)
+#   cpu_pool       – Indikatoren berechnen und Antworten serialisieren
+#   inference_pool – Forward-Pass der Modelle (von den BatchingPredictors genutzt)
+# Jeder Pool hat eine feste Zahl Threads und eine maximale Warteschlange. Wird
+# eine Aufgabe nicht innerhalb des Timeouts fertig, bekommt der Client 504
+# statt einer hängenden Verbindung.
+
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+FETCH_TIMEOUT = float(os.environ.get("FETCH_TIMEOUT", "20"))
+COMPUTE_TIMEOUT = float(os.environ.get("COMPUTE_TIMEOUT", "20"))
+INFERENCE_TIMEOUT = float(os.environ.get("INFERENCE_TIMEOUT", "10"))
+
+
+class PoolFull(Exception):
+    pass
+
+
+class BoundedExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor mit Warteschlangenlimit und Zählern für /metrics."""
+
+    def __init__(self, name, max_workers, max_queue):
+        super().__init__(max_workers=max_workers, thread_name_prefix=name)
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._counter_lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+
+    def submit(self, fn, *args, **kwargs):
+        with self._counter_lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise PoolFull(f"Warteschlange {self.name} voll ({self.max_queue})")
+            self.queued += 1
+        submitted = time.perf_counter()
+
+        def task():
+            with self._counter_lock:
+                self.queued -= 1
+                self.active += 1
+                self.wait_seconds += time.perf_counter() - submitted
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                with self._counter_lock:
+                    self.failed += 1
+                raise
+            finally:
+                with self._counter_lock:
+                    self.active -= 1
+                    self.completed += 1
+            return result
+
+        return super().submit(task)
+
+    async def run(self, fn, *args, timeout=None):
+        """`fn(*args)` im Pool ausführen; asyncio.TimeoutError nach `timeout` Sekunden."""
+        future = asyncio.get_running_loop().run_in_executor(self, fn, *args)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.count_timeout()
+            raise
+
+    def count_timeout(self):
+        with self._counter_lock:
+            self.timeouts += 1
+
+    def stats(self):
+        with self._counter_lock:
+            started = self.completed + self.active
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "queued": self.queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": 1000.0 * self.wait_seconds / started if started else 0.0,
+            }
+
+
+io_pool = BoundedExecutor("io", int(os.environ.get("IO_WORKERS", "16")), int(os.environ.get("IO_QUEUE", "256")))
+cpu_pool = BoundedExecutor("cpu", int(os.environ.get("CPU_WORKERS", str(min(4, os.cpu_count() or 1)))),
+                           int(os.environ.get("CPU_QUEUE", "256")))
+inference_pool = BoundedExecutor("inference", int(os.environ.get("INFERENCE_WORKERS", "2")),
+                                 int(os.environ.get("INFERENCE_QUEUE", "64")))
+
+POOLS = {pool.name: pool for pool in (io_pool, cpu_pool, inference_pool)}
+
+
+async def run_bounded(pool, fn, *args, timeout, what):
+    """Wie pool.run, aber mit HTTP-Fehlern: 504 bei Zeitüberschreitung, 503 bei voller Warteschlange."""
+    try:
+        return await pool.run(fn, *args, timeout=timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Zeitüberschreitung: {what} ({timeout:.0f}s)")
+    except PoolFull as e:
+        raise HTTPException(status_code=503, detail=f"Server ausgelastet: {e}")
+
+
+async def predict_bounded(predictor, x, timeout=INFERENCE_TIMEOUT):
+    """Modellvorhersage über den BatchingPredictor mit Timeout (504)."""
+    try:
+        return await asyncio.wait_for(predictor.predict(x), timeout)
+    except asyncio.TimeoutError:
+        inference_pool.count_timeout()
+        raise HTTPException(status_code=504, detail=f"Zeitüberschreitung: Modellvorhersage ({timeout:.0f}s)")
+    except PoolFull as e:
+        raise HTTPException(status_code=503, detail=f"Server ausgelastet: {e}")
+
+
+def metrics():
+    return {name: pool.stats() for name, pool in POOLS.items()}
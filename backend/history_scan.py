@@ -0,0 +1,165 @@
+# backend/history_scan.py
+#
+# Klassifiziert jedes 50-Kerzen-Fenster der gesamten Historie eines Tickers.
+# Die Fenster sind Views (sliding_window_view) auf die Kerzen des Bar-Stores und
+# werden blockweise in große Batches kopiert, damit auch 20+ Jahre Tageskerzen
+# den Speicher nicht sprengen. Bereits bewertete Fenster werden je
+# (Ticker, Intervall, Modell) gecacht, bei neuen Kerzen kommen nur die neuen
+# Fenster dazu. Ein Hash über die Kurse der gecachten Fenster erkennt, wenn der
+# Bar-Store die Historie nach einer Rückrechnung (Split, Dividende) neu geladen hat.
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from executors import io_pool, run_bounded, FETCH_TIMEOUT
+
+WINDOW_SIZE = 50
+HISTORY_CHUNK = 4096
+
+
+def sliding_windows(series, size=WINDOW_SIZE):
+    """(n - size + 1, size, 4)-View auf alle OHLC-Fenster, ohne Kopie."""
+    ohlc = series.ohlc
+    if len(ohlc) < size:
+        return np.empty((0, size, 4))
+    return np.lib.stride_tricks.sliding_window_view(ohlc, (size, 4))[:, 0]
+
+
+def prefix_digest(series, windows):
+    """Hash über die Kurse der ersten `windows` Fenster."""
+    ohlc = np.ascontiguousarray(series.ohlc[:windows + WINDOW_SIZE - 1])
+    return hashlib.blake2b(ohlc.tobytes(), digest_size=16).hexdigest()
+
+
+class _Scores:
+    def __init__(self, end_ts=None, classes=None, confidence=None, digest=""):
+        self.end_ts = end_ts if end_ts is not None else np.empty(0, dtype=np.int64)
+        self.classes = classes if classes is not None else np.empty(0, dtype=np.int16)
+        self.confidence = confidence if confidence is not None else np.empty(0, dtype=np.float32)
+        # Hash über die Kurse aller Fenster außer dem letzten (siehe score_history)
+        self.digest = digest
+
+
+class HistoryScanCache:
+    """Bewertete Fenster je Schlüssel, im Speicher (LRU) und optional als .npz auf der Platte."""
+
+    def __init__(self, directory=None, max_entries=128):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, "_".join(key).replace("/", "_") + ".npz")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.directory and os.path.exists(self._path(key)):
+            with np.load(self._path(key)) as data:
+                # Dateien ohne Hash werden einmal neu bewertet
+                digest = str(data["digest"]) if "digest" in data else ""
+                scores = _Scores(data["end_ts"], data["classes"], data["confidence"], digest)
+            self._remember(key, scores)
+            return scores
+        return _Scores()
+
+    def _remember(self, key, scores):
+        with self._lock:
+            self._entries[key] = scores
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, key, scores):
+        self._remember(key, scores)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._path(key) + ".tmp.npz"
+            np.savez(tmp, end_ts=scores.end_ts, classes=scores.classes, confidence=scores.confidence,
+                     digest=np.array(scores.digest))
+            os.replace(tmp, self._path(key))
+
+
+history_cache = HistoryScanCache(directory=os.environ.get("HISTORY_SCAN_DIR", "data/history_scan"))
+
+
+async def score_history(key, series, predict, classify, chunk=HISTORY_CHUNK):
+    """Klasse und Konfidenz für jedes Fenster der Reihe; nur noch nicht bewertete Fenster gehen ans Modell.
+
+    `predict(batch)` ist eine Coroutine-Funktion (z.B. BatchingPredictor.predict),
+    `classify(prediction)` macht aus einer Batch-Ausgabe (Klassen, Konfidenzen).
+    """
+    windows = sliding_windows(series)
+    total = len(windows)
+    end_ts = np.asarray(series.ts[WINDOW_SIZE - 1:])
+
+    # .npz lesen und schreiben nicht auf dem Event-Loop
+    cached = await run_bounded(io_pool, history_cache.get, key, timeout=FETCH_TIMEOUT, what="Historien-Cache")
+    reuse = 0
+    if len(cached.end_ts) and len(cached.end_ts) <= total and end_ts[len(cached.end_ts) - 1] == cached.end_ts[-1]:
+        # das letzte Fenster neu bewerten – seine letzte Kerze kann sich geändert haben
+        reuse = len(cached.end_ts) - 1
+        # gleiche Zeitstempel, aber rückwirkend angepasste Kurse: alles neu bewerten
+        if prefix_digest(series, reuse) != cached.digest:
+            reuse = 0
+
+    classes = np.empty(total, dtype=np.int16)
+    confidence = np.empty(total, dtype=np.float32)
+    classes[:reuse] = cached.classes[:reuse]
+    confidence[:reuse] = cached.confidence[:reuse]
+
+    for start in range(reuse, total, chunk):
+        stop = min(start + chunk, total)
+        batch = np.ascontiguousarray(windows[start:stop], dtype=np.float32)
+        prediction = await predict(batch)
+        classes[start:stop], confidence[start:stop] = classify(prediction)
+
+    if reuse < total:
+        scores = _Scores(end_ts.copy(), classes, confidence, prefix_digest(series, total - 1))
+        await run_bounded(io_pool, history_cache.put, key, scores, timeout=FETCH_TIMEOUT, what="Historien-Cache")
+    return classes, confidence
+
+
+def pattern_timeline(series, classes, confidence, label, no_pattern=0, min_confidence=0.5):
+    """Fasst aufeinanderfolgende Fenster mit gleichem Muster zu Abschnitten mit Start-/Enddatum zusammen."""
+    if len(classes) == 0:
+        return []
+
+    hit = (classes != no_pattern) & (confidence >= min_confidence)
+    marked = np.where(hit, classes, -1)
+    # Grenzen, an denen sich das (markierte) Muster ändert
+    change = np.flatnonzero(np.diff(marked)) + 1
+    starts = np.concatenate([[0], change])
+    stops = np.concatenate([change, [len(marked)]])
+    # Höchstwert je Abschnitt vor dem Filtern, sonst zählen die Fenster ohne Muster dahinter mit
+    peak = np.maximum.reduceat(confidence, starts)
+    keep = marked[starts] != -1
+    starts, stops, peak = starts[keep], stops[keep], peak[keep]
+
+    ts = series.ts
+    tz = series.tz
+
+    def date(i):
+        value = pd.Timestamp(int(ts[i]), unit="ns")
+        return (value.tz_localize("UTC").tz_convert(tz) if tz else value).strftime('%Y-%m-%d')
+
+    timeline = []
+    for first, stop, best in zip(starts, stops, peak):
+        last = stop - 1
+        timeline.append({
+            "pattern": label(int(classes[first])),
+            "confidence": float(best),
+            "start_date": date(first),
+            "end_date": date(last + WINDOW_SIZE - 1),
+            "windows": int(stop - first),
+            "entry_point": float(series.close[last + WINDOW_SIZE - 1]),
+        })
+    return timeline
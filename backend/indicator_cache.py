@@ -0,0 +1,180 @@
+# backend/indicator_cache.py
+#
+# Hält die Indikatoren je (Ticker, Intervall, Indikatorauswahl) über die ganze
+# gespeicherte Historie. Kommen nur neue Kerzen dazu (oder ändert sich die
+# letzte), wird der IndicatorState um diese Kerzen fortgeschrieben statt alles
+# neu zu rechnen. Ausgegebene Spalten sind Views auf einen Puffer, der danach nie
+# mehr geändert wird – Fortschreiben schreibt in einen neuen Puffer. Spalten und Zustand werden (gedrosselt) in INDICATOR_STATE_DIR
+# gesichert und nach einem Neustart dort weitergeführt.
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from indicators import IndicatorState, compute_indicators, output_columns
+
+# Ab so vielen neuen Kerzen ist die Batch-Berechnung schneller als Kerze für Kerze
+MAX_INCREMENTAL_BARS = 256
+# höchstens so oft wird ein Eintrag auf die Platte geschrieben
+SNAPSHOT_SECONDS = float(os.environ.get("INDICATOR_SNAPSHOT_SECONDS", "60"))
+
+
+def specs_key(specs):
+    return ",".join(f"{kind}{param or ''}" for kind, param in specs)
+
+
+class _Entry:
+    def __init__(self, specs):
+        self.names = output_columns(specs)
+        self.buffer = np.empty((len(self.names), 0))
+        self.count = 0
+        self.last_ts = None
+        # erste Kerze (Zeit, Schlusskurs): ändert sie sich, wurde die Historie ersetzt oder rückwirkend angepasst
+        self.anchor = None
+        self.state = None
+
+    def detach(self, n):
+        """Neuer Puffer für n Kerzen mit den bisherigen Werten; schon ausgegebene Views bleiben unverändert."""
+        fresh = np.empty((len(self.names), n))
+        fresh[:, :self.count] = self.buffer[:, :self.count]
+        self.buffer = fresh
+
+    def write(self, i, values):
+        for row, name in enumerate(self.names):
+            self.buffer[row, i] = values[name]
+
+    def columns(self):
+        return {name: self.buffer[row, :self.count] for row, name in enumerate(self.names)}
+
+    def matches(self, series):
+        """Passen die gespeicherten Kerzen noch zum Anfang von `series`?"""
+        m = self.count
+        return (
+            self.state is not None
+            and 0 < m <= len(series)
+            and int(series.ts[m - 1]) == self.last_ts
+            and (int(series.ts[0]), float(series.close[0])) == tuple(self.anchor)
+        )
+
+
+class IndicatorCache:
+    """LRU-begrenzter Speicher für Indikatorreihen mit inkrementeller Fortschreibung."""
+
+    def __init__(self, max_entries=256, snapshot_dir=None, snapshot_seconds=SNAPSHOT_SECONDS):
+        self.max_entries = max_entries
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_seconds = snapshot_seconds
+        self._entries = OrderedDict()
+        self._saved_at = {}
+        self._lock = threading.Lock()
+
+    def _snapshot_path(self, key):
+        ticker, interval, spec = key
+        name = f"{ticker}_{interval}_{spec}.state.npz".replace(",", "-")
+        return os.path.join(self.snapshot_dir, name)
+
+    def _snapshot_due(self, key):
+        """Zu sichernde Daten, falls der Eintrag wieder geschrieben werden soll (Aufrufer hält den Lock)."""
+        if not self.snapshot_dir:
+            return None
+        now = time.monotonic()
+        if now - self._saved_at.get(key, -np.inf) < self.snapshot_seconds:
+            return None
+        self._saved_at[key] = now
+        entry = self._entries[key]
+        meta = {"count": entry.count, "last_ts": entry.last_ts, "anchor": entry.anchor,
+                "names": entry.names, **entry.state.checkpoint()}
+        # der Puffer wird nicht mehr verändert, ein View reicht
+        return key, json.dumps(meta), entry.buffer[:, :entry.count]
+
+    def _save_snapshot(self, key, meta, values):
+        # außerhalb des Locks: andere Ticker warten nicht auf die Platte
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            path = self._snapshot_path(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp.npz"
+            np.savez(tmp, values=values, meta=np.array(meta))
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Warnung: Indikator-Zustand {key} nicht gesichert: {e}")
+
+    def load_snapshot(self, ticker, interval, specs):
+        """Gesicherter Eintrag (z.B. nach einem Neustart) oder None."""
+        if not self.snapshot_dir:
+            return None
+        path = self._snapshot_path((ticker.upper(), interval, specs_key(specs)))
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta, values = json.loads(str(data["meta"])), data["values"]
+            entry = _Entry(specs)
+            if meta["names"] != entry.names or values.shape != (len(entry.names), meta["count"]):
+                return None
+            entry.buffer = np.array(values)
+            entry.count, entry.last_ts, entry.anchor = meta["count"], meta["last_ts"], meta["anchor"]
+            entry.state = IndicatorState.from_checkpoint(meta)
+            return entry
+        except Exception as e:
+            print(f"Warnung: Indikator-Zustand {path} nicht lesbar: {e}")
+            return None
+
+    def columns(self, ticker, interval, specs, series):
+        """Indikatorspalten (unveränderliche Views) für die komplette `series`, inkrementell aktualisiert."""
+        key = (ticker.upper(), interval, specs_key(specs))
+        n = len(series)
+        if n == 0:
+            return {name: np.empty(0) for name in output_columns(specs)}
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            # nach einem Neustart: gesicherten Stand übernehmen und nur das Ende fortschreiben
+            entry = self.load_snapshot(ticker, interval, specs)
+
+        with self._lock:
+            entry = self._entries.get(key, entry)
+            m = entry.count if entry is not None else 0
+            incremental = entry is not None and entry.matches(series) and n - m <= MAX_INCREMENTAL_BARS
+
+            if incremental:
+                if n == m and float(series.close[-1]) == entry.state.last_close:
+                    self._entries[key] = entry
+                    return entry.columns()
+                close = series.close
+                # nicht in den Puffer schreiben, dessen Views andere Anfragen gerade serialisieren
+                entry.detach(n)
+                # letzte bekannte Kerze kann sich seit dem letzten Abruf noch geändert haben
+                entry.write(m - 1, entry.state.revise(float(close[m - 1])))
+                for i in range(m, n):
+                    entry.write(i, entry.state.update(float(close[i])))
+            else:
+                entry = _Entry(specs)
+                entry.detach(n)
+                values = compute_indicators(series.close, specs, out=entry.buffer[:, :n])
+                entry.state = IndicatorState.from_history(series.close, specs, values)
+
+            entry.count = n
+            entry.last_ts = int(series.ts[n - 1])
+            entry.anchor = [int(series.ts[0]), float(series.close[0])]
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            columns = entry.columns()
+            snapshot = self._snapshot_due(key)
+
+        if snapshot is not None:
+            self._save_snapshot(*snapshot)
+        return columns
+
+
+# Gemeinsamer Cache für die API
+indicator_cache = IndicatorCache(snapshot_dir=os.environ.get("INDICATOR_STATE_DIR", "data/indicator_state"))
@@ -0,0 +1,481 @@
+# backend/indicators.py
+#
+# Indikator-Engine: berechnet eine angefragte Menge von Indikatoren über ein
+# NumPy-Array. Alle Ergebnisse landen in einem einzigen, vorab allokierten
+# Puffer; gemeinsame Zwischenergebnisse (Präfixsummen, EMAs) werden nur einmal
+# berechnet, auch wenn mehrere Indikatoren sie brauchen.
+
+import re
+
+import numpy as np
+
+# Bisheriger Umfang von /stock – wird geliefert, wenn nichts angefragt wird
+DEFAULT_INDICATORS = "sma14,ema14,ema50,rsi14,bollinger,macd"
+
+BOLLINGER_WINDOW = 20
+BOLLINGER_WIDTH = 2
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+
+
+def parse_indicators(spec=None):
+    """"rsi14,macd" -> [("rsi", 14), ("macd", None)]. Unbekannte Namen -> ValueError."""
+    spec = spec or DEFAULT_INDICATORS
+    parsed = []
+    for token in spec.split(","):
+        token = token.strip().lower()
+        if not token:
+            continue
+        match = re.fullmatch(r"(sma|ema|rsi|bollinger|macd)(\d*)", token)
+        if not match:
+            raise ValueError(f"Unbekannter Indikator: {token}")
+        kind, number = match.group(1), match.group(2)
+
+        if kind == "macd":
+            if number:
+                raise ValueError(f"Unbekannter Indikator: {token}")
+            param = None
+        elif kind == "bollinger":
+            param = int(number) if number else BOLLINGER_WINDOW
+        else:
+            if not number:
+                raise ValueError(f"Periode fehlt: {token}")
+            param = int(number)
+
+        if param is not None and param < 1:
+            raise ValueError(f"Ungültige Periode: {token}")
+        if (kind, param) not in parsed:
+            parsed.append((kind, param))
+    return parsed
+
+
+def output_columns(specs):
+    """Spaltennamen in der Form, die /stock schon immer geliefert hat (SMA_14, RSI_14, ...)."""
+    names = []
+    for kind, param in specs:
+        if kind == "sma":
+            names.append(f"SMA_{param}")
+        elif kind == "ema":
+            names.append(f"EMA_{param}")
+        elif kind == "rsi":
+            names.append(f"RSI_{param}")
+        elif kind == "bollinger":
+            suffix = "" if param == BOLLINGER_WINDOW else f"_{param}"
+            names += [f"Bollinger_Mid{suffix}", f"Bollinger_Upper{suffix}", f"Bollinger_Lower{suffix}"]
+        elif kind == "macd":
+            names += ["MACD", "MACD_Signal"]
+    return names
+
+
+# Kernel -------------------------------------------------------------------
+
+def _prefix_sum(x, shift):
+    """Präfixsummen von (x - shift) mit führender 0; das Zentrieren hält die Summen klein."""
+    out = np.empty(len(x) + 1)
+    out[0] = 0.0
+    np.cumsum(x - shift, out=out[1:])
+    return out
+
+
+def _rolling_mean(prefix, window, shift, out):
+    """pandas rolling(window).mean(): NaN, bis das erste Fenster voll ist."""
+    n = len(out)
+    out[:min(window - 1, n)] = np.nan
+    if n >= window:
+        np.subtract(prefix[window:], prefix[:-window], out=out[window - 1:])
+        out[window - 1:] /= window
+        out[window - 1:] += shift
+
+
+def _rolling_std(x, window, mean, out):
+    """pandas rolling(window).std() (ddof=1): Summe der quadrierten Abweichungen,
+    aufaddiert über die `window` Verschiebungen statt über jedes Fenster einzeln."""
+    n = len(x)
+    out[:min(window - 1, n)] = np.nan
+    if n < window:
+        return
+    if window == 1:
+        out[:] = np.nan
+        return
+
+    m = n - window + 1
+    acc = out[window - 1:]
+    centre = mean[window - 1:]
+    scratch = np.empty(m)
+    acc[:] = 0.0
+    for k in range(window):
+        np.subtract(x[k:k + m], centre, out=scratch)
+        np.multiply(scratch, scratch, out=scratch)
+        acc += scratch
+    acc /= window - 1
+    np.sqrt(acc, out=acc)
+
+
+def _ema(x, span, out):
+    """pandas ewm(span, adjust=False).mean() ohne Python-Schleife pro Kerze.
+
+    Innerhalb eines Blocks gilt y[j] = b^(j+1)*c + a*b^j * cumsum(x[k]*b^-k);
+    die Blockgröße ist so gewählt, dass b^-k nicht überläuft.
+    """
+    n = len(x)
+    if n == 0:
+        return
+    a = 2.0 / (span + 1.0)
+    b = 1.0 - a
+    if b == 0.0:
+        out[:] = x
+        return
+
+    block = int(max(1, min(8192, n, 600.0 / -np.log(b))))
+    j = np.arange(block)
+    grow = b ** -j
+    decay = b ** j
+    carry_decay = decay * b
+
+    scratch = np.empty(block)
+    carry = x[0]
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        m = stop - start
+        np.multiply(x[start:stop], grow[:m], out=scratch[:m])
+        np.cumsum(scratch[:m], out=scratch[:m])
+        np.multiply(scratch[:m], decay[:m], out=out[start:stop])
+        out[start:stop] *= a
+        out[start:stop] += carry_decay[:m] * carry
+        carry = out[stop - 1]
+
+
+def _rsi(x, window, out):
+    """RSI wie bisher in get_stock: einfache gleitende Mittel von Gewinn und Verlust."""
+    n = len(x)
+    out[:min(window, n)] = np.nan
+    if n <= window:
+        return
+
+    delta = np.diff(x)
+    gain = np.clip(delta, 0, None)
+    loss = np.clip(-delta, 0, None)
+
+    gain_sum = np.cumsum(gain)
+    loss_sum = np.cumsum(loss)
+    avg_gain = gain_sum[window - 1:].copy()
+    avg_gain[1:] -= gain_sum[:-window]
+    avg_loss = loss_sum[window - 1:].copy()
+    avg_loss[1:] -= loss_sum[:-window]
+    # Rundungsreste der Differenzen dürfen nicht negativ werden
+    np.maximum(avg_gain, 0, out=avg_gain)
+    np.maximum(avg_loss, 0, out=avg_loss)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        out[window:] = 100 - (100 / (1 + rs))
+
+
+def compute_indicators(close, specs=None, out=None):
+    """Berechnet alle angefragten Indikatoren über `close`.
+
+    Gibt ein dict Spaltenname -> Array zurück; die Arrays sind Zeilen eines
+    gemeinsamen (k, n)-Puffers, der optional mitgegeben werden kann.
+    """
+    if specs is None or isinstance(specs, str):
+        specs = parse_indicators(specs)
+    x = np.ascontiguousarray(close, dtype=np.float64)
+    n = len(x)
+
+    names = output_columns(specs)
+    if out is None:
+        out = np.empty((len(names), n))
+    result = dict(zip(names, out))
+
+    shift = x[0] if n else 0.0
+    prefix = None
+    emas = {}
+
+    def ema(span):
+        if span not in emas:
+            if f"EMA_{span}" in result:
+                target = result[f"EMA_{span}"]
+            else:
+                target = np.empty(n)
+            _ema(x, span, target)
+            emas[span] = target
+        return emas[span]
+
+    for kind, param in specs:
+        if kind in ("sma", "bollinger") and prefix is None:
+            prefix = _prefix_sum(x, shift)
+
+        if kind == "sma":
+            _rolling_mean(prefix, param, shift, result[f"SMA_{param}"])
+        elif kind == "ema":
+            ema(param)
+        elif kind == "rsi":
+            _rsi(x, param, result[f"RSI_{param}"])
+        elif kind == "bollinger":
+            suffix = "" if param == BOLLINGER_WINDOW else f"_{param}"
+            mid = result[f"Bollinger_Mid{suffix}"]
+            upper = result[f"Bollinger_Upper{suffix}"]
+            lower = result[f"Bollinger_Lower{suffix}"]
+            _rolling_mean(prefix, param, shift, mid)
+            _rolling_std(x, param, mid, upper)
+            upper *= BOLLINGER_WIDTH
+            np.subtract(mid, upper, out=lower)
+            upper += mid
+        elif kind == "macd":
+            macd = result["MACD"]
+            np.subtract(ema(MACD_FAST), ema(MACD_SLOW), out=macd)
+            _ema(macd, MACD_SIGNAL, result["MACD_Signal"])
+
+    return result
+
+
+# Laufender Zustand --------------------------------------------------------
+#
+# Für neue Kerzen muss nicht die ganze Historie neu gerechnet werden: jeder
+# Tracker hält nur, was er für den nächsten Wert braucht (Ringpuffer mit
+# laufenden Summen, letzte EMA-Werte) und rückt in O(1) pro Kerze vor.
+
+class _Ring:
+    """Ringpuffer fester Länge mit laufender Summe und Quadratsumme (relativ zu `ref`)."""
+
+    def __init__(self, size, values=(), ref=None):
+        self.size = size
+        self.values = list(values)[-size:]
+        self.ref = ref if ref is not None else (self.values[0] if self.values else 0.0)
+        self._resync()
+
+    def _resync(self):
+        # exakt neu summieren, damit sich keine Rundungsfehler aufsummieren
+        self.sum = sum(v - self.ref for v in self.values)
+        self.sumsq = sum((v - self.ref) ** 2 for v in self.values)
+        self.pushes = 0
+
+    def push(self, value):
+        d = value - self.ref
+        self.sum += d
+        self.sumsq += d * d
+        self.values.append(value)
+        if len(self.values) > self.size:
+            old = self.values.pop(0) - self.ref
+            self.sum -= old
+            self.sumsq -= old * old
+        self.pushes += 1
+        if self.pushes >= self.size:
+            self.ref = self.values[0]
+            self._resync()
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def mean(self):
+        return self.sum / self.size + self.ref
+
+    def std(self):
+        if self.size < 2:
+            return np.nan
+        var = (self.sumsq - self.sum * self.sum / self.size) / (self.size - 1)
+        return float(np.sqrt(max(var, 0.0)))
+
+    def state(self):
+        return {"values": list(self.values), "ref": self.ref}
+
+    @classmethod
+    def from_state(cls, size, state):
+        return cls(size, state["values"], state["ref"])
+
+
+def _ema_step(previous, value, span):
+    if previous is None or np.isnan(previous):
+        return value
+    a = 2.0 / (span + 1.0)
+    return a * value + (1.0 - a) * previous
+
+
+class IndicatorState:
+    """Indikator-Zustand einer Reihe, der Kerze für Kerze fortgeschrieben wird.
+
+    `update` hängt eine neue Kerze an, `revise` ersetzt die letzte (z.B. die
+    noch laufende Intraday-Kerze). Beides kostet O(1) je Indikator.
+    """
+
+    def __init__(self, specs=None):
+        if specs is None or isinstance(specs, str):
+            specs = parse_indicators(specs)
+        self.specs = specs
+        self.names = output_columns(specs)
+        self.count = 0
+        self.last_close = None
+        self.rings = {}
+        self.emas = {}
+        self.macd = {}
+        self.rsi = {}
+        self._previous = None
+
+    # Aufbau
+
+    @classmethod
+    def from_history(cls, close, specs=None, values=None):
+        """Zustand nach dem Durchlaufen von `close`; `values` = Ergebnis von compute_indicators, falls vorhanden.
+
+        Die letzte Kerze wird per `update` angehängt, damit sie anschließend mit `revise` ersetzt werden kann.
+        """
+        state = cls(specs)
+        close = np.asarray(close, dtype=np.float64)
+        if len(close) == 0:
+            return state
+        if len(close) == 1:
+            state.update(close[0])
+            return state
+        if values is None:
+            values = compute_indicators(close, state.specs)
+
+        head = close[:-1]
+        state.count = len(head)
+        state.last_close = float(head[-1])
+        for kind, param in state.specs:
+            if kind in ("sma", "bollinger"):
+                state.rings[param] = _Ring(param, head[-param:].tolist())
+            elif kind == "ema":
+                state.emas[param] = float(values[f"EMA_{param}"][-2])
+            elif kind == "rsi":
+                delta = np.diff(head[-(param + 1):])
+                state.rsi[param] = {
+                    "gain": _Ring(param, np.clip(delta, 0, None).tolist(), 0.0),
+                    "loss": _Ring(param, np.clip(-delta, 0, None).tolist(), 0.0),
+                }
+            elif kind == "macd":
+                state.macd = {
+                    "fast": _ema_at(head, MACD_FAST, values),
+                    "slow": _ema_at(head, MACD_SLOW, values),
+                    "signal": float(values["MACD_Signal"][-2]),
+                }
+        state.update(close[-1])
+        return state
+
+    # Fortschreiben
+
+    def update(self, close):
+        """Neue Kerze anhängen; gibt die Indikatorwerte dieser Kerze zurück."""
+        self._previous = self.snapshot()
+        self._push(float(close))
+        return self.values()
+
+    def revise(self, close):
+        """Letzte Kerze durch einen neuen Schlusskurs ersetzen."""
+        if self._previous is None:
+            raise ValueError("Keine Kerze zum Ersetzen vorhanden.")
+        previous = self._previous
+        self.restore(previous)
+        return self.update(close)
+
+    def _push(self, value):
+        for kind, param in self.specs:
+            if kind in ("sma", "bollinger"):
+                self.rings.setdefault(param, _Ring(param))
+        for ring in self.rings.values():
+            ring.push(value)
+
+        for kind, param in self.specs:
+            if kind == "ema":
+                self.emas[param] = _ema_step(self.emas.get(param), value, param)
+            elif kind == "rsi" and self.last_close is not None:
+                rings = self.rsi.setdefault(param, {"gain": _Ring(param, ref=0.0), "loss": _Ring(param, ref=0.0)})
+                delta = value - self.last_close
+                rings["gain"].push(max(delta, 0.0))
+                rings["loss"].push(max(-delta, 0.0))
+            elif kind == "macd":
+                self.macd["fast"] = _ema_step(self.macd.get("fast"), value, MACD_FAST)
+                self.macd["slow"] = _ema_step(self.macd.get("slow"), value, MACD_SLOW)
+                macd = self.macd["fast"] - self.macd["slow"]
+                self.macd["signal"] = _ema_step(self.macd.get("signal"), macd, MACD_SIGNAL)
+
+        self.last_close = value
+        self.count += 1
+
+    def values(self):
+        """Aktuelle Indikatorwerte (Spaltenname -> float, NaN solange das Fenster nicht voll ist)."""
+        out = {}
+        for kind, param in self.specs:
+            if kind == "sma":
+                ring = self.rings.get(param)
+                out[f"SMA_{param}"] = ring.mean() if ring is not None and ring.full else np.nan
+            elif kind == "ema":
+                out[f"EMA_{param}"] = self.emas.get(param, np.nan)
+            elif kind == "rsi":
+                rings = self.rsi.get(param)
+                if rings is None or not rings["gain"].full:
+                    out[f"RSI_{param}"] = np.nan
+                    continue
+                gain, loss = max(rings["gain"].mean(), 0.0), max(rings["loss"].mean(), 0.0)
+                if loss == 0.0:
+                    out[f"RSI_{param}"] = 100.0 if gain > 0.0 else np.nan
+                else:
+                    out[f"RSI_{param}"] = 100 - (100 / (1 + gain / loss))
+            elif kind == "bollinger":
+                suffix = "" if param == BOLLINGER_WINDOW else f"_{param}"
+                ring = self.rings.get(param)
+                if ring is None or not ring.full:
+                    mid = std = np.nan
+                else:
+                    mid, std = ring.mean(), ring.std()
+                out[f"Bollinger_Mid{suffix}"] = mid
+                out[f"Bollinger_Upper{suffix}"] = mid + std * BOLLINGER_WIDTH
+                out[f"Bollinger_Lower{suffix}"] = mid - std * BOLLINGER_WIDTH
+            elif kind == "macd":
+                if self.macd:
+                    out["MACD"] = self.macd["fast"] - self.macd["slow"]
+                    out["MACD_Signal"] = self.macd["signal"]
+                else:
+                    out["MACD"] = out["MACD_Signal"] = np.nan
+        return out
+
+    # Sichern / Wiederherstellen
+
+    def snapshot(self):
+        """JSON-fähiger Schnappschuss des Zustands."""
+        return {
+            "specs": [[kind, param] for kind, param in self.specs],
+            "count": self.count,
+            "last_close": self.last_close,
+            "rings": {str(size): ring.state() for size, ring in self.rings.items()},
+            "emas": {str(span): value for span, value in self.emas.items()},
+            "macd": dict(self.macd),
+            "rsi": {str(size): {side: ring.state() for side, ring in rings.items()} for size, rings in self.rsi.items()},
+        }
+
+    def restore(self, snapshot):
+        self.specs = [(kind, param) for kind, param in snapshot["specs"]]
+        self.names = output_columns(self.specs)
+        self.count = snapshot["count"]
+        self.last_close = snapshot["last_close"]
+        self.rings = {int(size): _Ring.from_state(int(size), state) for size, state in snapshot["rings"].items()}
+        self.emas = {int(span): value for span, value in snapshot["emas"].items()}
+        self.macd = dict(snapshot["macd"])
+        self.rsi = {
+            int(size): {side: _Ring.from_state(int(size), state) for side, state in rings.items()}
+            for size, rings in snapshot["rsi"].items()
+        }
+        return self
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls([]).restore(snapshot)
+
+    def checkpoint(self):
+        """Wie snapshot, aber mit dem Stand vor der letzten Kerze, damit `revise` nach dem Laden funktioniert."""
+        return {"state": self.snapshot(), "previous": self._previous}
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint):
+        state = cls.from_snapshot(checkpoint["state"])
+        state._previous = checkpoint["previous"]
+        return state
+
+
+def _ema_at(head, span, values):
+    """EMA-Wert an der vorletzten Kerze – aus dem Batch-Ergebnis, falls dort vorhanden."""
+    if f"EMA_{span}" in values:
+        return float(values[f"EMA_{span}"][-2])
+    out = np.empty(len(head))
+    _ema(np.ascontiguousarray(head, dtype=np.float64), span, out)
+    return float(out[-1])
@@ -0,0 +1,210 @@
+# backend/live.py
+#
+# Live-Kerzen per WebSocket: Jeder Client bekommt beim Verbinden einmal den
+# kompletten Chart (wie /stock?format=columns) und danach nur noch neue oder
+# geänderte Kerzen samt fortgeschriebenen Indikatoren. Pro (Ticker, Zeitraum,
+# Indikatoren) läuft genau ein Poller, egal wie viele Clients zuschauen.
+#
+# Nachrichten (Text-Frames, JSON):
+#   {"type": "snapshot", "data": {"Date": [...], "Close": [...], ...}}
+#   {"type": "update",   "data": {...nur geänderte/neue Zeilen...}}
+#   {"type": "error",    "detail": "..."}
+# Ein Client ersetzt Kerzen mit gleichem Datum und hängt neue an.
+
+import os
+import asyncio
+
+from fastapi import WebSocketDisconnect
+
+from executors import cpu_pool, run_bounded, COMPUTE_TIMEOUT
+from indicator_cache import specs_key
+from serialization import columns_to_json, to_json
+from singleflight import fetch_series, computations
+from stock_view import STOCK_INTERVALS, stock_body, stock_body_key, stock_columns
+
+# Wie oft der Bar-Store gefragt wird; nachgeladen wird dort nur nach REFRESH_SECONDS
+POLL_SECONDS = float(os.environ.get("LIVE_POLL_SECONDS", "15"))
+# Nachrichten, die für einen langsamen Client liegen bleiben dürfen
+SUBSCRIBER_QUEUE = 32
+
+
+def _message(kind, body):
+    # body ist bereits serialisiertes JSON
+    return '{"type":"%s","data":%s}' % (kind, body.decode())
+
+
+class _Channel:
+    def __init__(self, ticker, interval, specs):
+        self.ticker = ticker
+        self.interval = interval
+        self.period, self.bar_interval = STOCK_INTERVALS[interval]
+        self.specs = specs
+        self.subscribers = set()
+        self.task = None
+        # Abonnieren und Verteilen nacheinander: der Snapshot eines neuen Clients und
+        # die Updates danach gehen vom selben Stand aus
+        self.lock = asyncio.Lock()
+        # Stand der zuletzt verteilten Historie
+        self.history = None
+        self.count = 0
+        self.last_ts = None
+        self.last_bar = None
+
+    def remember(self, history):
+        n = len(history)
+        self.history = history
+        self.count = n
+        self.last_ts = int(history.ts[-1]) if n else None
+        self.last_bar = history.records[-1].tolist() if n else None
+
+    def diff(self, history):
+        """Nachricht für alles, was sich seit dem letzten Stand geändert hat (oder None)."""
+        n = len(history)
+        m = self.count
+        if n == 0:
+            return None
+        if m == 0 or n < m or int(history.ts[m - 1]) != self.last_ts:
+            # Historie wurde ersetzt: alle bekommen einen neuen Snapshot
+            bars = history.since(self.period)
+            body = stock_body(self.ticker, self.bar_interval, self.specs, history, bars, "columns")
+            self.remember(history)
+            return _message("snapshot", body)
+
+        start = m - 1 if history.records[m - 1].tolist() != self.last_bar else m
+        if start >= n:
+            return None
+        columns = stock_columns(self.ticker, self.bar_interval, self.specs, history, start=start)
+        self.remember(history)
+        return _message("update", columns_to_json(columns, int_columns=("Volume",)))
+
+
+class LiveHub:
+    """Verteilt Kerzen-Updates an alle Abonnenten eines Kanals."""
+
+    def __init__(self, poll_seconds=POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._channels = {}
+        # Statistik
+        self.messages = 0
+        self.dropped = 0
+
+    def _channel(self, ticker, interval, specs):
+        key = (ticker.upper(), interval, specs_key(specs))
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = _Channel(ticker.upper(), interval, specs)
+            self._channels[key] = channel
+        return key, channel
+
+    async def _subscribe(self, ticker, interval, specs):
+        """Kanal, Warteschlange und die Historie, von der der Snapshot des Clients ausgehen muss."""
+        key, channel = self._channel(ticker, interval, specs)
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+        async with channel.lock:
+            # Updates verteilt der Poller nur unter dem Lock, also erst nach diesem Stand
+            channel.subscribers.add(queue)
+            if channel.task is None or channel.task.done():
+                channel.task = asyncio.ensure_future(self._poll(key, channel))
+            if channel.history is None:
+                try:
+                    channel.remember(await fetch_series(channel.ticker, "max", channel.bar_interval))
+                except Exception:
+                    # der Poller beendet sich und räumt den Kanal ab, wenn sonst niemand zuhört
+                    self._unsubscribe(channel, queue)
+                    raise
+            return channel, queue, channel.history
+
+    def _unsubscribe(self, channel, queue):
+        channel.subscribers.discard(queue)
+        # der Poller beendet sich selbst, sobald niemand mehr zuhört
+
+    def _broadcast(self, channel, message):
+        for queue in list(channel.subscribers):
+            try:
+                queue.put_nowait(message)
+                self.messages += 1
+            except asyncio.QueueFull:
+                # Client kommt nicht hinterher: Verbindung wird geschlossen, er lädt neu
+                self.dropped += 1
+                channel.subscribers.discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def _poll(self, key, channel):
+        # den ersten Stand merkt sich _subscribe
+        while channel.subscribers:
+            await asyncio.sleep(self.poll_seconds)
+            if not channel.subscribers:
+                break
+            try:
+                history = await fetch_series(channel.ticker, "max", channel.bar_interval)
+                async with channel.lock:
+                    message = await run_bounded(cpu_pool, channel.diff, history,
+                                                timeout=COMPUTE_TIMEOUT, what=f"Live-Update {channel.ticker}")
+                    if message is not None:
+                        self._broadcast(channel, message)
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e)
+                self._broadcast(channel, to_json({"type": "error", "detail": detail}).decode())
+        if self._channels.get(key) is channel:
+            del self._channels[key]
+
+    async def _snapshot(self, channel, history):
+        bars = history.since(channel.period)
+        # gleicher Schlüssel wie /stock?format=columns: gleichzeitige Abrufe teilen sich die Arbeit
+        body = await computations.do(
+            stock_body_key(channel.ticker, channel.bar_interval, channel.period, channel.specs, "columns"),
+            lambda: run_bounded(cpu_pool, stock_body, channel.ticker, channel.bar_interval, channel.specs,
+                                history, bars, "columns", timeout=COMPUTE_TIMEOUT,
+                                what=f"Indikatoren {channel.ticker}"),
+        )
+        return _message("snapshot", body)
+
+    async def serve(self, websocket, ticker, interval, specs):
+        """Bedient eine angenommene WebSocket-Verbindung bis der Client geht."""
+        channel = queue = receiver = None
+        try:
+            try:
+                channel, queue, history = await self._subscribe(ticker, interval, specs)
+                await websocket.send_text(await self._snapshot(channel, history))
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e)
+                await websocket.send_text(to_json({"type": "error", "detail": detail}).decode())
+                return
+
+            # eingehende Nachrichten werden ignoriert, nur das Schließen zählt
+            receiver = asyncio.ensure_future(websocket.receive_text())
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    message = getter.result()
+                    if message is None:
+                        await websocket.close(code=1013)
+                        return
+                    await websocket.send_text(message)
+                else:
+                    getter.cancel()
+                if receiver in done:
+                    receiver.result()  # WebSocketDisconnect beim Schließen
+                    receiver = asyncio.ensure_future(websocket.receive_text())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            if receiver is not None:
+                receiver.cancel()
+            if channel is not None:
+                self._unsubscribe(channel, queue)
+
+    def stats(self):
+        return {
+            "channels": len(self._channels),
+            "subscribers": sum(len(c.subscribers) for c in self._channels.values()),
+            "messages": self.messages,
+            "dropped": self.dropped,
+        }
+
+
+live_hub = LiveHub()
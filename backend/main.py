@@ -1,13 +1,39 @@
-from fastapi import FastAPI, HTTPException, Query
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-import yfinance as yf
-import pandas as pd
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
 import numpy as np
-from tensorflow.keras.models import load_model
-import datetime
-from ml_model.pattern_detection import detect_advanced_patterns
-
-app = FastAPI()
+from ml_model.pattern_detection import detect_advanced_patterns, evaluate_rules, rule_classes, rule_names, RULE_NAMES
+from ml_model.registry import get_predictor, loaded_predictors, variant_for
+from indicators import parse_indicators
+from indicator_cache import specs_key
+from stock_view import STOCK_INTERVALS, STOCK_FORMATS, stock_body, stock_body_key, downsample_shape
+from downsample import METHODS as DOWNSAMPLE_METHODS, MIN_POINTS
+from scan import scan_stream
+from universes import get_universe
+from response_cache import response_cache, cached, cache_response
+from live import live_hub
+from history_scan import score_history, pattern_timeline, sliding_windows as history_windows
+from executors import cpu_pool, run_bounded, predict_bounded, COMPUTE_TIMEOUT, metrics
+from singleflight import fetch_series, fetches, computations
+from detection import detection, MODEL_DATA, describe_prediction, classify_batch, pattern_label, model_classes
+from backtest import STRATEGIES, parse_grid, combinations, sweep_series, run as run_backtest
+from serialization import format_dates, to_json, BINARY_MEDIA_TYPE
+from compression import MIN_SIZE as MIN_COMPRESS_SIZE
+from warmup import warmup
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Watchlist im Hintergrund warm halten (warmup.py); der Start wartet nicht darauf
+    warmup.start()
+    yield
+    await warmup.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS erlauben
 app.add_middleware(
@@ -18,307 +44,324 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# KI Modell
-try:
-    model_basic = load_model('ml_model/pattern_model.h5')                   # 1. einfaches Modell (nur Head&Shoulders)
-    model_multi = load_model('ml_model/pattern_multi_model.h5')              # 2. KI für mehrere einfache Muster
-    model_multi_realistic = load_model('ml_model/pattern_multi_model_realistic.h5')  # 3. realistische multiple Muster
-    model_real = load_model('ml_model/pattern_real_model.h5')                # 4. echtes realistisches Modell
-except Exception:
-    print("Warnung: Modelle konnten nicht geladen werden.")
-    model_basic = None
-    model_multi = None
-    model_multi_realistic = None
-    model_real = None
+# gzip für alle übrigen Antworten; gecachte Antworten kommen schon komprimiert
+# (brotli/gzip, siehe compression.py) und werden hier durchgereicht
+app.add_middleware(GZipMiddleware, minimum_size=MIN_COMPRESS_SIZE)
+
+# KI Modelle werden erst bei der ersten Anfrage geladen (ml_model/registry.py),
+# Erkennung für alle Modelle über eine gemeinsame Pipeline (detection.py)
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
-@app.get("/detect/{ticker}")
-async def detect_pattern(ticker: str):
-    if model_basic is None:
-        raise HTTPException(status_code=501, detail="KI-Modell nicht verfügbar")
-    
-    data = yf.download(ticker, period="10y", interval="1wk")
-
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.droplevel(1)
-
-    if data.empty:
-        raise HTTPException(status_code=400, detail="Keine Marktdaten verfügbar")
-
-    required_columns = ['Open', 'High', 'Low', 'Close']
-    if not set(required_columns).issubset(data.columns):
-        raise HTTPException(status_code=400, detail=f"Fehlende Spalten: {set(required_columns) - set(data.columns)}")
-
-    data = data.dropna(subset=required_columns)
-
-    if len(data) < 50:
-        raise HTTPException(status_code=400, detail=f"Nicht genügend Kursdaten ({len(data)} Tage, mind. 50 nötig)")
+# Auslastung der Pools und Batching-Statistik je Modell
+@app.get("/metrics")
+async def get_metrics():
+    return {
+        "pools": metrics(),
+        "singleflight": {"fetch": fetches.stats(), "compute": computations.stats()},
+        "response_cache": response_cache.stats(),
+        "live": live_hub.stats(),
+        "detection": detection.stats(),
+        "warmup": warmup.stats(),
+        "models": {name: predictor.stats() for name, predictor in loaded_predictors().items()},
+    }
 
-    data_array = data[required_columns].values[-50:]
+# Mustererkennung mit beliebig vielen Modellen auf demselben Fenster,
+# z.B. /detect/AAPL?models=real,multi,basic; ohne models wie bisher nur das Basic-Modell
+@app.get("/detect/{ticker}")
+async def detect_pattern(ticker: str, request: Request, models: str = Query(default=None)):
+    if models is None:
+        return await detect_basic(ticker, request)
 
-    try:
-        prediction = model_basic.predict(data_array.reshape(1, 50, 4))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Fehler bei Modellvorhersage: {str(e)}")
+    names = list(dict.fromkeys(m.strip() for m in models.split(",") if m.strip()))
+    if not names:
+        raise HTTPException(status_code=400, detail="Keine Modelle angegeben")
+    unknown = [m for m in names if m not in MODEL_DATA]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unbekanntes Modell: {', '.join(unknown)}")
 
-    confidence = float(prediction[0][0])
+    # Fenster und Vorhersagen sind gemerkt (detection.py), Fehler einzelner Modelle stehen im Ergebnis
+    return {"ticker": ticker.upper(), "results": await detection.run(ticker, names)}
 
-    return {
-        "pattern": "Head and Shoulders" if confidence > 0.5 else "No pattern",
-        "confidence": confidence,
-        "entry_point": float(data['Close'].iloc[-1])
-    }
+@cache_response("detect_pattern", "1wk", "basic")
+async def detect_basic(ticker: str, request: Request):
+    return await detection.run_one(ticker, "basic")
 
 @app.get("/stock/{ticker}")
-async def get_stock(ticker: str, interval: str = Query(default="1d")):
+async def get_stock(ticker: str, request: Request, interval: str = Query(default="1d"),
+                    format: str = Query(default=None), indicators: str = Query(default=None),
+                    max_points: int = Query(default=None), downsample: str = Query(default="ohlc")):
     try:
-        print(f"Abruf: {ticker} mit Interval: {interval}")
-
-        # Dynamische Einstellungen
-        if interval == "1d":
-            yf_period = "5d"
-            yf_interval = "5m"
-        elif interval == "5d":
-            yf_period = "5d"
-            yf_interval = "15m"
-        elif interval == "1mo":
-            yf_period = "1mo"
-            yf_interval = "30m"
-        elif interval == "3mo":
-            yf_period = "3mo"
-            yf_interval = "60m"
-        elif interval == "6mo":
-            yf_period = "6mo"
-            yf_interval = "1d"
-        elif interval == "1y":
-            yf_period = "1y"
-            yf_interval = "1d"
-        elif interval == "5y":
-            yf_period = "5y"
-            yf_interval = "1wk"
-        elif interval == "10y":
-            yf_period = "10y"
-            yf_interval = "1wk"  # Wochenkerzen
-        elif interval == "ytd":
-            yf_period = "ytd"
-            yf_interval = "1d"
-        elif interval == "max":
-            yf_period = "max"
-            yf_interval = "1wk"
-        else:
+        # z.B. ?indicators=rsi14,macd – ohne Angabe alle bisherigen Indikatoren
+        try:
+            specs = parse_indicators(indicators)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # Format per ?format=rows|columns|binary oder Accept-Header (Standard: Zeilen als JSON)
+        if format is None:
+            format = "binary" if BINARY_MEDIA_TYPE in request.headers.get("accept", "") else "rows"
+        if format not in STOCK_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unbekanntes Format: {format}")
+        media_type = BINARY_MEDIA_TYPE if format == "binary" else "application/json"
+
+        # z.B. ?max_points=2000 – lange Zeiträume serverseitig ausdünnen
+        if downsample not in DOWNSAMPLE_METHODS:
+            raise HTTPException(status_code=400, detail=f"Unbekanntes Verfahren: {downsample}")
+        if max_points is not None and max_points < MIN_POINTS:
+            raise HTTPException(status_code=400, detail=f"max_points muss mindestens {MIN_POINTS} sein")
+        shape = downsample_shape(max_points, downsample)
+
+        # Zeitraum und Kerzenintervall je Chart-Zeitraum
+        if interval not in STOCK_INTERVALS:
             raise HTTPException(status_code=400, detail="Ungültiges Intervall")
-
-        if interval == "10y":
-            end_date = datetime.datetime.today()
-            start_date = end_date - datetime.timedelta(days=365*10)
-            yf_data = yf.download(ticker, start=start_date, end=end_date, interval="1mo", auto_adjust=True)
-        else:
-            yf_data = yf.download(ticker, period=yf_period, interval=yf_interval, auto_adjust=True)
-
-        if isinstance(yf_data.columns, pd.MultiIndex):
-            yf_data.columns = yf_data.columns.droplevel(1)
-
-        if yf_data.empty:
-            raise HTTPException(status_code=404, detail="Keine Kursdaten gefunden")
-
-        yf_data = yf_data.reset_index()
-
-        # Technische Indikatoren
-        yf_data['SMA_14'] = yf_data['Close'].rolling(window=14).mean()
-        yf_data['EMA_14'] = yf_data['Close'].ewm(span=14, adjust=False).mean()
-        yf_data['EMA_50'] = yf_data['Close'].ewm(span=50, adjust=False).mean()
-
-        delta = yf_data['Close'].diff()
-        gain = delta.clip(lower=0).rolling(window=14).mean()
-        loss = -delta.clip(upper=0).rolling(window=14).mean()
-        rs = gain / loss
-        yf_data['RSI_14'] = 100 - (100 / (1 + rs))
-
-        yf_data['Bollinger_Mid'] = yf_data['Close'].rolling(window=20).mean()
-        boll_std = yf_data['Close'].rolling(window=20).std()
-        yf_data['Bollinger_Upper'] = yf_data['Bollinger_Mid'] + (boll_std * 2)
-        yf_data['Bollinger_Lower'] = yf_data['Bollinger_Mid'] - (boll_std * 2)
-
-
-        exp1 = yf_data['Close'].ewm(span=12, adjust=False).mean()
-        exp2 = yf_data['Close'].ewm(span=26, adjust=False).mean()
-        yf_data['MACD'] = exp1 - exp2
-        yf_data['MACD_Signal'] = yf_data['MACD'].ewm(span=9, adjust=False).mean()
-
-        yf_data = yf_data.replace([np.inf, -np.inf], np.nan)
-        yf_data = yf_data.fillna(value=np.nan)
-
-        # Jetzt korrekt
-        filtered = yf_data
-
-        result = []
-        for _, row in filtered.iterrows():
-            result.append({
-                "Date": str(row["Datetime"]) if "Datetime" in row else str(row["Date"]),
-                "Open": float(row["Open"]) if not pd.isna(row["Open"]) else None,
-                "High": float(row["High"]) if not pd.isna(row["High"]) else None,
-                "Low": float(row["Low"]) if not pd.isna(row["Low"]) else None,
-                "Close": float(row["Close"]) if not pd.isna(row["Close"]) else None,
-                "Volume": int(row["Volume"]) if not pd.isna(row["Volume"]) else None,
-                "SMA_14": float(row["SMA_14"]) if not pd.isna(row["SMA_14"]) else None,
-                "EMA_14": float(row["EMA_14"]) if not pd.isna(row["EMA_14"]) else None,
-                "EMA_50": float(row["EMA_50"]) if not pd.isna(row["EMA_50"]) else None,
-                "RSI_14": float(row["RSI_14"]) if not pd.isna(row["RSI_14"]) else None,
-                "Bollinger_Mid": float(row["Bollinger_Mid"]) if not pd.isna(row["Bollinger_Mid"]) else None,
-                "Bollinger_Upper": float(row["Bollinger_Upper"]) if not pd.isna(row["Bollinger_Upper"]) else None,
-                "Bollinger_Lower": float(row["Bollinger_Lower"]) if not pd.isna(row["Bollinger_Lower"]) else None,
-                "MACD": float(row["MACD"]) if not pd.isna(row["MACD"]) else None,
-                "MACD_Signal": float(row["MACD_Signal"]) if not pd.isna(row["MACD_Signal"]) else None,
-            })
-
-        return result
-
+        yf_period, yf_interval = STOCK_INTERVALS[interval]
+
+        async def compute():
+            # Indikatoren laufen über die ganze gespeicherte Historie und werden bei neuen
+            # Kerzen nur fortgeschrieben; ausgeliefert wird der angefragte Zeitraum
+            history = await fetch_series(ticker, "max", yf_interval)
+            bars = history.since(yf_period)
+
+            if len(bars) == 0:
+                raise HTTPException(status_code=404, detail="Keine Kursdaten gefunden")
+
+            # gleichzeitige identische Anfragen teilen sich Berechnung und Serialisierung
+            return await computations.do(
+                stock_body_key(ticker, yf_interval, yf_period, specs, format, max_points, downsample),
+                lambda: run_bounded(cpu_pool, stock_body, ticker, yf_interval, specs, history, bars, format,
+                                    max_points, downsample,
+                                    timeout=COMPUTE_TIMEOUT, what=f"Indikatoren {ticker}"),
+            )
+
+        # fertige Antwort je (Ticker, Zeitraum, Indikatoren, Format); Lebensdauer nach Kerzenintervall
+        return await cached(request, ("stock", ticker.upper(), interval, specs_key(specs), format, shape),
+                            yf_interval, compute, media_type)
+
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Serverfehler: {str(e)}")
 
-        raise HTTPException(status_code=500, detail=f"Serverfehler: {str(e)}")
-# Einfaches KI Modell
-# Einfaches Basic Modell
-@app.get("/detect_real/{ticker}")
-async def detect_real(ticker: str):
-    try:
-        if model_real is None:
-            raise HTTPException(status_code=501, detail="Echtes Modell nicht verfügbar")
-
-        data = yf.download(ticker, period="6mo", interval="1d", auto_adjust=True)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
-
-        if data.empty or len(data) < 50:
-            raise HTTPException(status_code=400, detail="Keine gültigen Daten")
-
-        required_columns = ['Open', 'High', 'Low', 'Close']
-        data = data.dropna(subset=required_columns)
-
-        X = data[required_columns].values[-50:].reshape(1, 50, 4)
-        prediction = model_real.predict(X)
-        prediction_class = np.argmax(prediction)
-
-        classes = {0: "Kein Muster", 1: "Double Bottom", 2: "Wedge", 3: "Head and Shoulders"}
 
-        # Start und Enddatum (z.B. die letzten 50 Tage)
-        start_date = data.index[-50].strftime('%Y-%m-%d')
-        end_date = data.index[-1].strftime('%Y-%m-%d')
+# Live-Chart: einmal Snapshot, danach nur neue/geänderte Kerzen
+@app.websocket("/ws/stock/{ticker}")
+async def stock_stream(websocket: WebSocket, ticker: str, interval: str = "1d", indicators: str = None):
+    if interval not in STOCK_INTERVALS:
+        await websocket.close(code=1008, reason="Ungültiges Intervall")
+        return
+    try:
+        specs = parse_indicators(indicators)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
 
-        return {
-            "pattern": classes.get(prediction_class, "Unbekannt"),
-            "confidence": float(np.max(prediction)),
-            "entry_point": float(data['Close'].iloc[-1]),
-            "start_date": start_date,
-            "end_date": end_date
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    await websocket.accept()
+    await live_hub.serve(websocket, ticker, interval, specs)
 
+# Einzelne Modelle (gleiche Pipeline wie /detect?models=...)
+@app.get("/detect_real/{ticker}")
+@cache_response("detect_real", "1d", "real")
+async def detect_real(ticker: str, request: Request):
+    return await detection.run_one(ticker, "real")
 
 # Multimuster Dummy Modell
 @app.get("/detect_multi/{ticker}")
-async def detect_multi(ticker: str):
-    try:
-        if model_multi is None:
-            raise HTTPException(status_code=501, detail="Multi-Modell nicht verfügbar")
-
-        data = yf.download(ticker, period="3mo", interval="1d", auto_adjust=True)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
-
-        if data.empty or len(data) < 50:
-            raise HTTPException(status_code=400, detail="Keine gültigen Daten")
-
-        required_columns = ['Open', 'High', 'Low', 'Close']
-        data = data.dropna(subset=required_columns)
-
-        X = data[required_columns].values[-50:].reshape(1, 50, 4)
-        prediction = model_multi.predict(X)
-        prediction_class = np.argmax(prediction)
-
-        classes = {0: "Kein Muster", 1: "Double Bottom", 2: "Wedge", 3: "Head and Shoulders"}
-
-        return {
-            "pattern": classes.get(prediction_class, "Unbekannt"),
-            "confidence": float(np.max(prediction)),
-            "entry_point": float(data['Close'].iloc[-1])
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@cache_response("detect_multi", "1d", "multi")
+async def detect_multi(ticker: str, request: Request):
+    return await detection.run_one(ticker, "multi")
 
 # Realistische Multi-Muster
 @app.get("/detect_multi_real/{ticker}")
-async def detect_multi_real(ticker: str):
-    try:
-        if model_multi_realistic is None:
-            raise HTTPException(status_code=501, detail="Realistisches Multi-Modell nicht verfügbar")
-
-        data = yf.download(ticker, period="6mo", interval="1d", auto_adjust=True)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
-
-        if data.empty or len(data) < 50:
-            raise HTTPException(status_code=400, detail="Keine gültigen Daten")
-
-        required_columns = ['Open', 'High', 'Low', 'Close']
-        data = data.dropna(subset=required_columns)
-
-        X = data[required_columns].values[-50:].reshape(1, 50, 4)
-        prediction = model_multi_realistic.predict(X)
-        prediction_class = np.argmax(prediction)
+@cache_response("detect_multi_real", "1d", "multi_realistic")
+async def detect_multi_real(ticker: str, request: Request):
+    return await detection.run_one(ticker, "multi_realistic")
+
+# Ganze Watchlists scannen (NDJSON-Stream, eine Zeile je Ticker)
+@app.get("/scan")
+async def scan(tickers: str = Query(default=None), universe: str = Query(default=None), model: str = Query(default="real"),
+               prefilter: bool = Query(default=False)):
+    if model not in MODEL_DATA:
+        raise HTTPException(status_code=400, detail=f"Unbekanntes Modell: {model}")
+    predictor = get_predictor(model)
+    if predictor is None:
+        raise HTTPException(status_code=501, detail="KI-Modell nicht verfügbar")
 
-        classes = {0: "Kein Muster", 1: "Double Bottom", 2: "Wedge", 3: "Head and Shoulders"}
+    symbols = []
+    if tickers:
+        symbols += [t.strip().upper() for t in tickers.split(",") if t.strip()]
+    if universe:
+        try:
+            symbols += get_universe(universe)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="Keine Ticker angegeben")
+
+    period, interval = MODEL_DATA[model]
+    stream = scan_stream(symbols, period, interval, predictor, lambda row: describe_prediction(model, row),
+                         prefilter=prefilter)
+    return StreamingResponse(stream, media_type="application/x-ndjson")
+
+# Alle 50-Kerzen-Fenster der Historie klassifizieren und als Zeitleiste zurückgeben
+def history_key(ticker, interval, period, model):
+    # Variante (int8, pruned, ...) gehört dazu – wie im Memo der Detection-Pipeline
+    return (ticker.upper(), interval, period, model, variant_for(model) or "float32")
+
+
+@app.get("/detect_history/{ticker}")
+async def detect_history(ticker: str, model: str = Query(default="real"), interval: str = Query(default=None),
+                         period: str = Query(default="max"), min_confidence: float = Query(default=0.5)):
+    if model not in MODEL_DATA:
+        raise HTTPException(status_code=400, detail=f"Unbekanntes Modell: {model}")
+    predictor = get_predictor(model)
+    if predictor is None:
+        raise HTTPException(status_code=501, detail="KI-Modell nicht verfügbar")
 
-        return {
-            "pattern": classes.get(prediction_class, "Unbekannt"),
-            "confidence": float(np.max(prediction)),
-            "entry_point": float(data['Close'].iloc[-1])
-        }
+    interval = interval or MODEL_DATA[model][1]
+    try:
+        data = await fetch_series(ticker, period, interval)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        # ungültiger Zeitraum oder ungültiges Intervall
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=f"Fehler beim Laden der Kursdaten: {str(e)}")
+
+    if len(data) < 50:
+        raise HTTPException(status_code=400, detail=f"Nicht genügend Kursdaten ({len(data)}, mind. 50 nötig)")
 
-# Echtes realistisches Modell
-@app.get("/detect_real/{ticker}")
-async def detect_real(ticker: str):
     try:
-        if model_real is None:
-            raise HTTPException(status_code=501, detail="Echtes Modell nicht verfügbar")
+        classes, confidence = await score_history(
+            history_key(ticker, interval, period, model), data,
+            lambda batch: predict_bounded(predictor, batch),
+            lambda prediction: classify_batch(model, prediction),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler bei Modellvorhersage: {str(e)}")
 
-        data = yf.download(ticker, period="6mo", interval="1d", auto_adjust=True)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.droplevel(1)
+    return {
+        "ticker": ticker.upper(),
+        "model": model,
+        "interval": interval,
+        "windows": int(len(classes)),
+        "patterns": pattern_timeline(data, classes, confidence, lambda c: pattern_label(model, c),
+                                     no_pattern=model_classes(model)[1], min_confidence=min_confidence),
+    }
 
-        if data.empty or len(data) < 50:
-            raise HTTPException(status_code=400, detail="Keine gültigen Daten")
+# Schnelle Regel-Erkennung ohne KI-Modell: letztes Fenster und Zeitleiste über den Zeitraum
+@app.get("/detect_rules/{ticker}")
+async def detect_rules(ticker: str, interval: str = Query(default="1d"), period: str = Query(default="1y")):
+    try:
+        data = await fetch_series(ticker, period, interval)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fehler beim Laden der Kursdaten: {str(e)}")
 
-        required_columns = ['Open', 'High', 'Low', 'Close']
-        data = data.dropna(subset=required_columns)
+    if len(data) < 50:
+        raise HTTPException(status_code=400, detail=f"Nicht genügend Kursdaten ({len(data)}, mind. 50 nötig)")
 
-        X = data[required_columns].values[-50:].reshape(1, 50, 4)
-        prediction = model_real.predict(X)
-        prediction_class = np.argmax(prediction)
+    hits = evaluate_rules(history_windows(data))
+    classes = rule_classes(hits)
+    return {
+        "ticker": ticker.upper(),
+        "interval": interval,
+        "pattern": RULE_NAMES[int(classes[-1])],
+        "rules": rule_names(hits[-1]),
+        "entry_point": float(data.close[-1]),
+        "start_date": data.timestamp(-50).strftime('%Y-%m-%d'),
+        "end_date": data.timestamp(-1).strftime('%Y-%m-%d'),
+        "windows": int(len(classes)),
+        "patterns": pattern_timeline(data, classes, np.ones(len(classes), dtype=np.float32),
+                                     lambda c: RULE_NAMES[c]),
+    }
 
-        classes = {0: "Kein Muster", 1: "Double Bottom", 2: "Wedge", 3: "Head and Shoulders"}
+# Backtest einer Strategie über die ganze Historie, z.B.
+# /backtest/AAPL?strategy=rsi&low=25,30&hold=5,10  (Listen = Parameter-Sweep)
+# /backtest/AAPL?strategy=pattern&model=real&pattern=1&stop=0.05
+@app.get("/backtest/{ticker}")
+async def backtest_ticker(ticker: str, request: Request, strategy: str = Query(default="rsi"),
+                          interval: str = Query(default="1d"), period: str = Query(default="max"),
+                          model: str = Query(default="rules"), trades: int = Query(default=100)):
+    reserved = {"strategy", "interval", "period", "model", "trades"}
+    try:
+        grid = parse_grid([f"{k}={v}" for k, v in request.query_params.items() if k not in reserved])
+        combinations(strategy, grid)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if strategy == "pattern":
+        if model != "rules" and model not in MODEL_DATA:
+            raise HTTPException(status_code=400, detail=f"Unbekanntes Modell: {model}")
+        # Klassennummern hängen vom Modell ab (real: Reihenfolge des LabelEncoders)
+        names, no_pattern = (RULE_NAMES, 0) if model == "rules" else model_classes(model)
+        allowed = {c: name for c, name in names.items() if c != no_pattern}
+        invalid = [p for p in grid.get("pattern", [STRATEGIES["pattern"]["pattern"]]) if p not in allowed]
+        if invalid:
+            choices = ", ".join(f"{c}={name}" for c, name in allowed.items())
+            raise HTTPException(status_code=400,
+                                detail=f"Ungültiges Muster für {model}: {invalid[0]} (erlaubt: {choices})")
 
-        return {
-            "pattern": classes.get(prediction_class, "Unbekannt"),
-            "confidence": float(np.max(prediction)),
-            "entry_point": float(data['Close'].iloc[-1])
-        }
+    try:
+        data = await fetch_series(ticker, period, interval)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=f"Fehler beim Laden der Kursdaten: {str(e)}")
+    if len(data) < 50:
+        raise HTTPException(status_code=400, detail=f"Nicht genügend Kursdaten ({len(data)}, mind. 50 nötig)")
+
+    classes = confidence = None
+    if strategy == "pattern":
+        if model == "rules":
+            classes = rule_classes(evaluate_rules(history_windows(data)))
+            confidence = np.ones(len(classes), dtype=np.float32)
+        else:
+            predictor = get_predictor(model)
+            if predictor is None:
+                raise HTTPException(status_code=501, detail="KI-Modell nicht verfügbar")
+            classes, confidence = await score_history(
+                history_key(ticker, interval, period, model), data,
+                lambda batch: predict_bounded(predictor, batch),
+                lambda prediction: classify_batch(model, prediction),
+            )
+
+    def compute():
+        results = sweep_series(strategy, data.close, grid, classes, confidence)
+        body = {"ticker": ticker.upper(), "strategy": strategy, "interval": interval, "bars": len(data),
+                "results": results}
+        if len(results) == 1 and trades > 0:
+            # Einzellauf: die letzten Trades mit Datum
+            _, (entries, exits, returns) = run_backtest(strategy, data.close, results[0]["params"], classes, confidence)
+            dates = format_dates(data.index())
+            body["trades"] = [{"entry_date": str(dates[i]), "entry": float(data.close[i]), "exit_date": str(dates[j]),
+                               "exit": float(data.close[j]), "return": float(r)}
+                              for i, j, r in zip(entries[-trades:], exits[-trades:], returns[-trades:])]
+        return to_json(body)
+
+    body = await run_bounded(cpu_pool, compute, timeout=COMPUTE_TIMEOUT, what=f"Backtest {ticker}")
+    return Response(content=body, media_type="application/json")
 
 # Fortgeschrittene Regeln
 @app.get("/detect_advanced/{ticker}")
-async def detect_advanced(ticker: str):
+@cache_response("detect_advanced", "1d", "advanced")
+async def detect_advanced(ticker: str, request: Request):
     try:
-        result = detect_advanced_patterns(ticker)
+        result = await detect_advanced_patterns(ticker)
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
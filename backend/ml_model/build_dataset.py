@@ -0,0 +1,194 @@
+# backend/ml_model/build_dataset.py
+#
+# Baut Trainingsdatensätze für viele Ticker parallel:
+#   - Kerzen werden vorab blockweise mit einem Sammel-Download in den Bar-Store geladen
+#   - ein Prozess-Pool erzeugt je Ticker Fenster + Labels und schreibt sie sofort
+#     in eine eigene Shard-Datei (shards/<TICKER>.X.npy / .y.npy)
+#   - fertige Shards werden bei einem erneuten Start übersprungen (Abbruch = kein Verlust)
+#   - zum Schluss werden alle Shards per memmap zu X.npy / y.npy zusammengefügt,
+#     ohne den ganzen Datensatz in den Speicher zu laden
+#
+# Aufruf aus backend/:
+#   python -m ml_model.build_dataset patterns --universe dax --out ml_model/real_patterns
+#   python -m ml_model.build_dataset labeled --tickers AAPL,TSLA,WMT --workers 4
+
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import bar_store
+from ml_model.pattern_data import sliding_windows, label_windows, detect_pattern, LABEL_NAMES
+
+WINDOW_SIZE = 50
+PREFETCH_CHUNK = 100
+
+# Art des Datensatzes -> Zeitraum, Intervall, Merkmale, Labels
+KINDS = {
+    # wie generate_real_labeled_data.py: Schlusskurse, Klassen 0-3
+    "labeled": {"period": "10y", "interval": "1wk", "features": ["Close"]},
+    # wie generate_real_patterns.py: OHLC, Musternamen
+    "patterns": {"period": "5y", "interval": "1d", "features": ["Open", "High", "Low", "Close"]},
+}
+
+
+def _shard_path(out_dir, ticker, part):
+    return os.path.join(out_dir, "shards", f"{ticker.replace('/', '_')}.{part}.npy")
+
+
+def shard_done(out_dir, ticker):
+    # .y.npy wird als letztes geschrieben: existiert sie, ist der Shard vollständig
+    return os.path.exists(_shard_path(out_dir, ticker, "y"))
+
+
+def _save_atomic(path, array):
+    tmp = path + ".tmp.npy"
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+def ticker_windows(kind, ticker, period=None, interval=None):
+    """(Fenster, Labels) eines Tickers direkt aus dem Bar-Store; die Fenster sind Views, keine Kopien."""
+    spec = KINDS[kind]
+    series = bar_store.load_series(ticker, period or spec["period"], interval or spec["interval"])
+    if kind == "labeled":
+        windows = sliding_windows(series.close, WINDOW_SIZE)
+        return windows, label_windows(windows)
+    windows = sliding_windows(series.ohlc, WINDOW_SIZE)
+    return windows, detect_pattern(windows)
+
+
+def build_ticker(kind, ticker, out_dir, period=None, interval=None):
+    """Fenster + Labels eines Tickers als Shard schreiben (läuft im Worker-Prozess); gibt die Anzahl zurück."""
+    windows, labels = ticker_windows(kind, ticker, period, interval)
+    _save_atomic(_shard_path(out_dir, ticker, "X"), np.asarray(windows, dtype=np.float32))
+    _save_atomic(_shard_path(out_dir, ticker, "y"), labels)
+    return len(windows)
+
+
+def prefetch(tickers, interval):
+    """Kerzen blockweise mit je einem Sammel-Download in den Bar-Store holen."""
+    store = bar_store.default_store
+    for i in range(0, len(tickers), PREFETCH_CHUNK):
+        chunk = tickers[i:i + PREFETCH_CHUNK]
+        print(f"Lade Kursdaten {i + 1}-{i + len(chunk)} von {len(tickers)}...")
+        # Fehlschläge sind unkritisch: die Worker laden dann einzeln nach
+        store.refresh_many(chunk, interval)
+
+
+def merge_shards(out_dir, tickers):
+    """Fertige Shards per memmap zu X.npy / y.npy zusammenfügen; meta.json beschreibt Offsets je Ticker."""
+    done = [t for t in tickers if shard_done(out_dir, t)]
+    shapes, total = {}, 0
+    for ticker in done:
+        X = np.load(_shard_path(out_dir, ticker, "X"), mmap_mode="r")
+        shapes[ticker] = X.shape
+        total += len(X)
+
+    first = next((shapes[t] for t in done if shapes[t][0]), None)
+    if first is None:
+        print("Warnung: keine Samples zum Zusammenfügen")
+        return {"count": 0, "tickers": {}}
+
+    X_out = np.lib.format.open_memmap(os.path.join(out_dir, "X.npy.tmp"), mode="w+",
+                                      dtype=np.float32, shape=(total,) + first[1:])
+    y_parts = []
+    offsets, start = {}, 0
+    for ticker in done:
+        n = shapes[ticker][0]
+        if n == 0:
+            continue
+        X_out[start:start + n] = np.load(_shard_path(out_dir, ticker, "X"), mmap_mode="r")
+        y_parts.append(np.load(_shard_path(out_dir, ticker, "y")))
+        offsets[ticker] = [start, n]
+        start += n
+    X_out.flush()
+    del X_out
+    os.replace(os.path.join(out_dir, "X.npy.tmp"), os.path.join(out_dir, "X.npy"))
+    # Labels sind klein gegenüber den Fenstern
+    _save_atomic(os.path.join(out_dir, "y.npy"), np.concatenate(y_parts))
+
+    # "shards" verweist auf die Einzel-Shards je Ticker (WindowSource.from_directory liest sie per memmap)
+    meta = {
+        "count": int(total),
+        "window_size": WINDOW_SIZE,
+        "tickers": offsets,
+        "shards": [{"name": f"shards/{t.replace('/', '_')}", "count": offsets[t][1]} for t in offsets],
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def load_merged(out_dir):
+    """Zusammengefügter Datensatz: X als memmap, y im Speicher."""
+    return np.load(os.path.join(out_dir, "X.npy"), mmap_mode="r"), np.load(os.path.join(out_dir, "y.npy"))
+
+
+def build_dataset(kind, tickers, out_dir, workers=None, period=None, interval=None):
+    spec = KINDS[kind]
+    period = period or spec["period"]
+    interval = interval or spec["interval"]
+    os.makedirs(os.path.join(out_dir, "shards"), exist_ok=True)
+
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    pending = [t for t in tickers if not shard_done(out_dir, t)]
+    print(f"{len(tickers) - len(pending)} von {len(tickers)} Tickern bereits fertig, {len(pending)} offen")
+
+    if pending:
+        prefetch(pending, interval)
+
+    errors = {}
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(build_ticker, kind, t, out_dir, period, interval): t for t in pending}
+            for i, future in enumerate(as_completed(futures), 1):
+                ticker = futures[future]
+                try:
+                    count = future.result()
+                    print(f"[{i}/{len(pending)}] {ticker}: {count} Fenster")
+                except Exception as e:
+                    errors[ticker] = str(e)
+                    print(f"[{i}/{len(pending)}] {ticker}: Fehler: {e}")
+
+    with open(os.path.join(out_dir, "errors.json"), "w") as f:
+        json.dump(errors, f, indent=2)
+
+    meta = merge_shards(out_dir, tickers)
+    meta["errors"] = errors
+    if kind == "labeled":
+        meta["labels"] = LABEL_NAMES
+    return meta
+
+
+def main(argv=None):
+    from universes import get_universe
+
+    parser = argparse.ArgumentParser(description="Trainingsdatensatz für viele Ticker parallel bauen")
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("--tickers", help="kommagetrennt, z.B. AAPL,TSLA,WMT")
+    parser.add_argument("--universe", help="Name aus universes.py oder UNIVERSE_DIR/<name>.txt")
+    parser.add_argument("--out", help="Zielordner (Standard: ml_model/datasets/<kind>)")
+    parser.add_argument("--workers", type=int, default=None, help="Prozesse (Standard: Anzahl CPUs)")
+    parser.add_argument("--period")
+    parser.add_argument("--interval")
+    args = parser.parse_args(argv)
+
+    tickers = [t.strip() for t in (args.tickers or "").split(",") if t.strip()]
+    if args.universe:
+        tickers += get_universe(args.universe)
+    if not tickers:
+        parser.error("--tickers oder --universe angeben")
+
+    out_dir = args.out or os.path.join("ml_model", "datasets", args.kind)
+    meta = build_dataset(args.kind, tickers, out_dir, workers=args.workers, period=args.period,
+                         interval=args.interval)
+    print(f"✅ Fertig! {meta['count']} Samples unter {out_dir} ({len(meta['errors'])} Fehler)")
+    return 0 if not meta["errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
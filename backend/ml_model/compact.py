@@ -0,0 +1,201 @@
+# backend/ml_model/compact.py
+#
+# Kompakte Varianten der Mustermodelle für die NumPy-Runtime:
+#   <datei>.float16.npz      Gewichte als float16 (halbe Dateigröße)
+#   <datei>.int8.npz         Gewichte als int8 mit Skala je Spalte (ein Viertel)
+#   <datei>.pruned.npz       LSTM-/Dense-Einheiten mit geringstem Beitrag entfernt,
+#                            Ausgabeschicht per Least Squares nachgezogen (rechnet schneller)
+#   <datei>.pruned-int8.npz  beides
+# Jede Variante wird auf zurückgehaltenen Fenstern gegen das Original geprüft
+# (gleiche Klasse, Abweichung der Wahrscheinlichkeiten) und nach Latenz,
+# Speicher und Dateigröße verglichen. Welche Variante die API nutzt, steht in
+# MODEL_VARIANT / MODEL_VARIANTS (siehe registry.py).
+#
+# Aufruf aus backend/:
+#   python -m ml_model.compact
+#   python -m ml_model.compact real multi --prune 0.5
+#   python -m ml_model.compact real --train-seed 7   (falls mit --seed 7 trainiert)
+
+import os
+import sys
+import copy
+import json
+import time
+import argparse
+
+import numpy as np
+
+from ml_model.numpy_runtime import LAYERS, NumpyModel, export_npz, load_npz
+from ml_model.pattern_data import synthetic_shape_patterns
+from ml_model.registry import MODEL_DIR, MODEL_FILES, VARIANTS, load_base
+from ml_model.train import REPORT_DIR, SEED, latency, load_split
+
+PRUNE_FRACTION = 0.25
+
+
+def holdout_windows(name, samples, seed, train_seed=SEED):
+    """(Kalibrierung, Prüfung) aus disjunkten Blöcken der Trainingsdaten.
+
+    Geprüft wird auf dem Validierungsanteil, den train() mit `train_seed` nie
+    trainiert hat; nachgezogen (Pruning) wird auf zufälligen Trainingsblöcken.
+    """
+    rng = np.random.default_rng(seed)
+    try:
+        _, _, train_data, val_data = load_split(name, train_seed)
+        calibration, X = train_data.windows(samples, rng), val_data.windows(samples, rng)
+        if len(calibration) and len(X):
+            return calibration, X
+        print(f"Warnung: zu wenig Daten für {name}, nutze synthetische Muster")
+    except Exception as e:
+        print(f"Warnung: keine Daten für {name} ({e}), nutze synthetische Muster")
+    calibration = synthetic_shape_patterns(samples, rng=rng)[0].astype(np.float32)
+    return calibration, synthetic_shape_patterns(samples, rng=rng)[0].astype(np.float32)
+
+
+def _activations(model, X):
+    outputs = []
+    x = np.asarray(X, dtype=model.dtype)
+    for layer in model.layers:
+        x = layer(x)
+        outputs.append(x)
+    return outputs
+
+
+def prune_units(model, fraction, X):
+    """Entfernt je versteckter Schicht die Einheiten mit dem kleinsten Beitrag (|Aktivierung| x Ausgangsgewichte)."""
+    configs = copy.deepcopy(model.layer_configs)
+    weights = {name: dict(params) for name, params in model.weights().items()}
+    weighted = [layer["config"] for layer in configs if layer["class_name"] in LAYERS]
+    acts = _activations(model, X)
+
+    # die Ausgabeschicht bleibt vollständig
+    for i in range(len(weighted) - 1):
+        config, following = weighted[i], weighted[i + 1]
+        w, w_next = weights[config["name"]], weights[following["name"]]
+        units = w_next["kernel"].shape[0]
+        contribution = np.abs(acts[i]).reshape(-1, units).mean(axis=0) * np.linalg.norm(w_next["kernel"], axis=1)
+        keep = np.sort(np.argsort(contribution)[::-1][:max(1, round(units * (1 - fraction)))])
+
+        if "recurrent_kernel" in w:
+            # LSTM: dieselben Einheiten in allen vier Gates (i, f, c, o)
+            cols = np.concatenate([keep + gate * units for gate in range(4)])
+            w["kernel"] = w["kernel"][:, cols]
+            w["recurrent_kernel"] = w["recurrent_kernel"][keep][:, cols]
+        else:
+            w["kernel"] = w["kernel"][:, keep]
+            cols = keep
+        if "bias" in w:
+            w["bias"] = w["bias"][cols]
+        config["units"] = int(len(keep))
+        w_next["kernel"] = w_next["kernel"][keep]
+
+    pruned = NumpyModel(configs, weights, dtype=model.dtype)
+    _refit_head(model, pruned, X)
+    return pruned
+
+
+def _refit_head(original, pruned, X):
+    """Ausgabeschicht so nachziehen, dass die Logits des Originals möglichst getroffen werden (Destillation per Least Squares)."""
+    head = original.layers[-1]
+    features = _activations(original, X)[-2]
+    target = features @ head.kernel + (head.bias if head.bias is not None else 0)
+    pruned_features = _activations(pruned, X)[-2]
+    design = np.hstack([pruned_features, np.ones((len(pruned_features), 1), dtype=pruned_features.dtype)])
+    solution = np.linalg.lstsq(design.astype(np.float64), target.astype(np.float64), rcond=None)[0]
+    new_head = pruned.layers[-1]
+    new_head.kernel = solution[:-1].astype(pruned.dtype)
+    if new_head.bias is not None:
+        new_head.bias = solution[-1].astype(pruned.dtype)
+
+
+def parity(original, candidate, X):
+    """Übereinstimmung der Vorhersagen auf X."""
+    a, b = original.predict(X), candidate.predict(X)
+    if a.shape[1] == 1:
+        same = (a[:, 0] > 0.5) == (b[:, 0] > 0.5)
+    else:
+        same = a.argmax(axis=1) == b.argmax(axis=1)
+    diff = np.abs(a - b)
+    return {"agreement": float(same.mean()), "max_abs_diff": float(diff.max()), "mean_abs_diff": float(diff.mean())}
+
+
+def weight_bytes(model):
+    return int(sum(v.nbytes for params in model.weights().values() for v in params.values()))
+
+
+def describe(model, path, X):
+    return {
+        "file_bytes": os.path.getsize(path) if path else None,
+        "weight_bytes": weight_bytes(model),
+        "latency_ms": latency(model.predict, model.input_shape[1:] if model.input_shape else X.shape[1:]),
+    }
+
+
+def compact_model(name, prune=PRUNE_FRACTION, samples=2000, seed=1234, model_dir=MODEL_DIR, train_seed=SEED):
+    """Erzeugt alle Varianten eines Modells und gibt den Vergleich zurück."""
+    filename = MODEL_FILES[name]
+    base_path = os.path.join(model_dir, filename)
+    original = load_base(base_path)
+
+    # getrennte Fenster zum Nachziehen (Pruning) und zum Prüfen
+    calibration, X = holdout_windows(name, samples, seed, train_seed)
+
+    report = {"model": name, "file": filename, "samples": len(X),
+              "variants": {"float32": describe(original, base_path + ".npz" if os.path.exists(base_path + ".npz") else None, X)}}
+
+    pruned = prune_units(original, prune, calibration) if prune else None
+    for variant in VARIANTS:
+        source = pruned if variant.startswith("pruned") else original
+        if source is None:
+            continue
+        quantize = {"float16": "float16", "int8": "int8", "pruned-int8": "int8"}.get(variant)
+        path = f"{base_path}.{variant}.npz"
+        export_npz(source, path, quantize=quantize)
+        model = load_npz(path)
+        report["variants"][variant] = {**describe(model, path, X), **parity(original, model, X)}
+    if prune:
+        report["prune_fraction"] = prune
+    return report
+
+
+def print_report(reports):
+    print(f"\n{'Modell':<17} {'Variante':<12} {'Datei KB':>8} {'RAM KB':>7} {'ms@1':>6} {'ms@128':>7} {'gleich':>7} {'max Δ':>7}")
+    for r in reports:
+        for variant, v in r["variants"].items():
+            size = "-" if v["file_bytes"] is None else f"{v['file_bytes'] / 1024:.0f}"
+            agree = f"{v['agreement']:.3f}" if "agreement" in v else "-"
+            delta = f"{v['max_abs_diff']:.4f}" if "max_abs_diff" in v else "-"
+            print(f"{r['model']:<17} {variant:<12} {size:>8} {v['weight_bytes'] / 1024:>7.0f} "
+                  f"{v['latency_ms']['1']:>6.2f} {v['latency_ms']['128']:>7.2f} {agree:>7} {delta:>7}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kompakte Modellvarianten erzeugen und vergleichen")
+    parser.add_argument("models", nargs="*", help="Modellnamen (Standard: alle aus registry.MODEL_FILES)")
+    parser.add_argument("--prune", type=float, default=PRUNE_FRACTION, help="Anteil entfernter Einheiten (0 = kein Pruning)")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--train-seed", type=int, default=SEED, help="Seed des Trainings (bestimmt den Validierungsanteil)")
+    parser.add_argument("--report", help=f"Bericht als JSON (Standard: {REPORT_DIR}/compact-<zeit>.json)")
+    args = parser.parse_args(argv)
+
+    # ein Eintrag je Datei (advanced und multi teilen sich ein Modell)
+    names = args.models or list({filename: name for name, filename in reversed(MODEL_FILES.items())}.values())
+    reports = []
+    for name in names:
+        try:
+            reports.append(compact_model(name, args.prune, args.samples, args.seed, train_seed=args.train_seed))
+        except Exception as e:
+            print(f"Warnung: {name} übersprungen: {e}")
+
+    report_path = args.report or os.path.join(REPORT_DIR, time.strftime("compact-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(reports, f, indent=2)
+    print_report(reports)
+    print(f"\n✅ Bericht gespeichert unter {report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+# backend/ml_model/export_models.py
+#
+# Exportiert die Keras-Modelle (.h5) als .npz für die NumPy-Runtime.
+# Aufruf aus backend/:  python -m ml_model.export_models
+
+import os
+
+import numpy as np
+
+from ml_model.numpy_runtime import export_npz, load_h5, load_npz
+from ml_model.registry import MODEL_DIR, MODEL_FILES
+
+
+def export_all():
+    for filename in sorted(set(MODEL_FILES.values())):
+        h5_path = os.path.join(MODEL_DIR, filename + ".h5")
+        npz_path = os.path.join(MODEL_DIR, filename + ".npz")
+        try:
+            model = load_h5(h5_path)
+        except Exception as e:
+            print(f"Warnung: {h5_path} übersprungen: {e}")
+            continue
+
+        export_npz(model, npz_path)
+
+        # Kontrolle: exportiertes Modell liefert dieselben Werte
+        X = np.random.default_rng(0).normal(100, 5, (8,) + tuple(model.input_shape[1:]))
+        diff = np.abs(load_npz(npz_path).predict(X) - model.predict(X)).max()
+        print(f"{h5_path} -> {npz_path} (max. Abweichung {diff:.2e})")
+
+
+if __name__ == "__main__":
+    export_all()
@@ -1,70 +1,22 @@
 # backend/ml_model/generate_real_labeled_data.py
+#
+# Aufruf aus backend/: python -m ml_model.generate_real_labeled_data
+# Die eigentliche Arbeit (Prozess-Pool, Shards je Ticker, Fortsetzen nach
+# Abbruch) macht build_dataset.py; für große Universen direkt dieses nutzen.
 
-import numpy as np
-import yfinance as yf
-import os
+from ml_model.build_dataset import build_dataset
 
-# Muster-Erkennung (ganz einfache Logik)
-def detect_double_bottom(prices):
-    if len(prices) < 30:
-        return False
-    min1 = np.argmin(prices[:len(prices)//2])
-    min2 = np.argmin(prices[len(prices)//2:]) + len(prices)//2
-    diff = abs(prices[min1] - prices[min2])
-    return diff / np.mean([prices[min1], prices[min2]]) < 0.05
-
-def detect_wedge(prices):
-    if len(prices) < 30:
-        return False
-    trend = np.polyfit(np.arange(len(prices)), prices, 1)[0]
-    return abs(trend) < 0.02
-
-def detect_head_shoulders(prices):
-    if len(prices) < 30:
-        return False
-    mid = len(prices) // 2
-    left = np.max(prices[:mid//2])
-    head = np.max(prices[mid//2:mid + mid//2])
-    right = np.max(prices[mid + mid//2:])
-    return head > left and head > right and abs(left - right) / head < 0.1
+# Muster-Erkennung (ganz einfache Logik): detect_double_bottom, detect_wedge und
+# detect_head_shoulders laufen in pattern_data.py auf allen Fenstern gleichzeitig
 
 # Aktienliste
 TICKERS = ["AAPL", "TSLA", "WMT"]
 
-def generate_real_labeled_data(save_dir="backend/ml_model/real_data"):
-    os.makedirs(save_dir, exist_ok=True)
-
-    X = []
-    y = []
-
-    for ticker in TICKERS:
-        print(f"Lade {ticker}...")
-        data = yf.download(ticker, period="10y", interval="1wk", auto_adjust=True)
-        closes = data['Close'].values
-
-        # Sliding Window
-        window_size = 50
-        for i in range(len(closes) - window_size):
-            window = closes[i:i+window_size]
-
-            label = 0  # Kein Muster
-            if detect_double_bottom(window):
-                label = 1
-            elif detect_wedge(window):
-                label = 2
-            elif detect_head_shoulders(window):
-                label = 3
-
-            X.append(window)
-            y.append(label)
-
-    X = np.array(X)
-    y = np.array(y)
-
-    np.save(os.path.join(save_dir, "X.npy"), X)
-    np.save(os.path.join(save_dir, "y.npy"), y)
-
-    print(f"✅ Fertig! {len(X)} Samples gespeichert unter {save_dir}")
+def generate_real_labeled_data(save_dir="ml_model/real_data", tickers=TICKERS):
+    # 10 Jahre Wochenkerzen, Schlusskurs-Fenster der Länge 50, Klassen 0-3
+    info = build_dataset("labeled", tickers, save_dir)
+    print(f"✅ Fertig! {info['count']} Samples gespeichert unter {save_dir}")
+    return info
 
 if __name__ == "__main__":
     generate_real_labeled_data()
@@ -0,0 +1,139 @@
+# backend/ml_model/inference.py
+#
+# Micro-Batching vor den Keras-Modellen: gleichzeitige Anfragen werden ein paar
+# Millisekunden gesammelt, zu einem Batch gestapelt und mit einem einzigen
+# Forward-Pass außerhalb des Event-Loops berechnet. Die Ergebnisse gehen
+# anschließend zeilenweise an die wartenden Anfragen zurück.
+
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+MAX_BATCH_SIZE = int(os.environ.get("INFERENCE_MAX_BATCH", "64"))
+MAX_WAIT_MS = float(os.environ.get("INFERENCE_MAX_WAIT_MS", "5"))
+
+
+def compile_forward(model):
+    """Forward-Pass als Funktion numpy -> numpy.
+
+    Keras-Modelle werden einmal per tf.function kompiliert (variable Batchgröße,
+    kein Retracing); alles andere (z.B. NumPy-Runtime) wird über `predict`
+    aufgerufen, ohne TensorFlow zu importieren.
+    """
+    if not type(model).__module__.startswith(("keras", "tensorflow")):
+        return lambda batch: np.asarray(model.predict(batch, verbose=0))
+    try:
+        import tensorflow as tf
+
+        if isinstance(model, tf.keras.Model):
+            shape = [None] + list(model.input_shape[1:])
+            fn = tf.function(
+                lambda x: model(x, training=False),
+                input_signature=[tf.TensorSpec(shape, tf.float32)],
+                reduce_retracing=True,
+            )
+            return lambda batch: fn(tf.convert_to_tensor(batch, dtype=tf.float32)).numpy()
+    except Exception:
+        pass
+    return lambda batch: np.asarray(model.predict(batch, verbose=0))
+
+
+class _Request:
+    __slots__ = ("x", "future")
+
+    def __init__(self, x, future):
+        self.x = x
+        self.future = future
+
+
+class BatchingPredictor:
+    """Sammelt Einzelanfragen zu Batches und rechnet sie in einem Aufruf."""
+
+    def __init__(self, model, name="model", max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, executor=None):
+        self.model = model
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.forward = compile_forward(model)
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"inference-{name}")
+        self._queue = None
+        self._worker = None
+        self._loop = None
+        # Statistik
+        self.batches = 0
+        self.samples = 0
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def predict(self, x):
+        """Vorhersage für ein Fenster (50, 4) oder einen kleinen Stapel (n, 50, 4); Form wie model.predict."""
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 2:
+            x = x[None]
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put(_Request(x, future))
+        return await future
+
+    def predict_sync(self, x):
+        """Direkter Aufruf ohne Batching (Skripte, Hintergrundjobs)."""
+        x = np.asarray(x, dtype=np.float32)
+        return self.forward(x[None] if x.ndim == 2 else x)
+
+    async def _collect(self):
+        first = await self._queue.get()
+        requests = [first]
+        size = len(first.x)
+        deadline = self._loop.time() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            requests.append(request)
+            size += len(request.x)
+        return requests
+
+    async def _run(self):
+        while True:
+            requests = await self._collect()
+            requests = [r for r in requests if not r.future.cancelled()]
+            if not requests:
+                continue
+
+            batch = np.concatenate([r.x for r in requests]) if len(requests) > 1 else requests[0].x
+            try:
+                output = await self._loop.run_in_executor(self.executor, self.forward, batch)
+            except Exception as e:
+                for r in requests:
+                    if not r.future.done():
+                        r.future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.samples += len(batch)
+            start = 0
+            for r in requests:
+                stop = start + len(r.x)
+                if not r.future.done():
+                    r.future.set_result(output[start:stop])
+                start = stop
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "samples": self.samples,
+            "avg_batch_size": self.samples / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
@@ -0,0 +1,195 @@
+# backend/ml_model/input_pipeline.py
+#
+# Gemeinsame Eingabe-Pipeline für das Training: Fenster werden nicht komplett in
+# den Speicher geladen, sondern in Blöcken aus den (per memmap eingeblendeten)
+# Shards gelesen bzw. direkt aus dem Bar-Store geschnitten. Die Blöcke werden in
+# zufälliger Reihenfolge von mehreren Threads gelesen, in einem begrenzten
+# Puffer gemischt und als Batches ausgegeben.
+#
+#   source = WindowSource.from_directory("ml_model/real_patterns")
+#   train, val = InputPipeline(source, batch_size=32, seed=42).split(0.2)
+#   model.fit(train.to_tf_dataset(), validation_data=val.to_tf_dataset(), epochs=30)
+#
+# Ohne TensorFlow liefert `iter(pipeline)` dieselben Batches als NumPy-Arrays.
+
+import os
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+CHUNK_SIZE = 256
+SHUFFLE_BUFFER = 10_000
+
+
+class WindowSource:
+    """Liste von (X, y)-Teilen gleicher Fensterform; X darf ein memmap oder View sein."""
+
+    def __init__(self, parts):
+        self.parts = [(X, np.asarray(y)) for X, y in parts if len(X)]
+        self.count = sum(len(X) for X, _ in self.parts)
+
+    @classmethod
+    def from_directory(cls, directory):
+        """Shards aus build_dataset (meta.json), X bleibt auf der Platte."""
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        parts = []
+        for shard in meta["shards"]:
+            base = os.path.join(directory, shard["name"])
+            parts.append((np.load(base + ".X.npy", mmap_mode="r"), np.load(base + ".y.npy")))
+        return cls(parts)
+
+    @classmethod
+    def from_arrays(cls, X, y):
+        return cls([(X, y)])
+
+    @classmethod
+    def from_bar_store(cls, kind, tickers, period=None, interval=None):
+        """Fenster direkt aus dem Bar-Store (Arten wie in build_dataset.KINDS), ohne Zwischendateien."""
+        from ml_model.build_dataset import ticker_windows
+
+        parts = []
+        for ticker in tickers:
+            try:
+                parts.append(ticker_windows(kind, ticker, period, interval))
+            except Exception as e:
+                print(f"Warnung: {ticker} übersprungen: {e}")
+        return cls(parts)
+
+    @property
+    def window_shape(self):
+        return self.parts[0][0].shape[1:] if self.parts else ()
+
+    def classes(self):
+        """Sortierte Klassen aller Labels (gleiche Reihenfolge wie sklearn LabelEncoder)."""
+        if not self.parts:
+            return np.empty(0)
+        return np.unique(np.concatenate([np.unique(y) for _, y in self.parts]))
+
+    def chunks(self, size=CHUNK_SIZE):
+        """Zusammenhängende Blöcke (Teil, Start, Ende) – die Einheit zum Lesen und Mischen."""
+        return [(i, start, min(start + size, len(X)))
+                for i, (X, _) in enumerate(self.parts)
+                for start in range(0, len(X), size)]
+
+    def read(self, chunk):
+        i, start, stop = chunk
+        X, y = self.parts[i]
+        # Kopie aus dem memmap; gibt während des Lesens den GIL frei
+        return np.array(X[start:stop], dtype=np.float32), y[start:stop]
+
+
+class InputPipeline:
+    """Batches aus einer WindowSource: Blöcke parallel lesen, im begrenzten Puffer mischen, vorausladen."""
+
+    def __init__(self, source, batch_size=32, shuffle_buffer=SHUFFLE_BUFFER, chunk_size=CHUNK_SIZE,
+                 classes=None, shuffle=True, seed=None, workers=4, prefetch=8, chunks=None):
+        self.source = source
+        self.batch_size = batch_size
+        self.shuffle_buffer = shuffle_buffer
+        self.shuffle = shuffle
+        self.seed = seed
+        self.workers = workers
+        self.prefetch = prefetch
+        self.chunk_size = chunk_size
+        self._chunks = source.chunks(chunk_size) if chunks is None else chunks
+        # Klassen-Labels -> Index (z.B. Musternamen); None = Labels sind schon Indizes
+        self.classes = None if classes is None else np.asarray(classes)
+        self._epoch = 0
+
+    def _derive(self, chunks, shuffle):
+        return InputPipeline(self.source, self.batch_size, self.shuffle_buffer, self.chunk_size, self.classes,
+                             shuffle, self.seed, self.workers, self.prefetch, chunks)
+
+    def split(self, validation=0.2):
+        """(Training, Validierung) – aufgeteilt nach Blöcken, reproduzierbar über `seed`."""
+        order = np.random.default_rng(self.seed).permutation(len(self._chunks))
+        n_val = int(round(len(order) * validation))
+        val = [self._chunks[i] for i in sorted(order[:n_val])]
+        train = [self._chunks[i] for i in sorted(order[n_val:])]
+        return self._derive(train, self.shuffle), self._derive(val, False)
+
+    @property
+    def count(self):
+        return sum(stop - start for _, start, stop in self._chunks)
+
+    def __len__(self):
+        """Schritte pro Epoche."""
+        return -(-self.count // self.batch_size)
+
+    def windows(self, limit=None, rng=None):
+        """Fenster (ohne Labels) als ein Array, höchstens `limit` – aus zufälligen Blöcken, wenn `rng` gegeben ist."""
+        order = rng.permutation(len(self._chunks)) if rng is not None else range(len(self._chunks))
+        parts, total = [], 0
+        for i in order:
+            if limit is not None and total >= limit:
+                break
+            X, _ = self.source.read(self._chunks[i])
+            parts.append(X)
+            total += len(X)
+        if not parts:
+            return np.empty((0,) + tuple(self.source.window_shape), dtype=np.float32)
+        X = np.concatenate(parts)
+        if limit is not None and len(X) > limit:
+            X = X[(rng or np.random.default_rng(0)).permutation(len(X))[:limit]]
+        return X
+
+    def _encode(self, y):
+        if self.classes is None:
+            return y.astype(np.int64)
+        return np.searchsorted(self.classes, y).astype(np.int64)
+
+    def _read_chunks(self, order):
+        # höchstens `prefetch` Blöcke sind gleichzeitig unterwegs
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            chunks = iter(order)
+            pending = deque(pool.submit(self.source.read, self._chunks[c])
+                            for _, c in zip(range(self.prefetch), chunks))
+            while pending:
+                X, y = pending.popleft().result()
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(pool.submit(self.source.read, self._chunks[chunk]))
+                yield X, self._encode(y)
+
+    def _mixed(self, parts, rng):
+        X, y = np.concatenate([X for X, _ in parts]), np.concatenate([y for _, y in parts])
+        if self.shuffle:
+            perm = rng.permutation(len(X))
+            X, y = X[perm], y[perm]
+        return X, y
+
+    def __iter__(self):
+        rng = np.random.default_rng(None if self.seed is None else (self.seed, self._epoch))
+        self._epoch += 1
+        order = rng.permutation(len(self._chunks)) if self.shuffle else np.arange(len(self._chunks))
+
+        buffer, buffered = [], 0
+        for X, y in self._read_chunks(order):
+            buffer.append((X, y))
+            buffered += len(X)
+            if buffered < self.shuffle_buffer:
+                continue
+            X, y = self._mixed(buffer, rng)
+            full = len(X) - len(X) % self.batch_size
+            for start in range(0, full, self.batch_size):
+                yield X[start:start + self.batch_size], y[start:start + self.batch_size]
+            # Rest (kleiner als ein Batch) wandert in den nächsten Puffer
+            buffer, buffered = [(X[full:], y[full:])], len(X) - full
+
+        if buffered:
+            X, y = self._mixed(buffer, rng)
+            for start in range(0, len(X), self.batch_size):
+                yield X[start:start + self.batch_size], y[start:start + self.batch_size]
+
+    def to_tf_dataset(self):
+        """tf.data.Dataset über dieselben Batches, jede Epoche neu gemischt, mit Prefetch."""
+        import tensorflow as tf
+
+        spec = (tf.TensorSpec((None,) + tuple(self.source.window_shape), tf.float32),
+                tf.TensorSpec((None,), tf.int64))
+        dataset = tf.data.Dataset.from_generator(lambda: iter(self), output_signature=spec)
+        return dataset.prefetch(tf.data.AUTOTUNE)
+
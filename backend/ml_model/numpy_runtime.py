@@ -0,0 +1,202 @@
+# backend/ml_model/numpy_runtime.py
+#
+# Forward-Pass der Mustermodelle (LSTM/Dense/Dropout) in reinem NumPy, damit die
+# API-Worker TensorFlow nicht importieren müssen. Die Gewichte kommen entweder
+# direkt aus der Keras-.h5-Datei (braucht nur h5py) oder aus einem exportierten
+# .npz (braucht nur NumPy):
+#
+#   python -m ml_model.export_models
+
+import json
+
+import numpy as np
+
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    None: lambda x: x,
+    "tanh": np.tanh,
+    "sigmoid": _sigmoid,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "softmax": _softmax,
+}
+
+SUPPORTED_LAYERS = ("InputLayer", "LSTM", "Dense", "Dropout")
+
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Aktivierung wird nicht unterstützt: {name}")
+    return ACTIVATIONS[name]
+
+
+class _Dense:
+    def __init__(self, config, weights):
+        self.kernel = weights["kernel"]
+        self.bias = weights.get("bias")
+        self.activation = _activation(config.get("activation"))
+
+    def __call__(self, x):
+        y = x @ self.kernel
+        if self.bias is not None:
+            y += self.bias
+        return self.activation(y)
+
+
+class _LSTM:
+    """Keras-LSTM (Gate-Reihenfolge i, f, c, o)."""
+
+    def __init__(self, config, weights):
+        if config.get("go_backwards") or config.get("stateful"):
+            raise ValueError("LSTM mit go_backwards/stateful wird nicht unterstützt")
+        self.kernel = weights["kernel"]
+        self.recurrent_kernel = weights["recurrent_kernel"]
+        self.bias = weights.get("bias")
+        self.units = self.recurrent_kernel.shape[0]
+        self.activation = _activation(config.get("activation", "tanh"))
+        self.recurrent_activation = _activation(config.get("recurrent_activation", "sigmoid"))
+        self.return_sequences = config.get("return_sequences", False)
+
+    def __call__(self, x):
+        batch, steps, _ = x.shape
+        u = self.units
+        # Eingangsanteil aller Zeitschritte in einer Matrixmultiplikation
+        z_in = x @ self.kernel
+        if self.bias is not None:
+            z_in += self.bias
+
+        h = np.zeros((batch, u), dtype=x.dtype)
+        c = np.zeros((batch, u), dtype=x.dtype)
+        outputs = np.empty((batch, steps, u), dtype=x.dtype) if self.return_sequences else None
+        for t in range(steps):
+            z = z_in[:, t] + h @ self.recurrent_kernel
+            i = self.recurrent_activation(z[:, :u])
+            f = self.recurrent_activation(z[:, u:2 * u])
+            g = self.activation(z[:, 2 * u:3 * u])
+            o = self.recurrent_activation(z[:, 3 * u:])
+            c = f * c + i * g
+            h = o * self.activation(c)
+            if outputs is not None:
+                outputs[:, t] = h
+        return outputs if outputs is not None else h
+
+
+LAYERS = {"LSTM": _LSTM, "Dense": _Dense}
+
+
+class NumpyModel:
+    """Sequentielles Modell mit `predict(X, verbose=0)` wie bei Keras."""
+
+    def __init__(self, layers, weights, dtype=np.float32):
+        self.layer_configs = layers
+        self.dtype = dtype
+        self.layers = []
+        self.input_shape = None
+        for layer in layers:
+            kind, config = layer["class_name"], layer["config"]
+            if kind not in SUPPORTED_LAYERS:
+                raise ValueError(f"Layer wird nicht unterstützt: {kind}")
+            shape = config.get("batch_shape") or config.get("batch_input_shape")
+            if self.input_shape is None and shape:
+                self.input_shape = tuple(shape)
+            if kind in LAYERS:
+                params = {k: np.asarray(v, dtype=dtype) for k, v in weights[config["name"]].items()}
+                self.layers.append(LAYERS[kind](config, params))
+
+    def predict(self, X, verbose=0):
+        x = np.asarray(X, dtype=self.dtype)
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+    __call__ = predict
+
+    def weights(self):
+        """{layer_name: {param: array}} – Format von export_npz/load_npz."""
+        result = {}
+        for config, layer in zip([l for l in self.layer_configs if l["class_name"] in LAYERS], self.layers):
+            params = {k: getattr(layer, k) for k in ("kernel", "recurrent_kernel", "bias") if getattr(layer, k, None) is not None}
+            result[config["config"]["name"]] = params
+        return result
+
+
+def _h5_weights(group):
+    """Gewichte je Layer aus `model_weights`; Keras 2 (kernel:0) und Keras 3 (sequential/...) Layouts."""
+    weights = {}
+    for layer_name in group:
+        params = {}
+
+        def collect(name, obj):
+            if hasattr(obj, "shape"):
+                params[name.rsplit("/", 1)[-1].split(":")[0]] = obj[()]
+
+        group[layer_name].visititems(collect)
+        if params:
+            weights[layer_name] = params
+    return weights
+
+
+def load_h5(path):
+    """Liest ein Keras-Sequential-Modell aus einer .h5-Datei ohne TensorFlow."""
+    import h5py
+
+    with h5py.File(path, "r") as f:
+        config = json.loads(f.attrs["model_config"])
+        if config.get("class_name") != "Sequential":
+            raise ValueError(f"Nur Sequential-Modelle werden unterstützt: {config.get('class_name')}")
+        layers = config["config"]["layers"] if isinstance(config["config"], dict) else config["config"]
+        weights = _h5_weights(f["model_weights"] if "model_weights" in f else f)
+    return NumpyModel(layers, weights)
+
+
+QUANTIZATIONS = (None, "float16", "int8")
+
+
+def _quantize(value, quantize):
+    """Gewichte für die Ablage: float16 oder int8 mit Skala je Ausgangsspalte (symmetrisch)."""
+    if quantize == "float16":
+        return {"": value.astype(np.float16)}
+    if quantize == "int8" and value.ndim == 2:
+        scale = np.abs(value).max(axis=0) / 127.0
+        scale[scale == 0] = 1.0
+        return {"": np.round(value / scale).astype(np.int8), ".scale": scale.astype(np.float32)}
+    # Biases sind klein und bleiben float32
+    return {"": value}
+
+
+def export_npz(model, path, quantize=None):
+    """Speichert Architektur und Gewichte eines NumpyModel als .npz (optional float16/int8)."""
+    if quantize not in QUANTIZATIONS:
+        raise ValueError(f"Unbekannte Quantisierung: {quantize}")
+    arrays = {"config": np.array(json.dumps(model.layer_configs))}
+    for layer_name, params in model.weights().items():
+        for param, value in params.items():
+            for suffix, stored in _quantize(value, quantize).items():
+                arrays[f"{layer_name}/{param}{suffix}"] = stored
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def load_npz(path):
+    """Lädt ein exportiertes Modell; quantisierte Gewichte werden beim Laden nach float32 zurückgerechnet."""
+    with np.load(path, allow_pickle=False) as data:
+        layers = json.loads(str(data["config"]))
+        weights = {}
+        for key in data.files:
+            if key == "config" or key.endswith(".scale"):
+                continue
+            layer_name, param = key.rsplit("/", 1)
+            value = data[key]
+            if value.dtype == np.int8:
+                value = value.astype(np.float32) * data[key + ".scale"]
+            weights.setdefault(layer_name, {})[param] = value
+    return NumpyModel(layers, weights)
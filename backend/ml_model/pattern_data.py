@@ -0,0 +1,171 @@
+# backend/ml_model/pattern_data.py
+#
+# Trainingsdaten für die Mustermodelle, vektorisiert: Die Label-Heuristiken
+# arbeiten auf allen Fenstern einer Kursreihe gleichzeitig (Fenster sind Views
+# per sliding_window_view, keine Kopien), die synthetischen Generatoren
+# erzeugen alle Samples in einem Rutsch. Auf die Platte geschrieben werden die
+# Datensätze von build_dataset.py, gelesen von input_pipeline.WindowSource.
+
+import numpy as np
+
+WINDOW_SIZE = 50
+
+# Klassen von label_windows (wie bisher in generate_real_labeled_data.py)
+LABEL_NAMES = {0: "Kein Muster", 1: "Double Bottom", 2: "Wedge", 3: "Head and Shoulders"}
+
+
+def sliding_windows(values, size=WINDOW_SIZE):
+    """Alle Fenster der Länge `size` als View: (n - size, size[, k]).
+
+    Wie die bisherigen Schleifen `range(len(x) - size)`: das letzte vollständige
+    Fenster ist nicht dabei.
+    """
+    values = np.asarray(values)
+    if len(values) <= size:
+        return np.empty((0, size) + values.shape[1:], dtype=values.dtype)
+    if values.ndim == 1:
+        return np.lib.stride_tricks.sliding_window_view(values, size)[:-1]
+    return np.lib.stride_tricks.sliding_window_view(values, (size, values.shape[1]))[:-1, 0]
+
+
+# --- Heuristiken für Schlusskurs-Fenster (N, L) ---
+
+def detect_double_bottom(windows):
+    windows = np.atleast_2d(windows)
+    length = windows.shape[1]
+    if length < 30:
+        return np.zeros(len(windows), dtype=bool)
+    half = length // 2
+    min1 = windows[:, :half].min(axis=1)
+    min2 = windows[:, half:].min(axis=1)
+    return np.abs(min1 - min2) / ((min1 + min2) / 2) < 0.05
+
+
+def detect_wedge(windows):
+    windows = np.atleast_2d(windows)
+    length = windows.shape[1]
+    if length < 30:
+        return np.zeros(len(windows), dtype=bool)
+    # Steigung der Regressionsgeraden (wie np.polyfit(..., 1)[0]) für alle Fenster
+    t = np.arange(length) - (length - 1) / 2
+    slope = windows @ t / (t @ t)
+    return np.abs(slope) < 0.02
+
+
+def detect_head_shoulders(windows):
+    windows = np.atleast_2d(windows)
+    length = windows.shape[1]
+    if length < 30:
+        return np.zeros(len(windows), dtype=bool)
+    mid = length // 2
+    left = windows[:, :mid // 2].max(axis=1)
+    head = windows[:, mid // 2:mid + mid // 2].max(axis=1)
+    right = windows[:, mid + mid // 2:].max(axis=1)
+    return (head > left) & (head > right) & (np.abs(left - right) / head < 0.1)
+
+
+def label_windows(windows):
+    """Klasse je Fenster (0 = kein Muster, 1 = Double Bottom, 2 = Wedge, 3 = Head and Shoulders)."""
+    windows = np.atleast_2d(windows)
+    return np.select(
+        [detect_double_bottom(windows), detect_wedge(windows), detect_head_shoulders(windows)],
+        [1, 2, 3],
+        default=0,
+    ).astype(np.int8)
+
+
+# --- Heuristik für OHLC-Fenster (N, L, 4), Klassen als Namen ---
+
+PATTERN_NAMES = np.array(["Double Bottom", "Double Top", "Rising Wedge", "Falling Wedge", "No Pattern"])
+
+
+def detect_pattern(windows):
+    """Mustername je OHLC-Fenster (wie bisher in generate_real_patterns.py)."""
+    windows = np.asarray(windows)
+    if windows.ndim == 2:
+        windows = windows[None]
+    close = windows[:, :, 3]
+    if close.shape[1] < 50:
+        return np.full(len(close), None, dtype=object)
+
+    last = close[:, -1]
+    ref = close[:, -25]
+    recent = close[:, -25:]
+    calm_window = close[:, -20:]
+    calm = calm_window.std(axis=1) < 0.02 * calm_window.mean(axis=1)
+
+    choice = np.select(
+        [
+            (last > ref) & (recent.min(axis=1) < ref * 0.95),
+            (last < ref) & (recent.max(axis=1) > ref * 1.05),
+            (last > close[:, -5]) & calm,
+            (last < close[:, -5]) & calm,
+        ],
+        [0, 1, 2, 3],
+        default=4,
+    )
+    return PATTERN_NAMES[choice]
+
+
+# --- synthetische Daten ---
+
+def synthetic_noise_patterns(samples=2000, rng=None):
+    """Random-Walk mit eingebauten Ausschlägen (Klassen 0-3 wie LABEL_NAMES)."""
+    rng = rng or np.random.default_rng()
+    length = WINDOW_SIZE
+    base = np.cumsum(rng.standard_normal((samples, length)), axis=1) + 100
+    labels = rng.integers(0, 4, samples)
+    pos = rng.integers(10, 30, samples)
+    rows = np.arange(samples)
+
+    m = labels == 1  # Double Bottom
+    base[rows[m], pos[m]] -= 10
+    base[rows[m], pos[m] + 5] -= 10
+
+    m = labels == 2  # Wedge
+    base[m] = np.linspace(100, 110, length) + rng.standard_normal((m.sum(), length))
+
+    m = labels == 3  # Head and Shoulders
+    base[rows[m], pos[m]] += 15
+    base[rows[m], pos[m] + 5] -= 10
+    base[rows[m], pos[m] + 10] += 15
+
+    # Open/High/Low/Close = Basislinie + eigenes Rauschen
+    X = base[:, :, None] + rng.standard_normal((samples, length, 4)) * 0.5
+    return X, labels
+
+
+def _segments(points):
+    """Stückweise lineare Kurve aus 5 Segmenten à 10 Punkten."""
+    return np.concatenate([np.linspace(a, b, 10) for a, b in points])
+
+
+# Form je Klasse (0 = kein Muster, 1 = Double Bottom, 2 = Double Top, 3 = Wedge)
+_SHAPES = {
+    1: _segments([(1, 0), (0, 1), (1, 0.5), (0.5, 1), (1, 1.2)]),
+    2: _segments([(0, 1), (1, 0), (0, 0.5), (0.5, 0), (0, -0.2)]),
+    3: np.linspace(0, 1, WINDOW_SIZE) + np.linspace(0, -0.5, WINDOW_SIZE),
+}
+
+
+def synthetic_shape_patterns(samples=1000, rng=None):
+    """Idealisierte Musterformen mit Rauschen (0 = kein Muster, 1 = Double Bottom, 2 = Double Top, 3 = Wedge)."""
+    rng = rng or np.random.default_rng()
+    length = WINDOW_SIZE
+    labels = rng.integers(0, 4, samples)
+    base = np.empty((samples, length))
+
+    m = labels == 0
+    base[m] = np.cumsum(rng.normal(0, 0.5, (m.sum(), length)), axis=1)
+    for label in (1, 2):
+        m = labels == label
+        base[m] = _SHAPES[label] + rng.normal(0, 0.05, (m.sum(), length))
+    m = labels == 3
+    base[m] = _SHAPES[3] + rng.normal(0, 0.1, (m.sum(), length))
+
+    # Open/High/Low/Close aus der Basislinie
+    open_ = base + rng.normal(0, 0.02, base.shape)
+    high = open_ + rng.uniform(0, 0.05, base.shape)
+    low = open_ - rng.uniform(0, 0.05, base.shape)
+    close = open_ + rng.normal(0, 0.02, base.shape)
+    return np.stack([open_, high, low, close], axis=2), labels
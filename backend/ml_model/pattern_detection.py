@@ -1,37 +1,69 @@
 # backend/ml_model/pattern_detection.py
 
 import numpy as np
-from tensorflow.keras.models import load_model
-import yfinance as yf
-import pandas as pd
-
-# Mehrere Modelle können hier später verwaltet werden
-try:
-    multi_model = load_model('ml_model/pattern_multi_model.h5')
-except Exception:
-    print("Warnung: Advanced Pattern Modell konnte nicht geladen werden.")
-    multi_model = None
-
-def load_stock_data(ticker, lookback_days=60):
-    data = yf.download(ticker, period=f"{lookback_days}d", interval="1d", auto_adjust=True)
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.droplevel(1)
-    if data.empty:
+from ml_model.registry import get_predictor
+from ml_model.pattern_data import detect_double_bottom, detect_wedge, detect_head_shoulders
+from executors import predict_bounded
+from singleflight import fetch_series
+
+# Regel-Engine: die Heuristiken aus pattern_data.py laufen auf allen Fenstern
+# gleichzeitig (eine Handvoll NumPy-Reduktionen statt eines LSTM-Durchlaufs) und
+# dienen als schneller Vorfilter vor den Modellen sowie für /detect_rules.
+# Klassen wie PATTERN_CLASSES in detection.py; bei mehreren Treffern gewinnt die kleinere Klasse.
+RULES = {
+    1: ("Double Bottom", detect_double_bottom),
+    2: ("Wedge", detect_wedge),
+    3: ("Head and Shoulders", detect_head_shoulders),
+}
+RULE_NAMES = {0: "Kein Muster", **{cls: name for cls, (name, _) in RULES.items()}}
+
+
+def _closes(windows):
+    windows = np.asarray(windows)
+    # OHLC-Fenster (N, L, 4) -> Schlusskurse (N, L)
+    return windows[..., 3] if windows.ndim == 3 else np.atleast_2d(windows)
+
+
+def evaluate_rules(windows):
+    """(N, len(RULES)) bool: welche Regel auf welchem Fenster anschlägt."""
+    closes = _closes(windows)
+    if len(closes) == 0:
+        return np.zeros((0, len(RULES)), dtype=bool)
+    return np.stack([rule(closes) for _, rule in RULES.values()], axis=1)
+
+
+def rule_classes(hits):
+    """Klasse je Fenster aus evaluate_rules (0 = kein Muster)."""
+    classes = np.array(list(RULES), dtype=np.int16)
+    return np.where(hits.any(axis=1), classes[hits.argmax(axis=1)], 0).astype(np.int16)
+
+
+def rule_names(hit_row):
+    return [name for (name, _), hit in zip(RULES.values(), hit_row) if hit]
+
+
+def rule_candidates(windows):
+    """Maske der Fenster, auf denen mindestens eine Regel anschlägt (nur diese brauchen ein Modell)."""
+    return evaluate_rules(windows).any(axis=1)
+
+async def load_stock_data(ticker, lookback_days=60):
+    data = await fetch_series(ticker, f"{lookback_days}d", "1d")
+    if len(data) == 0:
         raise ValueError("Keine Kursdaten verfügbar.")
-    return data[['Open', 'High', 'Low', 'Close']]
+    return data
 
-def detect_advanced_patterns(ticker):
-    if multi_model is None:
+async def detect_advanced_patterns(ticker):
+    # gleiche Instanz wie /detect_multi (pattern_multi_model)
+    multi_predictor = get_predictor("advanced")
+    if multi_predictor is None:
         raise Exception("Kein Modell geladen.")
 
-    data = load_stock_data(ticker, lookback_days=60)
-    data = data.dropna()
+    data = await load_stock_data(ticker, lookback_days=60)
 
     if len(data) < 50:
         raise ValueError("Nicht genügend Kursdaten.")
 
-    last_data = data.values[-50:]
-    prediction = multi_model.predict(last_data.reshape(1, 50, 4))
+    prediction = await predict_bounded(multi_predictor, data.window(50))
 
     class_idx = np.argmax(prediction[0])
     confidence = float(np.max(prediction[0]))
@@ -41,5 +73,5 @@ def detect_advanced_patterns(ticker):
     return {
         "pattern": patterns[class_idx],
         "confidence": confidence,
-        "entry_point": float(data['Close'].iloc[-1])
+        "entry_point": float(data.close[-1])
     }
@@ -0,0 +1,165 @@
+# backend/ml_model/registry.py
+#
+# Zentrale Verwaltung der Mustermodelle. Jedes Modell wird erst bei der ersten
+# Anfrage geladen und danach von allen Modulen gemeinsam genutzt (eine Instanz
+# und ein BatchingPredictor je Datei).
+#
+# Reihenfolge beim Laden (MODEL_RUNTIME=auto):
+#   1. exportiertes <datei>.npz  -> NumPy-Runtime, kein TensorFlow/h5py nötig
+#   2. <datei>.h5 über h5py      -> NumPy-Runtime, kein TensorFlow nötig
+#   3. <datei>.h5 über Keras     -> nur wenn die Architektur nicht unterstützt wird
+# MODEL_RUNTIME=keras erzwingt Keras, MODEL_RUNTIME=numpy verbietet den Fallback.
+#
+# Kompakte Varianten (python -m ml_model.compact) liegen als <datei>.<variante>.npz daneben:
+#   MODEL_VARIANT=int8                          für alle Modelle
+#   MODEL_VARIANTS=real=int8,basic=pruned-int8  je Modellname, also je Endpunkt
+# Fehlt die Variante, wird das normale Modell geladen.
+
+import os
+import pickle
+import functools
+import threading
+
+import numpy as np
+
+from executors import inference_pool
+from ml_model.inference import BatchingPredictor
+from ml_model.numpy_runtime import load_h5, load_npz
+
+MODEL_DIR = os.environ.get("MODEL_DIR", "ml_model")
+MODEL_RUNTIME = os.environ.get("MODEL_RUNTIME", "auto")
+
+# Name -> Dateiname ohne Endung
+MODEL_FILES = {
+    "basic": "pattern_model",                       # 1. einfaches Modell (nur Head&Shoulders)
+    "multi": "pattern_multi_model",                 # 2. KI für mehrere einfache Muster
+    "multi_realistic": "pattern_multi_model_realistic",  # 3. realistische multiple Muster
+    "real": "pattern_real_model",                   # 4. echtes realistisches Modell
+    "advanced": "pattern_multi_model",              # detect_advanced nutzt das Multi-Modell
+}
+
+# Modelle, deren Ausgaben in der Reihenfolge eines LabelEncoders (train.py) stehen:
+# Name -> (gepickelter Encoder, Labels der Trainingsdaten)
+LABEL_FILES = {
+    "real": ("label_encoder.pkl", "y_real.npy"),
+}
+
+# Varianten aus ml_model/compact.py
+VARIANTS = ("float16", "int8", "pruned", "pruned-int8")
+
+
+def _parse_variants(spec):
+    variants = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, variant = item.split("=", 1)
+            variants[name.strip()] = variant.strip()
+    return variants
+
+
+MODEL_VARIANT = os.environ.get("MODEL_VARIANT") or None
+MODEL_VARIANTS = _parse_variants(os.environ.get("MODEL_VARIANTS", ""))
+
+
+def variant_for(name):
+    variant = MODEL_VARIANTS.get(name, MODEL_VARIANT)
+    return None if variant in (None, "", "float32") else variant
+
+
+@functools.lru_cache(maxsize=None)
+def class_names(name):
+    """Klassennamen in Reihenfolge der Modellausgabe oder None (Modell ohne LabelEncoder)."""
+    if name not in LABEL_FILES:
+        return None
+    encoder_file, labels_file = LABEL_FILES[name]
+    try:
+        with open(os.path.join(MODEL_DIR, encoder_file), "rb") as f:
+            return tuple(str(c) for c in pickle.load(f).classes_)
+    except Exception as e:
+        error = e
+    # ohne scikit-learn lässt sich der Encoder nicht laden; er sortiert die Labels
+    # wie np.unique, die Trainingslabels ergeben also dieselbe Reihenfolge
+    try:
+        return tuple(str(c) for c in np.unique(np.load(os.path.join(MODEL_DIR, labels_file))))
+    except Exception as e:
+        print(f"Warnung: Klassennamen für Modell {name} nicht ladbar ({error}; {e})")
+        return None
+
+
+_lock = threading.Lock()
+_models = {}       # (Dateiname, Variante) -> Modell oder None (Laden fehlgeschlagen)
+_predictors = {}   # (Dateiname, Variante) -> BatchingPredictor
+
+
+def _load_keras(path):
+    from tensorflow.keras.models import load_model
+    return load_model(path)
+
+
+def load_base(base):
+    """Modell ohne Variante: .npz, .h5 per NumPy-Runtime oder Keras (siehe oben)."""
+    h5_path, npz_path = base + ".h5", base + ".npz"
+
+    if MODEL_RUNTIME == "keras":
+        return _load_keras(h5_path)
+
+    if os.path.exists(npz_path):
+        if os.path.exists(h5_path) and os.path.getmtime(h5_path) > os.path.getmtime(npz_path):
+            print(f"Warnung: {npz_path} ist älter als {h5_path}, lade .h5 (neu exportieren mit python -m ml_model.export_models)")
+        else:
+            return load_npz(npz_path)
+
+    try:
+        return load_h5(h5_path)
+    except (ValueError, KeyError) as e:
+        if MODEL_RUNTIME == "numpy":
+            raise
+        print(f"Warnung: {h5_path} nicht mit der NumPy-Runtime ladbar ({e}), nutze Keras")
+        return _load_keras(h5_path)
+
+
+def _load(filename, variant=None):
+    base = os.path.join(MODEL_DIR, filename)
+    if variant and MODEL_RUNTIME != "keras":
+        path = f"{base}.{variant}.npz"
+        if os.path.exists(path):
+            return load_npz(path)
+        print(f"Warnung: {path} fehlt (erzeugen mit python -m ml_model.compact), lade {filename}")
+    return load_base(base)
+
+
+def _key(name):
+    filename = MODEL_FILES[name]
+    variant = variant_for(name)
+    return (filename, variant), (f"{filename}.{variant}" if variant else filename)
+
+
+def get_model(name):
+    """Gemeinsame Modellinstanz oder None, wenn das Modell nicht geladen werden kann."""
+    key, label = _key(name)
+    with _lock:
+        if key not in _models:
+            try:
+                _models[key] = _load(*key)
+            except Exception as e:
+                print(f"Warnung: Modell {name} ({label}) konnte nicht geladen werden: {e}")
+                _models[key] = None
+        return _models[key]
+
+
+def get_predictor(name):
+    """Gemeinsamer BatchingPredictor je Modelldatei (und Variante) oder None."""
+    model = get_model(name)
+    if model is None:
+        return None
+    key, label = _key(name)
+    with _lock:
+        if key not in _predictors:
+            _predictors[key] = BatchingPredictor(model, name=label, executor=inference_pool)
+        return _predictors[key]
+
+
+def loaded_predictors():
+    """Bereits geladene Predictors (z.B. für Statistiken), ohne weitere Modelle zu laden."""
+    with _lock:
+        return {predictor.name: predictor for predictor in _predictors.values()}
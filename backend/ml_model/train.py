@@ -0,0 +1,310 @@
+# backend/ml_model/train.py
+#
+# Ein Einstieg für alle Mustermodelle (ersetzt die einzelnen train_*.py-Skripte).
+# Jede Konfiguration beschreibt Daten, Architektur und Zieldatei; ein Lauf ist
+# über --seed reproduzierbar, bricht per Early Stopping ab, speichert .h5 und
+# .npz (NumPy-Runtime) und schreibt einen Bericht mit Trainingsdurchsatz,
+# Inferenz-Latenz je Batchgröße und Genauigkeit.
+#
+# Aufruf aus backend/:
+#   python -m ml_model.train multi --epochs 20 --threads 4
+#   python -m ml_model.train all --seed 1 --report ml_model/reports/vergleich.json
+
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+
+import numpy as np
+
+from ml_model.inference import compile_forward
+from ml_model.input_pipeline import WindowSource, InputPipeline
+from ml_model.numpy_runtime import export_npz, load_h5
+from ml_model.pattern_data import synthetic_noise_patterns, synthetic_shape_patterns, sliding_windows
+from ml_model.registry import MODEL_DIR, MODEL_FILES
+
+WINDOW_SIZE = 50
+LATENCY_BATCH_SIZES = (1, 8, 32, 128)
+REPORT_DIR = os.path.join(MODEL_DIR, "reports")
+SEED = 42
+# Anteil der Blöcke, die nur zur Validierung dienen (nie trainiert)
+VALIDATION = 0.2
+
+# Muster der CSV-Daten (früher train_pattern_model.py)
+CSV_PATTERNS = ["Double Bottom", "Double Top", "Rising Wedge", "Falling Wedge"]
+# positive Klasse des Binärmodells basic (Klassen wie LABEL_NAMES in pattern_data.py)
+HEAD_AND_SHOULDERS = 3
+
+
+# --- Daten: (WindowSource, Klassen oder None) ---
+
+def _noise_data(samples, rng):
+    X, y = synthetic_noise_patterns(samples, rng=rng)
+    return WindowSource.from_arrays(X.astype(np.float32), y), None
+
+
+def _binary_noise_data(samples, rng):
+    # Head and Shoulders ja/nein – so liefern detection.py und die Registry die Ausgabe von basic aus;
+    # die anderen Muster zählen wie "kein Muster"
+    X, y = synthetic_noise_patterns(samples, rng=rng)
+    return WindowSource.from_arrays(X.astype(np.float32), (y == HEAD_AND_SHOULDERS).astype(np.int64)), None
+
+
+def _shape_data(samples, rng):
+    X, y = synthetic_shape_patterns(samples, rng=rng)
+    return WindowSource.from_arrays(X.astype(np.float32), y), None
+
+
+def _shard_data(directory, rng):
+    source = WindowSource.from_directory(directory)
+    return source, source.classes()
+
+
+def _csv_data(path, rng):
+    import pandas as pd
+
+    data = pd.read_csv(path)
+    # Sequenz i endet mit Kerze i + 49, ihr Label ist das Muster dieser Kerze
+    sequences = sliding_windows(data[["Open", "High", "Low", "Close"]].values.astype(np.float32), WINDOW_SIZE)
+    labels = data["pattern"].values[WINDOW_SIZE - 1:len(data) - 1]
+    known = np.isin(labels, CSV_PATTERNS)
+    return WindowSource.from_arrays(sequences[known], labels[known]), np.array(sorted(CSV_PATTERNS))
+
+
+# Name -> Konfiguration; "file" wie in registry.MODEL_FILES, damit die API das Ergebnis lädt
+CONFIGS = {
+    "basic": {
+        "file": MODEL_FILES["basic"],
+        "data": (_binary_noise_data, 3000),
+        "lstm": (64,), "dense": (), "outputs": 1,
+        "epochs": 10,
+    },
+    "multi": {
+        "file": MODEL_FILES["multi"],
+        "data": (_noise_data, 3000),
+        "lstm": (64,), "dense": (32,), "outputs": 4,
+        "epochs": 20,
+    },
+    "multi_realistic": {
+        "file": MODEL_FILES["multi_realistic"],
+        "data": (_shape_data, 5000),
+        "lstm": (64,), "dense": (32,), "outputs": 4,
+        "epochs": 25,
+    },
+    "real": {
+        "file": MODEL_FILES["real"],
+        "data": (_shard_data, os.path.join(MODEL_DIR, "real_patterns")),
+        "lstm": (64,), "dense": (32,), "outputs": None,  # Anzahl Klassen aus den Daten
+        "epochs": 30,
+        "label_encoder": True,
+    },
+    "sequence": {
+        "file": "pattern_model_real",
+        "data": (_csv_data, "real_patterns.csv"),
+        "lstm": (64, 32), "dense": (), "outputs": 4,
+        "epochs": 30,
+    },
+}
+
+
+def build_model(config, input_shape, outputs, dropout=0.3):
+    from tensorflow.keras import Input
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense, Dropout
+
+    model = Sequential()
+    model.add(Input(shape=input_shape))
+    for i, units in enumerate(config["lstm"]):
+        model.add(LSTM(units, return_sequences=i < len(config["lstm"]) - 1))
+        model.add(Dropout(dropout))
+    for units in config["dense"]:
+        model.add(Dense(units, activation="relu"))
+    if outputs == 1:
+        model.add(Dense(1, activation="sigmoid"))
+        model.compile(loss="binary_crossentropy", optimizer="adam", metrics=["accuracy"])
+    else:
+        model.add(Dense(outputs, activation="softmax"))
+        model.compile(loss="sparse_categorical_crossentropy", optimizer="adam", metrics=["accuracy"])
+    return model
+
+
+def configure_tensorflow(seed, threads=None, inter_threads=None, deterministic=False):
+    """Seeds und CPU-Threads setzen – muss vor dem ersten TensorFlow-Op passieren."""
+    import tensorflow as tf
+
+    if threads:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+    if inter_threads:
+        tf.config.threading.set_inter_op_parallelism_threads(inter_threads)
+    tf.keras.utils.set_random_seed(seed)
+    if deterministic:
+        tf.config.experimental.enable_op_determinism()
+
+
+def _throughput_callback(samples):
+    from tensorflow.keras.callbacks import Callback
+
+    class Throughput(Callback):
+        """Samples/Sekunde je Epoche (nur Training, ohne Validierung)."""
+
+        def __init__(self):
+            super().__init__()
+            self.rates = []
+            self._start = None
+            self._train_end = None
+
+        def on_epoch_begin(self, epoch, logs=None):
+            self._start = time.perf_counter()
+            self._train_end = None
+
+        def on_test_begin(self, logs=None):
+            self._train_end = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            end = self._train_end or time.perf_counter()
+            self.rates.append(samples / (end - self._start))
+
+    return Throughput()
+
+
+def accuracy(predict, pipeline, outputs):
+    correct = total = 0
+    for X, y in pipeline:
+        scores = np.asarray(predict(X))
+        guess = (scores[:, 0] > 0.5).astype(np.int64) if outputs == 1 else scores.argmax(axis=1)
+        correct += int((guess == y).sum())
+        total += len(y)
+    return correct / total if total else None
+
+
+def latency(predict, input_shape, batch_sizes=LATENCY_BATCH_SIZES, repeats=20):
+    """Median in Millisekunden je Batchgröße (nach einem Aufwärmlauf)."""
+    rng = np.random.default_rng(0)
+    result = {}
+    for size in batch_sizes:
+        X = rng.normal(100, 5, (size,) + tuple(input_shape)).astype(np.float32)
+        predict(X)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predict(X)
+            times.append(time.perf_counter() - start)
+        result[str(size)] = round(float(np.median(times)) * 1000, 3)
+    return result
+
+
+def load_split(name, seed=SEED, validation=VALIDATION, batch_size=32):
+    """(Quelle, Klassen, Training, Validierung) – bei gleichem Seed dieselbe Aufteilung wie in train()."""
+    load, arg = CONFIGS[name]["data"]
+    source, classes = load(arg, np.random.default_rng(seed))
+    if source.count == 0:
+        raise ValueError(f"Keine Trainingsdaten für {name}")
+    pipeline = InputPipeline(source, batch_size=batch_size, classes=classes, seed=seed)
+    return (source, classes) + pipeline.split(validation)
+
+
+def train(name, epochs=None, batch_size=32, seed=SEED, patience=5, validation=VALIDATION, output_dir=MODEL_DIR):
+    """Trainiert eine Konfiguration und gibt den Berichtseintrag zurück."""
+    config = CONFIGS[name]
+    source, classes, train_data, val_data = load_split(name, seed, validation, batch_size)
+    outputs = config["outputs"] or len(classes)
+    input_shape = tuple(source.window_shape)
+
+    from tensorflow.keras.callbacks import EarlyStopping
+
+    model = build_model(config, input_shape, outputs)
+    throughput = _throughput_callback(train_data.count)
+    stop = EarlyStopping(monitor="val_loss", patience=patience, restore_best_weights=True)
+    start = time.perf_counter()
+    history = model.fit(train_data.to_tf_dataset(), validation_data=val_data.to_tf_dataset(),
+                        epochs=epochs or config["epochs"], callbacks=[stop, throughput], verbose=2)
+    train_seconds = time.perf_counter() - start
+
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, config["file"])
+    model.save(base + ".h5")
+    if config.get("label_encoder"):
+        from sklearn.preprocessing import LabelEncoder
+        with open(os.path.join(output_dir, "label_encoder.pkl"), "wb") as f:
+            pickle.dump(LabelEncoder().fit(classes), f)
+
+    # gleicher kompilierter Forward-Pass wie der BatchingPredictor der API
+    forward = compile_forward(model)
+    report = {
+        "model": name,
+        "file": base + ".h5",
+        "seed": seed,
+        "params": int(model.count_params()),
+        "train_samples": train_data.count,
+        "val_samples": val_data.count,
+        "epochs_run": len(history.history["loss"]),
+        "best_epoch": int(np.argmin(history.history["val_loss"])) + 1,
+        "train_seconds": round(train_seconds, 2),
+        "samples_per_sec": round(float(np.median(throughput.rates)), 1),
+        "val_accuracy": accuracy(forward, val_data, outputs),
+        "latency_ms": {"keras": latency(forward, input_shape)},
+    }
+
+    # NumPy-Runtime (wie in der API): exportieren und gleich mitmessen
+    try:
+        numpy_model = load_h5(base + ".h5")
+        export_npz(numpy_model, base + ".npz")
+        report["latency_ms"]["numpy"] = latency(numpy_model.predict, input_shape)
+        report["npz_bytes"] = os.path.getsize(base + ".npz")
+    except (ValueError, KeyError) as e:
+        print(f"Warnung: {base}.h5 nicht für die NumPy-Runtime exportierbar: {e}")
+    return report
+
+
+def print_report(reports):
+    sizes = [str(s) for s in LATENCY_BATCH_SIZES]
+    print("\nModell            Genauigkeit  Samples/s  " + "  ".join(f"ms@{s:>4}" for s in sizes) + "  (NumPy-Runtime)")
+    for r in reports:
+        lat = r["latency_ms"].get("numpy") or r["latency_ms"]["keras"]
+        acc = "-" if r["val_accuracy"] is None else f"{r['val_accuracy']:.3f}"
+        print(f"{r['model']:<17} {acc:>11}  {r['samples_per_sec']:>9.0f}  " + "  ".join(f"{lat[s]:>7.2f}" for s in sizes))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mustermodelle trainieren und vergleichen")
+    parser.add_argument("models", nargs="+", choices=sorted(CONFIGS) + ["all"])
+    parser.add_argument("--epochs", type=int, help="maximale Epochen (Standard je Modell)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--patience", type=int, default=5, help="Early Stopping nach so vielen Epochen ohne Besserung")
+    parser.add_argument("--threads", type=int, help="Threads innerhalb einer Operation (intra-op)")
+    parser.add_argument("--inter-threads", type=int, help="parallel laufende Operationen (inter-op)")
+    parser.add_argument("--deterministic", action="store_true", help="deterministische Ops (langsamer)")
+    parser.add_argument("--output-dir", default=MODEL_DIR)
+    parser.add_argument("--report", help=f"Bericht als JSON (Standard: {REPORT_DIR}/train-<zeit>.json)")
+    args = parser.parse_args(argv)
+
+    names = sorted(CONFIGS) if "all" in args.models else list(dict.fromkeys(args.models))
+    configure_tensorflow(args.seed, args.threads, args.inter_threads, args.deterministic)
+
+    reports, failed = [], {}
+    for name in names:
+        print(f"\n=== {name} ===")
+        try:
+            reports.append(train(name, args.epochs, args.batch_size, args.seed, args.patience,
+                                 output_dir=args.output_dir))
+        except Exception as e:
+            failed[name] = str(e)
+            print(f"Warnung: {name} fehlgeschlagen: {e}")
+
+    report_path = args.report or os.path.join(REPORT_DIR, time.strftime("train-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump({"threads": args.threads, "inter_threads": args.inter_threads, "batch_size": args.batch_size,
+                   "models": reports, "failed": failed}, f, indent=2)
+
+    if reports:
+        print_report(reports)
+    print(f"\n✅ Bericht gespeichert unter {report_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
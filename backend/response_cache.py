@@ -0,0 +1,269 @@
+# backend/response_cache.py
+#
+# Fertig serialisierte Antworten von /stock und /detect* im Prozess halten.
+# Die Gültigkeit richtet sich nach dem Kerzenintervall (eine Wochenkerzen-Antwort
+# lebt länger als eine 5-Minuten-Antwort), verdrängt wird nach Bytes (LRU).
+# Jede Antwort bekommt ein ETag, bei passendem If-None-Match gibt es 304.
+# Komprimiert (brotli/gzip) wird je Eintrag und Kodierung nur einmal.
+#
+# Optional teilen sich mehrere Worker einen zweiten Cache:
+#   RESPONSE_CACHE_BACKEND=redis://localhost:6379/0   (braucht das Paket redis)
+#   RESPONSE_CACHE_BACKEND=dir:data/response_cache    (lokale Dateien, gleiche Maschine)
+
+import os
+import json
+import time
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+
+from fastapi import Response
+
+from bar_store import REFRESH_SECONDS
+from compression import choose_encoding, compress
+from executors import cpu_pool, run_bounded, COMPUTE_TIMEOUT
+from serialization import to_json
+
+# Lebensdauer je Kerzenintervall in Sekunden; mindestens so lange, wie der
+# Bar-Store ohnehin keine neuen Kerzen holt
+CACHE_TTL = dict(REFRESH_SECONDS)
+CACHE_TTL.update({
+    "1wk": 6 * 3600,    # Wochen- und Monatskerzen ändern sich innerhalb
+    "1mo": 24 * 3600,   # eines Tages kaum sichtbar
+})
+
+MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def ttl_for(interval):
+    return CACHE_TTL.get(interval, 60)
+
+
+def make_etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "expires", "media_type", "encoded")
+
+    def __init__(self, body, etag, expires, media_type="application/json"):
+        self.body = body
+        self.etag = etag
+        self.expires = expires
+        self.media_type = media_type
+        # komprimierte Fassungen je Kodierung, einmal erzeugt und mit dem Eintrag verworfen
+        self.encoded = {}
+
+    def encode(self, encoding):
+        if encoding not in self.encoded:
+            self.encoded[encoding] = compress(self.body, encoding)
+        return self.encoded[encoding]
+
+    def to_response(self, if_none_match=None, encoding=None):
+        max_age = max(0, int(self.expires - time.time()))
+        # eigenes ETag je Kodierung, damit Zwischen-Caches die Fassungen nicht verwechseln
+        etag = self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+        headers = {"ETag": etag, "Cache-Control": f"max-age={max_age}", "Vary": "Accept, Accept-Encoding"}
+        if if_none_match and {etag, self.etag} & {tag.strip() for tag in if_none_match.split(",")}:
+            return Response(status_code=304, headers=headers)
+        if encoding is None:
+            return Response(content=self.body, media_type=self.media_type, headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(content=self.encode(encoding), media_type=self.media_type, headers=headers)
+
+    def pack(self):
+        header = json.dumps({"etag": self.etag, "expires": self.expires, "media_type": self.media_type})
+        return header.encode() + b"\n" + self.body
+
+    @classmethod
+    def unpack(cls, data):
+        header, body = data.split(b"\n", 1)
+        meta = json.loads(header)
+        return cls(body, meta["etag"], meta["expires"], meta["media_type"])
+
+
+class DirectoryBackend:
+    """Geteilter Cache als Dateien in einem Verzeichnis (mehrere Worker auf einer Maschine)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.blake2b(key.encode(), digest_size=16).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, data, ttl):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+
+class RedisBackend:
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, data, ttl):
+        self.client.set(key, data, ex=max(1, int(ttl)))
+
+
+def backend_from_env():
+    spec = os.environ.get("RESPONSE_CACHE_BACKEND")
+    if not spec:
+        return None
+    try:
+        if spec.startswith("redis://"):
+            return RedisBackend(spec)
+        if spec.startswith("dir:"):
+            return DirectoryBackend(spec[4:])
+    except Exception as e:
+        print(f"Warnung: geteilter Antwort-Cache nicht verfügbar ({e}), nur lokaler Cache")
+        return None
+    print(f"Warnung: unbekanntes RESPONSE_CACHE_BACKEND: {spec}")
+    return None
+
+
+class ResponseCache:
+    """LRU nach Bytes mit TTL je Eintrag; optional mit geteiltem zweiten Cache."""
+
+    def __init__(self, max_bytes=MAX_BYTES, backend=None):
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Statistik
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def _key(parts):
+        return ":".join(str(p) for p in parts)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def _store(self, key, entry):
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get(self, parts):
+        key = self._key(parts)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                self._drop(key)
+
+        if self.backend is not None:
+            try:
+                data = self.backend.get(key)
+            except Exception as e:
+                print(f"Warnung: geteilter Antwort-Cache nicht erreichbar: {e}")
+                data = None
+            if data is not None:
+                entry = CachedResponse.unpack(data)
+                if entry.expires > now:
+                    self._store(key, entry)
+                    with self._lock:
+                        self.shared_hits += 1
+                    return entry
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, parts, body, ttl, media_type="application/json"):
+        entry = CachedResponse(body, make_etag(body), time.time() + ttl, media_type)
+        key = self._key(parts)
+        self._store(key, entry)
+        if self.backend is not None:
+            try:
+                self.backend.set(key, entry.pack(), ttl)
+            except Exception as e:
+                print(f"Warnung: geteilter Antwort-Cache nicht erreichbar: {e}")
+        return entry
+
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "not_modified": self.not_modified,
+            }
+
+
+response_cache = ResponseCache(backend=backend_from_env())
+
+
+async def cached(request, parts, interval, compute, media_type="application/json"):
+    """Antwort aus dem Cache oder über `await compute()` (bytes) berechnen und ablegen.
+
+    `parts` ist der Schlüssel, z.B. ("stock", "AAPL", "1y", "sma14,..."); die
+    Lebensdauer kommt aus dem Kerzenintervall `interval`.
+    """
+    entry = response_cache.get(parts)
+    if entry is None:
+        body = await compute()
+        entry = response_cache.put(parts, body, ttl_for(interval), media_type)
+    encoding = choose_encoding(request.headers.get("accept-encoding"), len(entry.body))
+    if encoding is not None and encoding not in entry.encoded:
+        # einmal je Eintrag und Kodierung, nicht auf dem Event-Loop
+        await run_bounded(cpu_pool, entry.encode, encoding, timeout=COMPUTE_TIMEOUT, what="Kompression")
+    response = entry.to_response(request.headers.get("if-none-match"), encoding)
+    if response.status_code == 304:
+        response_cache.count_not_modified()
+    return response
+
+
+def cache_response(endpoint, interval, model=None):
+    """Decorator für Endpunkte `(ticker, request)`, die ein dict zurückgeben: Schlüssel
+    (endpoint, TICKER, interval, model), Lebensdauer nach `interval`."""
+    def decorate(handler):
+        @functools.wraps(handler)
+        async def wrapper(ticker, request):
+            async def compute():
+                return to_json(await handler(ticker, request))
+            return await cached(request, (endpoint, ticker.upper(), interval, model), interval, compute)
+        return wrapper
+    return decorate
@@ -0,0 +1,116 @@
+# backend/scan.py
+#
+# Mustersuche über ganze Watchlists: Kerzen werden blockweise mit einem
+# gebündelten Download nachgeladen, alle Fenster eines Blocks in einem Batch
+# klassifiziert und die Ergebnisse zeilenweise als NDJSON gestreamt. Optional
+# filtert die Regel-Engine vorher alle Fenster ohne Kandidaten-Muster heraus.
+
+import json
+import asyncio
+
+import numpy as np
+
+import bar_store
+from executors import io_pool, PoolFull, FETCH_TIMEOUT, INFERENCE_TIMEOUT
+from ml_model.pattern_detection import evaluate_rules, rule_names
+
+SCAN_CHUNK = 100
+WINDOW_SIZE = 50
+
+
+def _load_chunk(tickers, period, interval):
+    """Lädt einen Block Ticker (ein Sammel-Download) und gibt ({ticker: BarSeries}, {ticker: Fehler}) zurück."""
+    store = bar_store.default_store
+    store.refresh_many(tickers, interval)
+
+    loaded, errors = {}, {}
+    for ticker in tickers:
+        try:
+            series = store.series(ticker, period, interval)
+        except Exception as e:
+            errors[ticker] = str(e)
+            continue
+        if len(series) < WINDOW_SIZE:
+            errors[ticker] = f"Nicht genügend Kursdaten ({len(series)}, mind. {WINDOW_SIZE} nötig)"
+            continue
+        loaded[ticker] = series
+    return loaded, errors
+
+
+def _line(payload):
+    return json.dumps(payload) + "\n"
+
+
+def _dates(series):
+    return {
+        "entry_point": float(series.close[-1]),
+        "start_date": series.timestamp(-WINDOW_SIZE).strftime('%Y-%m-%d'),
+        "end_date": series.timestamp(-1).strftime('%Y-%m-%d'),
+    }
+
+
+async def scan_stream(tickers, period, interval, predictor, describe, prefilter=False):
+    """NDJSON-Zeilen je Ticker, sobald der jeweilige Block fertig ist.
+
+    `describe(row)` macht aus einer Modellausgabe {"pattern": ..., "confidence": ...}.
+    Mit `prefilter` bekommt nur das Modell zu sehen, wo eine Regel der Regel-Engine
+    anschlägt; alle anderen Ticker werden ohne Modell als "prefiltered" gemeldet.
+    """
+    if not tickers:
+        return
+    chunks = [tickers[i:i + SCAN_CHUNK] for i in range(0, len(tickers), SCAN_CHUNK)]
+
+    def load(chunk):
+        # Sammel-Download für bis zu SCAN_CHUNK Ticker: Timeout wächst mit der Blockgröße
+        return asyncio.ensure_future(io_pool.run(_load_chunk, chunk, period, interval,
+                                                 timeout=FETCH_TIMEOUT * max(1, len(chunk) // 10)))
+
+    pending = load(chunks[0])
+    for i in range(len(chunks)):
+        try:
+            loaded, errors = await pending
+        except asyncio.TimeoutError:
+            loaded, errors = {}, dict.fromkeys(chunks[i], "Zeitüberschreitung beim Laden der Kursdaten")
+        except PoolFull as e:
+            loaded, errors = {}, dict.fromkeys(chunks[i], f"Server ausgelastet: {e}")
+        if i + 1 < len(chunks):
+            # nächsten Block schon laden, während dieser klassifiziert wird
+            pending = load(chunks[i + 1])
+
+        for ticker, error in errors.items():
+            yield _line({"ticker": ticker, "error": error})
+
+        if not loaded:
+            continue
+
+        names = list(loaded)
+        X = np.stack([loaded[ticker].ohlc[-WINDOW_SIZE:] for ticker in names])
+        rules = None
+        if prefilter:
+            hits = evaluate_rules(X)
+            rules = dict(zip(names, hits))
+            for ticker in [t for t, hit in rules.items() if not hit.any()]:
+                yield _line({"ticker": ticker, "pattern": None, "prefiltered": True, "rules": [],
+                             **_dates(loaded[ticker])})
+            keep = hits.any(axis=1)
+            names = [t for t, k in zip(names, keep) if k]
+            X = X[keep]
+            if not names:
+                continue
+
+        try:
+            prediction = await asyncio.wait_for(predictor.predict(X), INFERENCE_TIMEOUT)
+        except asyncio.TimeoutError:
+            for ticker in names:
+                yield _line({"ticker": ticker, "error": "Zeitüberschreitung bei der Modellvorhersage"})
+            continue
+        except Exception as e:
+            for ticker in names:
+                yield _line({"ticker": ticker, "error": f"Fehler bei Modellvorhersage: {e}"})
+            continue
+
+        for ticker, row in zip(names, prediction):
+            line = {"ticker": ticker, **describe(row), **_dates(loaded[ticker])}
+            if rules is not None:
+                line["rules"] = rule_names(rules[ticker])
+            yield _line(line)
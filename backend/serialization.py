@@ -0,0 +1,114 @@
+# backend/serialization.py
+
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional, stdlib-json als Rückfall
+    orjson = None
+
+
+def format_dates(index):
+    """Wie str(Timestamp) für jede Zeile, aber für den ganzen Index auf einmal."""
+    if len(index) == 0:
+        return np.array([], dtype=str)
+
+    tz = index.tz
+    local = index.tz_localize(None) if tz is not None else index
+    text = np.datetime_as_string(local.values.astype("datetime64[s]"), unit="s")
+    text = np.char.replace(text, "T", " ")
+
+    if tz is not None:
+        utc = index.tz_convert("UTC").tz_localize(None)
+        offsets = (local.as_unit("s").asi8 - utc.as_unit("s").asi8) // 60
+        unique, inverse = np.unique(offsets, return_inverse=True)
+        suffixes = np.array([f"{'+' if o >= 0 else '-'}{abs(o) // 60:02d}:{abs(o) % 60:02d}" for o in unique])
+        text = np.char.add(text, suffixes[inverse])
+    return text
+
+
+def _nullable(values, as_int=False):
+    """NaN/inf -> None für die ganze Spalte, ohne Zeilen-Schleife."""
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.isfinite(values)
+    if valid.all():
+        return (values.astype(np.int64) if as_int else values).tolist()
+
+    out = np.empty(len(values), dtype=object)
+    out[valid] = (values[valid].astype(np.int64) if as_int else values[valid]).tolist()
+    out[~valid] = None
+    return out.tolist()
+
+
+def _dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, allow_nan=False).encode()
+
+
+def to_json(obj):
+    """Beliebige Antwort (dict/list) als JSON-Bytes, z.B. für den Antwort-Cache."""
+    return _dumps(obj)
+
+
+def columns_to_json(columns, int_columns=()):
+    """Spaltenweise Antwort: {"Date": [...], "Close": [...], ...}."""
+    payload = {}
+    for name, values in columns.items():
+        if isinstance(values, np.ndarray) and values.dtype.kind == "f":
+            if name in int_columns:
+                payload[name] = _nullable(values, as_int=True)
+            elif orjson is not None:
+                # orjson schreibt NaN/inf direkt als null
+                payload[name] = np.ascontiguousarray(values)
+            else:
+                payload[name] = _nullable(values)
+        else:
+            payload[name] = values.tolist() if isinstance(values, np.ndarray) else list(values)
+    return _dumps(payload)
+
+
+def rows_to_json(columns, int_columns=()):
+    """Zeilenweise Antwort (bisheriges Format): [{"Date": ..., "Close": ...}, ...]."""
+    names = list(columns)
+    lists = []
+    for name, values in columns.items():
+        if isinstance(values, np.ndarray) and values.dtype.kind == "f":
+            lists.append(_nullable(values, as_int=name in int_columns))
+        else:
+            lists.append(values.tolist() if isinstance(values, np.ndarray) else list(values))
+    return _dumps([dict(zip(names, row)) for row in zip(*lists)])
+
+
+
+# Binärformat: b"COLS", uint32 Länge des JSON-Kopfs, Kopf (mit Leerzeichen auf
+# ein Vielfaches von 8 aufgefüllt), danach jede Spalte als float64 little-endian.
+# Jede Spalte beginnt an einem Vielfachen von 8 und lässt sich im Browser ohne
+# Kopie lesen: new Float64Array(buffer, column.offset, header.rows).
+BINARY_MAGIC = b"COLS"
+BINARY_MEDIA_TYPE = "application/vnd.columns+octet-stream"
+
+
+def columns_to_binary(columns, meta=None):
+    """Spaltenweise Antwort als typisierte Arrays; nur numerische Spalten (NaN bleibt NaN)."""
+    names = list(columns)
+    rows = len(columns[names[0]]) if names else 0
+    arrays = [np.ascontiguousarray(columns[name], dtype="<f8") for name in names]
+
+    def header_for(offset):
+        layout = [{"name": name, "offset": offset + i * rows * 8} for i, name in enumerate(names)]
+        return json.dumps({"rows": rows, "dtype": "float64", "columns": layout, **(meta or {})}).encode()
+
+    # Offsets hängen von der Kopflänge ab und umgekehrt – bis die aufgerundete Länge stabil ist
+    start = 0
+    while True:
+        header = header_for(start)
+        size = -(-(len(BINARY_MAGIC) + 4 + len(header)) // 8) * 8
+        if size == start:
+            break
+        start = size
+    header = header.ljust(size - len(BINARY_MAGIC) - 4)
+    return b"".join([BINARY_MAGIC, np.uint32(len(header)).astype("<u4").tobytes(), header]
+                    + [a.tobytes() for a in arrays])
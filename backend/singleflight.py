@@ -0,0 +1,52 @@
+# backend/singleflight.py
+#
+# Gleichzeitige identische Arbeit nur einmal ausführen: Die erste Anfrage für
+# einen Schlüssel startet die Aufgabe, alle weiteren Anfragen mit demselben
+# Schlüssel warten auf dasselbe Ergebnis (oder denselben Fehler). Sobald die
+# Aufgabe fertig ist, wird der Schlüssel wieder freigegeben.
+
+import asyncio
+
+from bar_store import load_series
+from executors import io_pool, run_bounded, FETCH_TIMEOUT
+
+
+class SingleFlight:
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        # Statistik
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key, fn, *args):
+        """Ergebnis von `await fn(*args)`, bei gleichzeitigen Aufrufen mit gleichem `key` nur einmal berechnet."""
+        task = self._calls.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fn(*args))
+            self._calls[key] = task
+            self.started += 1
+            task.add_done_callback(lambda done: self._calls.pop(key) if self._calls.get(key) is done else None)
+        else:
+            self.shared += 1
+        # shield: bricht ein Wartender ab (Client weg), läuft die Aufgabe für die anderen weiter
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {"started": self.started, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+fetches = SingleFlight("fetch")
+computations = SingleFlight("compute")
+
+
+async def _load_history(ticker, interval):
+    return await run_bounded(io_pool, load_series, ticker, "max", interval,
+                             timeout=FETCH_TIMEOUT, what=f"Kursdaten {ticker}")
+
+
+async def fetch_series(ticker, period, interval):
+    """Kursdaten im I/O-Pool laden; gleichzeitige Anfragen für denselben Ticker und dasselbe
+    Intervall teilen sich einen Abruf, der Zeitraum wird danach nur noch herausgeschnitten."""
+    history = await fetches.do((ticker.upper(), interval), _load_history, ticker, interval)
+    return history.since(period)
@@ -0,0 +1,72 @@
+# backend/stock_view.py
+#
+# Aufbereitung der Chartdaten für /stock und den Live-Stream: Kerzen plus
+# Indikatoren als Spalten, wahlweise zeilen- oder spaltenweise (JSON) oder
+# als typisierte Arrays (binär) serialisiert.
+
+from downsample import downsample
+from indicator_cache import indicator_cache, specs_key
+from serialization import format_dates, columns_to_binary, columns_to_json, rows_to_json
+
+# Chart-Zeitraum -> (Zeitraum, Kerzenintervall) für /stock
+STOCK_INTERVALS = {
+    "1d": ("5d", "5m"),
+    "5d": ("5d", "15m"),
+    "1mo": ("1mo", "30m"),
+    "3mo": ("3mo", "60m"),
+    "6mo": ("6mo", "1d"),
+    "1y": ("1y", "1d"),
+    "5y": ("5y", "1wk"),
+    "10y": ("10y", "1mo"),   # Monatskerzen
+    "ytd": ("ytd", "1d"),
+    "max": ("max", "1wk"),
+}
+
+STOCK_FORMATS = ("rows", "columns", "binary")
+
+
+def stock_columns(ticker, yf_interval, specs, history, start=0):
+    """Kerzen und Indikatoren ab Zeile `start` der ganzen Historie als {Spalte: Werte}."""
+    # Indikatoren laufen über die ganze gespeicherte Historie und werden bei neuen
+    # Kerzen nur fortgeschrieben
+    indicator_columns = indicator_cache.columns(ticker, yf_interval, specs, history)
+    bars = history.tail(len(history) - start)
+
+    columns = {
+        "Date": format_dates(bars.index()),
+        "Open": bars.open,
+        "High": bars.high,
+        "Low": bars.low,
+        "Close": bars.close,
+        "Volume": bars.volume,
+    }
+    columns.update({name: values[start:] for name, values in indicator_columns.items()})
+    return columns
+
+
+def downsample_shape(max_points=None, method="ohlc"):
+    return f"{method}{max_points}" if max_points else "full"
+
+
+def stock_body_key(ticker, yf_interval, period, specs, format, max_points=None, method="ohlc"):
+    """Schlüssel für die gemeinsame Berechnung von stock_body (/stock und Live-Snapshot)."""
+    return (ticker.upper(), yf_interval, period, specs_key(specs), format, downsample_shape(max_points, method))
+
+
+def stock_body(ticker, yf_interval, specs, history, bars, format, max_points=None, method="ohlc"):
+    """Indikatoren berechnen und die /stock-Antwort serialisieren (läuft im CPU-Pool)."""
+    columns = stock_columns(ticker, yf_interval, specs, history, start=len(history) - len(bars))
+    if format == "binary":
+        # Zeit als Unix-Sekunden statt Text, damit alle Spalten float64 sind
+        columns.pop("Date")
+        columns = {"Time": bars.ts / 1e9, **columns}
+    if max_points:
+        # erst nach den Indikatoren ausdünnen – die brauchen die volle Auflösung
+        columns = downsample(columns, max_points, method, x=bars.ts)
+
+    if format == "binary":
+        return columns_to_binary(columns, {"ticker": ticker.upper(), "interval": yf_interval, "tz": bars.tz})
+    # Serialisierung in einem Durchgang (NaN/inf -> null spaltenweise)
+    if format == "columns":
+        return columns_to_json(columns, int_columns=("Volume",))
+    return rows_to_json(columns, int_columns=("Volume",))
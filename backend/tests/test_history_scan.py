@@ -0,0 +1,40 @@
+# backend/tests/test_history_scan.py
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bar_store import BAR_DTYPE, BarSeries
+from history_scan import WINDOW_SIZE, pattern_timeline
+
+
+def make_series(n):
+    records = np.zeros(n, dtype=BAR_DTYPE)
+    records['ts'] = np.arange(n, dtype=np.int64) * 86_400 * 10**9
+    records['close'] = np.arange(n, dtype=np.float64) + 100.0
+    return BarSeries(records)
+
+
+def test_peak_ignores_windows_after_segment():
+    # hohe Konfidenz für "kein Muster" direkt nach dem Abschnitt darf nicht zählen
+    classes = np.array([1, 0, 0, 2])
+    confidence = np.array([0.6, 0.99, 0.99, 0.55], dtype=np.float32)
+    series = make_series(len(classes) + WINDOW_SIZE - 1)
+
+    timeline = pattern_timeline(series, classes, confidence, str)
+
+    assert [(t["pattern"], t["windows"]) for t in timeline] == [("1", 1), ("2", 1)]
+    assert [t["confidence"] for t in timeline] == [np.float32(0.6), np.float32(0.55)]
+
+
+def test_peak_ignores_windows_below_threshold():
+    classes = np.array([1, 1, 1, 1])
+    confidence = np.array([0.7, 0.8, 0.3, 0.9], dtype=np.float32)
+    series = make_series(len(classes) + WINDOW_SIZE - 1)
+
+    timeline = pattern_timeline(series, classes, confidence, str)
+
+    assert [t["confidence"] for t in timeline] == [np.float32(0.8), np.float32(0.9)]
@@ -0,0 +1,38 @@
+# backend/universes.py
+#
+# Benannte Ticker-Listen für /scan. Weitere Listen (z.B. sp500) können als
+# Textdatei mit einem Ticker pro Zeile in UNIVERSE_DIR abgelegt werden.
+
+import os
+import re
+
+UNIVERSE_DIR = os.environ.get("UNIVERSE_DIR", "universes")
+
+UNIVERSES = {
+    # wie die Auswahl im Frontend
+    "watchlist": ["AAPL", "TSLA", "NVDA", "WMT"],
+    # DAX 40 (Zusammensetzung Stand 2024)
+    "dax": [
+        "ADS.DE", "AIR.DE", "ALV.DE", "BAS.DE", "BAYN.DE", "BEI.DE", "BMW.DE", "BNR.DE",
+        "CBK.DE", "CON.DE", "1COV.DE", "DTG.DE", "DBK.DE", "DB1.DE", "DHL.DE", "DTE.DE",
+        "EOAN.DE", "FRE.DE", "HNR1.DE", "HEI.DE", "HEN3.DE", "IFX.DE", "MBG.DE", "MRK.DE",
+        "MTX.DE", "MUV2.DE", "P911.DE", "PAH3.DE", "QIA.DE", "RHM.DE", "RWE.DE", "SAP.DE",
+        "SRT3.DE", "SIE.DE", "ENR.DE", "SHL.DE", "SY1.DE", "VNA.DE", "VOW3.DE", "ZAL.DE",
+    ],
+}
+
+
+def get_universe(name):
+    name = name.lower()
+    if name in UNIVERSES:
+        return list(UNIVERSES[name])
+
+    # nur einfache Namen, damit ?universe=../.. keine Datei außerhalb von UNIVERSE_DIR öffnet
+    if not re.fullmatch(r"[a-z0-9_-]+", name):
+        raise ValueError(f"Ungültiger Name für ein Universum: {name}")
+    path = os.path.join(UNIVERSE_DIR, f"{name}.txt")
+    if os.path.exists(path):
+        with open(path) as f:
+            return [line.strip().upper() for line in f if line.strip() and not line.startswith("#")]
+
+    raise ValueError(f"Unbekanntes Universum: {name}")
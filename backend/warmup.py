@@ -0,0 +1,167 @@
+# backend/warmup.py
+#
+# Hält eine Watchlist im Hintergrund warm, damit schon die erste Anfrage nach
+# einem Deploy keinen Yahoo-Abruf, keine Indikator-Berechnung und kein
+# Modell-Laden mehr bezahlt:
+#   - beim Start: alle Modelle laden und je einmal mit einem leeren Fenster rechnen
+#   - je gespeichertem Kerzenintervall eine Schleife im Takt von REFRESH_SECONDS:
+#     Kurse gebündelt nachladen, Indikatoren der Chart-Zeiträume fortschreiben,
+#     letzte Mustererkennung aller Modelle in den Memo der Detection-Pipeline
+#
+#   WARMUP=0                        abschalten
+#   WARMUP_UNIVERSE=watchlist       Liste aus universes.py (oder UNIVERSE_DIR)
+#   WARMUP_TICKERS=AAPL,MSFT        zusätzliche Ticker
+#   WARMUP_INTERVALS=1d,1y,max      Chart-Zeiträume (Standard: alle aus STOCK_INTERVALS)
+
+import os
+import time
+import asyncio
+
+import numpy as np
+
+import bar_store
+from bar_store import RESAMPLE_BASE, REFRESH_SECONDS
+from detection import MODEL_DATA, WINDOW_SIZE, detection
+from executors import cpu_pool, io_pool, run_bounded, predict_bounded, COMPUTE_TIMEOUT
+from indicator_cache import indicator_cache
+from indicators import parse_indicators
+from ml_model.registry import get_predictor
+from singleflight import fetch_series
+from stock_view import STOCK_INTERVALS
+from universes import get_universe
+
+WARMUP_ENABLED = os.environ.get("WARMUP", "1") not in ("0", "false", "no")
+WARMUP_UNIVERSE = os.environ.get("WARMUP_UNIVERSE", "watchlist")
+WARMUP_TICKERS = os.environ.get("WARMUP_TICKERS", "")
+WARMUP_INTERVALS = os.environ.get("WARMUP_INTERVALS", "")
+# ein gebündelter Download für die ganze Watchlist darf länger dauern als ein Einzelabruf
+REFRESH_TIMEOUT = float(os.environ.get("WARMUP_REFRESH_TIMEOUT", "120"))
+
+
+def watchlist():
+    tickers = []
+    if WARMUP_UNIVERSE:
+        try:
+            tickers += get_universe(WARMUP_UNIVERSE)
+        except ValueError as e:
+            print(f"Warnung: {e}")
+    tickers += [t.strip().upper() for t in WARMUP_TICKERS.split(",") if t.strip()]
+    return list(dict.fromkeys(tickers))
+
+
+def chart_intervals():
+    if not WARMUP_INTERVALS:
+        return list(STOCK_INTERVALS)
+    intervals = [i.strip() for i in WARMUP_INTERVALS.split(",") if i.strip()]
+    unknown = [i for i in intervals if i not in STOCK_INTERVALS]
+    if unknown:
+        print(f"Warnung: unbekannte Chart-Zeiträume für das Vorwärmen: {', '.join(unknown)}")
+    return [i for i in intervals if i in STOCK_INTERVALS]
+
+
+class WarmupScheduler:
+    def __init__(self, tickers, intervals, models=tuple(MODEL_DATA)):
+        self.tickers = tickers
+        self.models = list(models)
+        self.specs = parse_indicators(None)
+
+        # gespeicherte Basis -> Kerzenintervalle, die daraus gelesen werden
+        bar_intervals = {STOCK_INTERVALS[i][1] for i in intervals} | {MODEL_DATA[m][1] for m in self.models}
+        self.plan = {}
+        for interval in sorted(bar_intervals):
+            self.plan.setdefault(RESAMPLE_BASE.get(interval, interval), []).append(interval)
+
+        self._tasks = []
+        # Statistik
+        self.started_at = None
+        self.models_ready = {}
+        self.cycles = {base: 0 for base in self.plan}
+        self.last_cycle = {}
+        self.errors = 0
+
+    async def warm_models(self):
+        """Modelle laden und einmal rechnen lassen (Keras baut dabei seinen Graphen)."""
+        window = np.zeros((1, WINDOW_SIZE, 4), dtype=np.float32)
+        for model in self.models:
+            started = time.perf_counter()
+            try:
+                predictor = await run_bounded(io_pool, get_predictor, model,
+                                              timeout=REFRESH_TIMEOUT, what=f"Modell {model}")
+                if predictor is None:
+                    self.models_ready[model] = None
+                    continue
+                await predict_bounded(predictor, window)
+                self.models_ready[model] = round((time.perf_counter() - started) * 1000, 1)
+            except Exception as e:
+                self.errors += 1
+                self.models_ready[model] = None
+                print(f"Warnung: Vorwärmen von Modell {model} fehlgeschlagen: {getattr(e, 'detail', e)}")
+
+    async def warm_ticker(self, ticker, intervals):
+        for interval in intervals:
+            history = await fetch_series(ticker, "max", interval)
+            # Indikatoren über die ganze Historie, wie /stock und der Live-Stream sie lesen
+            await run_bounded(cpu_pool, indicator_cache.columns, ticker, interval, self.specs, history,
+                              timeout=COMPUTE_TIMEOUT, what=f"Indikatoren {ticker}")
+        models = [m for m in self.models if MODEL_DATA[m][1] in intervals and self.models_ready.get(m) is not None]
+        if models:
+            # Fehler (z.B. zu kurze Historie) landen im Ergebnis, nicht als Ausnahme
+            await detection.run(ticker, models)
+
+    async def cycle(self, base):
+        started = time.perf_counter()
+        await run_bounded(io_pool, bar_store.default_store.refresh_many, self.tickers, base,
+                          timeout=REFRESH_TIMEOUT, what=f"Kursdaten {base}")
+        for ticker in self.tickers:
+            try:
+                await self.warm_ticker(ticker, self.plan[base])
+            except Exception as e:
+                self.errors += 1
+                print(f"Warnung: Vorwärmen von {ticker} ({base}) fehlgeschlagen: {getattr(e, 'detail', e)}")
+        self.cycles[base] += 1
+        self.last_cycle[base] = {"at": time.time(), "seconds": round(time.perf_counter() - started, 3)}
+
+    async def _loop(self, base, ready):
+        await ready.wait()
+        while True:
+            try:
+                await self.cycle(base)
+            except Exception as e:
+                self.errors += 1
+                print(f"Warnung: Vorwärmen ({base}) fehlgeschlagen: {getattr(e, 'detail', e)}")
+            await asyncio.sleep(REFRESH_SECONDS[base])
+
+    async def _run(self):
+        ready = asyncio.Event()
+        loops = [asyncio.ensure_future(self._loop(base, ready)) for base in self.plan]
+        self._tasks.extend(loops)
+        await self.warm_models()
+        # erst mit geladenen Modellen, damit die Erkennung nicht ohne sie läuft
+        ready.set()
+        await asyncio.gather(*loops)
+
+    def start(self):
+        if self._tasks or not self.tickers:
+            return
+        self.started_at = time.time()
+        self._tasks.append(asyncio.ensure_future(self._run()))
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "running": any(not task.done() for task in self._tasks),
+            "tickers": len(self.tickers),
+            "intervals": self.plan,
+            "models": self.models_ready,
+            "cycles": self.cycles,
+            "last_cycle": self.last_cycle,
+            "errors": self.errors,
+        }
+
+
+warmup = WarmupScheduler(watchlist() if WARMUP_ENABLED else [], chart_intervals())
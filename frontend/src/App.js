@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { createChart } from 'lightweight-charts';
 import Select from 'react-select';
+import { fetchColumns } from './utils/binaryColumns';
 
 const NASDAQ_100 = [
   { value: 'AAPL', label: 'Apple' },
@@ -36,16 +37,15 @@ function App() {
   useEffect(() => {
     if (!chart) return;
 
-    // Daten vom Backend holen
-    fetch(`http://localhost:8000/stock/${stock.value}`)
-      .then(res => res.json())
-      .then(data => {
-        const formattedData = data.map(d => ({
-          time: new Date(d.Date).getTime() / 1000,
-          open: d.Open,
-          high: d.High,
-          low: d.Low,
-          close: d.Close,
+    // Daten vom Backend holen (binär: Spalten direkt als Float64Array)
+    fetchColumns(`http://localhost:8000/stock/${stock.value}?max_points=800`)  // höchstens eine Kerze je Pixel
+      .then(({ columns }) => {
+        const formattedData = Array.from(columns.Time, (time, i) => ({
+          time,
+          open: columns.Open[i],
+          high: columns.High[i],
+          low: columns.Low[i],
+          close: columns.Close[i],
         }));
         chart.setData(formattedData);
       });
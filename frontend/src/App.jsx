@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import Chart from './components/Chart';
 import Select from 'react-select';
+import { subscribeStock, mergeBars } from './utils/liveStock';
 import './index.css';
 
 const LABELS = {
@@ -84,33 +85,14 @@ function App() {
   
 
   useEffect(() => {
-    fetch(`http://localhost:8000/stock/${stock.value}?interval=${timeframe.value}`)
-      .then((res) => res.json())
-      .then((data) => {
-        const formattedData = data
-          .filter(d => d.Date && d.Close != null)
-          .map(d => ({
-            time: Math.floor(new Date(d.Date).getTime() / 1000),
-            open: d.Open,
-            high: d.High,
-            low: d.Low,
-            close: d.Close,
-            volume: d.Volume,
-            sma: d.SMA_14 ?? null,
-            ema14: d.EMA_14 ?? null,
-            ema50: d.EMA_50 ?? null,
-            rsi: d.RSI_14 ?? null,
-            bollingerUpper: d.Bollinger_Upper ?? null,
-            bollingerLower: d.Bollinger_Lower ?? null,
-            macd: d.MACD ?? null,
-            macdSignal: d.MACD_Signal ?? null,
-          }))
-          .filter(d => !isNaN(d.time))
-          .sort((a, b) => a.time - b.time);
-
-        setChartData(formattedData);
-      })
-      .catch(error => console.error("Fehler beim Laden der Stock-Daten:", error));
+    // Live-Stream: einmal der komplette Chart, danach nur neue/geänderte Kerzen samt Indikatoren
+    const unsubscribe = subscribeStock(stock.value, timeframe.value, {
+      onSnapshot: (bars) => setChartData(bars),
+      onUpdate: (bars) => setChartData((current) => mergeBars(current, bars)),
+      onError: (detail) => console.error("Fehler beim Laden der Stock-Daten:", detail),
+      onClose: (code) => console.warn(`Live-Verbindung getrennt (Code ${code})`),
+    });
+    return unsubscribe;
   }, [stock, timeframe]);
 
   return (
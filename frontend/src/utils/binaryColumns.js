@@ -0,0 +1,25 @@
+// src/utils/binaryColumns.js
+
+// Binärformat von /stock?format=binary (siehe backend/serialization.py):
+// "COLS", uint32 Kopflänge, JSON-Kopf, danach jede Spalte als float64.
+export const BINARY_MEDIA_TYPE = "application/vnd.columns+octet-stream";
+
+// ArrayBuffer -> { meta, columns: { Time: Float64Array, Close: Float64Array, ... } } ohne Kopie
+export function readColumns(buffer) {
+  const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, 4));
+  if (magic !== "COLS") throw new Error("Unbekanntes Binärformat");
+  const headerLength = new DataView(buffer).getUint32(4, true);
+  const meta = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+
+  const columns = {};
+  for (const column of meta.columns) {
+    columns[column.name] = new Float64Array(buffer, column.offset, meta.rows);
+  }
+  return { meta, columns };
+}
+
+export async function fetchColumns(url) {
+  const res = await fetch(url, { headers: { Accept: BINARY_MEDIA_TYPE } });
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  return readColumns(await res.arrayBuffer());
+}
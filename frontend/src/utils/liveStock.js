@@ -0,0 +1,89 @@
+// src/utils/liveStock.js
+
+// Spaltenweise Antwort ({"Date": [...], "Close": [...], ...}) -> Chart-Kerzen
+export function columnsToBars(cols) {
+  return cols.Date
+    .map((date, i) => ({
+      time: Math.floor(new Date(date).getTime() / 1000),
+      open: cols.Open[i],
+      high: cols.High[i],
+      low: cols.Low[i],
+      close: cols.Close[i],
+      volume: cols.Volume[i],
+      sma: cols.SMA_14?.[i] ?? null,
+      ema14: cols.EMA_14?.[i] ?? null,
+      ema50: cols.EMA_50?.[i] ?? null,
+      rsi: cols.RSI_14?.[i] ?? null,
+      bollingerUpper: cols.Bollinger_Upper?.[i] ?? null,
+      bollingerLower: cols.Bollinger_Lower?.[i] ?? null,
+      macd: cols.MACD?.[i] ?? null,
+      macdSignal: cols.MACD_Signal?.[i] ?? null,
+    }))
+    .filter(d => d.close != null)
+    .filter(d => !isNaN(d.time))
+    .sort((a, b) => a.time - b.time);
+}
+
+// Live-Update einarbeiten: gleiche Zeit ersetzt die Kerze, neue Zeiten werden angehängt
+export function mergeBars(bars, updates) {
+  const merged = bars.slice();
+  for (const bar of updates) {
+    let i = merged.length - 1;
+    while (i >= 0 && merged[i].time > bar.time) i--;
+    if (i >= 0 && merged[i].time === bar.time) {
+      merged[i] = bar;
+    } else {
+      merged.splice(i + 1, 0, bar);
+    }
+  }
+  return merged;
+}
+
+// Close-Codes des Servers: 1008 = ungültige Anfrage (nicht erneut versuchen), 1013 = Server ausgelastet
+export const CLOSE_INVALID = 1008;
+export const CLOSE_OVERLOADED = 1013;
+
+const RECONNECT_MIN_MS = 1000;
+const RECONNECT_MAX_MS = 30000;
+
+// WebSocket auf /ws/stock: erst der komplette Chart, danach nur neue/geänderte Kerzen.
+// Bricht die Verbindung ab, wird mit wachsender Wartezeit neu verbunden (der Server
+// schickt dann wieder einen Snapshot); onClose(code, reason) meldet jeden Abbruch.
+// Gibt eine Funktion zum Schließen zurück.
+export function subscribeStock(ticker, interval, { onSnapshot, onUpdate, onError, onClose }) {
+  let socket = null;
+  let timer = null;
+  let delay = RECONNECT_MIN_MS;
+  let stopped = false;
+
+  const connect = () => {
+    socket = new WebSocket(`ws://localhost:8000/ws/stock/${ticker}?interval=${interval}`);
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'snapshot') {
+        delay = RECONNECT_MIN_MS;
+        onSnapshot(columnsToBars(message.data));
+      } else if (message.type === 'update') onUpdate(columnsToBars(message.data));
+      else if (message.type === 'error') onError?.(message.detail);
+    };
+    socket.onerror = () => onError?.('WebSocket-Verbindung fehlgeschlagen');
+    socket.onclose = (event) => {
+      if (stopped) return;
+      onClose?.(event.code, event.reason);
+      if (event.code === CLOSE_INVALID) {
+        onError?.(event.reason || 'Ungültige Anfrage');
+        return;
+      }
+      if (event.code === CLOSE_OVERLOADED) onError?.('Server ausgelastet, neuer Versuch folgt');
+      timer = setTimeout(connect, delay);
+      delay = Math.min(delay * 2, RECONNECT_MAX_MS);
+    };
+  };
+
+  connect();
+  return () => {
+    stopped = true;
+    clearTimeout(timer);
+    socket.close();
+  };
+}